@@ -0,0 +1,30 @@
+from rest_framework.exceptions import PermissionDenied
+
+from authentication.models import UserAccount
+from feedback.locations import NO_MATCH
+from feedback.models import Location
+
+
+def admin_location(request):
+    """
+    Id of the Location an admin request is limited to, or None for no limit: authorities only see
+    the area they administer (UserAccount.location_ref), staff see everything, optionally narrowed
+    with ?location= (any spelling Location.objects.resolve() knows). Unknown places give NO_MATCH.
+    """
+    user = request.user
+    if user.is_staff:
+        return request_location(request)
+    if user.role == UserAccount.Role.ADMIN:
+        return user.location_ref_id or NO_MATCH
+    raise PermissionDenied("Only authorities can view the dashboard.")
+
+
+def request_location(request):
+    """Id of the Location in ?location= (NO_MATCH if unknown), or None when absent."""
+    location = request.query_params.get("location")
+    return Location.objects.resolve_id(location) if location else None
+
+
+def scoped(queryset, location):
+    """Limit a Feedback or FeedbackDailyStat queryset to a Location id (None: unrestricted); an indexed equality lookup."""
+    return queryset if location is None else queryset.filter(location_ref_id=location)
@@ -0,0 +1,103 @@
+"""
+Bulk admin actions: set the status, category or urgency of many feedbacks at once.
+
+The target rows (a list of ids or a BulkActionFilter expression, always within the admin's
+scope) are walked by primary key in chunks of CHUNK_SIZE. Each chunk is one transaction: lock
+and read the ids with their rollup state, one UPDATE for the field plus everything derived
+from it (updated_at, keywords, priority_score), then the rollup deltas and, for category
+changes, the search index. Rows already holding the value are skipped.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat, Left, Lower
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from feedback import priority, search
+from feedback.filters import BulkActionFilter
+from feedback.models import Feedback
+from feedback.signals import SEARCH_FIELDS
+
+from . import rollups
+from .access import scoped
+
+ACTIONS = {
+    'set_status': 'status',
+    'set_category': 'category',
+    'set_urgency': 'urgency',
+}
+
+
+def bulk_setting(name):
+    return settings.BULK_ACTIONS[name]
+
+
+def allowed_values(action):
+    return [value for value, _ in Feedback._meta.get_field(ACTIONS[action]).choices]
+
+
+def keywords_expression(category):
+    """SQL form of Feedback.build_keywords() for rows whose category becomes `category`."""
+    category_label = Feedback.Category(category).label.lower()
+    feedback_type_label = Case(
+        *[When(feedback_type=value, then=Value(label.lower())) for value, label in Feedback.FeedbackType.choices],
+        default=Value(''),
+    )
+    return Left(Concat(Lower('title'), Value(f" {category_label} "), feedback_type_label), 255)
+
+
+def field_updates(field, value):
+    """update() kwargs for setting `field` to `value`, with the columns derived from it."""
+    updates = {field: value, 'updated_at': now()}
+    if field == 'category':
+        updates['keywords'] = keywords_expression(value)
+    if field == 'urgency':
+        updates['priority_score'] = priority.urgency_update(value)  # Reads the old urgency in the same UPDATE
+    return updates
+
+
+def target_queryset(location, ids=None, filters=None):
+    """
+    The feedback an action applies to. A filter must name only BulkActionFilter fields and set at
+    least one of them: django-filter ignores anything else, so a misspelt key would match everything in scope.
+    """
+    feedbacks = scoped(Feedback.objects.all(), location)
+    if ids is not None:
+        return feedbacks.filter(pk__in=ids)
+    unknown = sorted(set(filters or {}) - set(BulkActionFilter.base_filters))
+    if unknown:
+        raise ValidationError({"filter": f"Unknown fields: {', '.join(unknown)}. Use: {', '.join(BulkActionFilter.base_filters)}."})
+    filterset = BulkActionFilter(filters, queryset=feedbacks)
+    if not filterset.is_valid():
+        raise ValidationError({"filter": filterset.errors})
+    if not any(value not in (None, '') for value in filterset.form.cleaned_data.values()):
+        raise ValidationError({"filter": "Give a value for at least one field."})
+    return filterset.qs
+
+
+def apply_action(location, action, value, ids=None, filters=None):
+    """
+    Set ACTIONS[action] to `value` on the matching feedback in `location` (a Location id, None
+    for all). Returns {"matched": rows in scope, "updated": rows changed}.
+    """
+    field = ACTIONS[action]
+    targets = target_queryset(location, ids, filters)
+    matched = targets.count()
+    pending = targets.exclude(**{field: value}).order_by('id')
+    chunk_size = bulk_setting('CHUNK_SIZE')
+
+    last_id, updated = 0, 0
+    while True:
+        with transaction.atomic():
+            rows = list(pending.filter(id__gt=last_id).select_for_update().values('id', *rollups.SNAPSHOT_FIELDS)[:chunk_size])
+            if not rows:
+                break
+            chunk = [row['id'] for row in rows]
+            updated += Feedback.objects.filter(pk__in=chunk).update(**field_updates(field, value))
+            if field in rollups.SNAPSHOT_FIELDS:
+                rollups.apply_changes([(rollups.snapshot(row), {**rollups.snapshot(row), field: value}) for row in rows])
+            if field in SEARCH_FIELDS:
+                search.index_feedbacks(Feedback.objects.filter(pk__in=chunk).only('id', 'title', 'description', 'category', 'location'))
+        last_id = chunk[-1]
+    return {"matched": matched, "updated": updated}
@@ -0,0 +1,68 @@
+"""File responses with single-range HTTP Range support, so interrupted downloads can resume."""
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a "bytes=a-b", "bytes=a-" or "bytes=-n" header, None to send the
+    whole file (no header, several ranges, or syntax we don't handle), or False when unsatisfiable.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # Suffix range: the last n bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def ranged_file_response(request, path, filename, content_type, etag):
+    """
+    The file at `path` as an attachment: 206 with the requested bytes for a Range request
+    (honouring If-Range against `etag`), 416 for a range past the end, otherwise the whole file.
+    """
+    size = path.stat().st_size
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        byte_range = None  # The file changed since the client's partial copy; start over
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,132 @@
+"""
+Streaming feedback export (CSV or JSON Lines, optionally gzipped).
+
+Everything here is a generator of bytes: rows are read with .iterator(chunk_size=...) and
+select_related('user'), encoded one at a time, gathered into ~64 KB chunks and, if asked,
+compressed on the fly. Memory stays flat however many rows are exported.
+"""
+import csv
+import zlib
+
+from feedback.renderers import FastJSONRenderer
+
+CHUNK_SIZE = 2000  # Rows fetched per database round trip
+BUFFER_SIZE = 64 * 1024  # Bytes gathered before a chunk is handed to the response
+
+COLUMNS = (
+    ('id', "ID"),
+    ('user', "User"),
+    ('feedback_type', "Feedback Type"),
+    ('category', "Category"),
+    ('title', "Title"),
+    ('location', "Location"),
+    ('urgency', "Urgency"),
+    ('status', "Status"),
+    ('upvotes', "Upvotes"),
+    ('downvotes', "Downvotes"),
+    ('sentiment_score', "Sentiment Score"),
+    ('created_at', "Created At"),
+)
+ONLY_FIELDS = (
+    'id', 'feedback_type', 'category', 'title', 'location', 'urgency', 'status', 'upvotes', 'downvotes',
+    'sentiment_score', 'created_at', 'is_anonymous', 'user__first_name', 'user__last_name',
+)
+
+
+def export_queryset(queryset):
+    """The rows an export reads: one JOIN for the user, only the exported columns, in id order."""
+    return queryset.select_related('user').only(*ONLY_FIELDS).order_by('id')
+
+
+def user_name(feedback):
+    if feedback.is_anonymous or feedback.user is None:
+        return "Anonymous"
+    return f"{feedback.user.first_name} {feedback.user.last_name}".strip()
+
+
+def record(feedback):
+    return {
+        'id': feedback.id,
+        'user': user_name(feedback),
+        'feedback_type': feedback.feedback_type,
+        'category': feedback.category,
+        'title': feedback.title,
+        'location': feedback.location,
+        'urgency': feedback.urgency,
+        'status': feedback.status,
+        'upvotes': feedback.upvotes,
+        'downvotes': feedback.downvotes,
+        'sentiment_score': feedback.sentiment_score,
+        'created_at': feedback.created_at,
+    }
+
+
+class Echo:
+    """File-like object whose write() returns the line, so csv.writer can produce it lazily."""
+
+    def write(self, value):
+        return value
+
+
+def rows(queryset, progress=None, every=CHUNK_SIZE):
+    """Feedbacks of `queryset` read in chunks; progress(count) is called every `every` rows and at the end."""
+    count = 0
+    for feedback in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield feedback
+        count += 1
+        if progress and count % every == 0:
+            progress(count)
+    if progress:
+        progress(count)
+
+
+def csv_lines(feedbacks):
+    writer = csv.writer(Echo())
+    yield writer.writerow([title for _, title in COLUMNS]).encode()
+    for feedback in feedbacks:
+        row = record(feedback)
+        row['created_at'] = row['created_at'].strftime("%Y-%m-%d %H:%M")
+        yield writer.writerow([row[key] for key, _ in COLUMNS]).encode()
+
+
+def jsonl_lines(feedbacks):
+    renderer = FastJSONRenderer()
+    for feedback in feedbacks:
+        yield renderer.render(record(feedback)) + b"\n"
+
+
+# format: (line generator, content type, file extension)
+FORMATS = {
+    'csv': (csv_lines, 'text/csv', 'csv'),
+    'jsonl': (jsonl_lines, 'application/x-ndjson', 'jsonl'),
+}
+
+
+def buffered(chunks, size=BUFFER_SIZE):
+    """Join small chunks into ones of at least `size` bytes."""
+    pending, length = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b"".join(pending)
+            pending, length = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def gzipped(chunks, level=6):
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)  # | 16: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(queryset, file_format='csv', gzip=False, progress=None, progress_every=CHUNK_SIZE):
+    """Byte chunks of `queryset` exported as `file_format`; see rows() for `progress`."""
+    lines = FORMATS[file_format][0]
+    chunks = buffered(lines(rows(export_queryset(queryset), progress, progress_every)))
+    return gzipped(chunks) if gzip else chunks
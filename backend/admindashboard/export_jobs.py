@@ -0,0 +1,197 @@
+"""
+Background feedback exports.
+
+request_export() records an ExportJob, or hands back an existing one for the same scope,
+filters and format whose watermark still matches the data. process_export_jobs claims jobs
+one at a time, streams the rows through admindashboard/export.py into a ".part" file,
+reports progress in rows_written, and renames the file into place when it is complete.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from feedback.filters import ExportFilter
+from feedback.models import Feedback
+
+from . import export
+from .access import scoped
+from .models import ExportJob
+
+REUSABLE = (ExportJob.Status.PENDING, ExportJob.Status.RUNNING, ExportJob.Status.DONE)
+
+
+def job_setting(name):
+    return settings.EXPORT_JOBS[name]
+
+
+def normalized_filters(params):
+    """The ExportFilter parameters in `params`, validated and in canonical form (for fingerprinting)."""
+    filterset = ExportFilter(params, queryset=Feedback.objects.none())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    filters = {}
+    for name, value in filterset.form.cleaned_data.items():
+        if value in (None, ''):
+            continue
+        filters[name] = value.isoformat() if hasattr(value, 'isoformat') else value.strip().lower()
+    return filters
+
+
+def filtered_queryset(location, filters):
+    return ExportFilter(filters, queryset=scoped(Feedback.objects.all(), location)).qs
+
+
+def fingerprint(location, filters, file_format, gzip):
+    key = json.dumps([location, filters, file_format, gzip], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def watermark(queryset):
+    """
+    (watermark, row count) of the rows an export would contain, from one aggregate query.
+    Adding or deleting a row, saving one or moving vote counters changes it.
+    """
+    state = queryset.order_by().aggregate(
+        count=Count('id'), last_id=Max('id'), last_update=Max('updated_at'),
+        upvotes=Sum('upvotes'), downvotes=Sum('downvotes'), scored=Count('sentiment_score'),
+    )
+    key = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest(), state['count']
+
+
+def request_export(user, location, params):
+    """The ExportJob for these parameters and True if it was just created, or an equivalent existing one and False."""
+    file_format = params.get('file_format', 'csv')
+    if file_format not in export.FORMATS:
+        raise ValidationError({"file_format": f"Choose one of: {', '.join(export.FORMATS)}."})
+    gzip = str(params.get('gzip', '')).lower() in ('1', 'true')
+    filters = normalized_filters(params)
+
+    job_fingerprint = fingerprint(location, filters, file_format, gzip)
+    job_watermark, rows_total = watermark(filtered_queryset(location, filters))
+    existing = (
+        ExportJob.objects.filter(fingerprint=job_fingerprint, watermark=job_watermark, status__in=REUSABLE)
+        .order_by('-created_at')
+        .first()
+    )
+    if existing is not None and existing.status == ExportJob.Status.DONE and not artifact_path(existing).exists():
+        existing.status = ExportJob.Status.EXPIRED  # File removed behind our back; export again
+        existing.save(update_fields=['status', 'updated_at'])
+        existing = None
+    if existing is not None:
+        return existing, False
+    job = ExportJob.objects.create(
+        requested_by=user, location_ref_id=location, filters=filters, file_format=file_format, gzip=gzip,
+        fingerprint=job_fingerprint, watermark=job_watermark, rows_total=rows_total,
+    )
+    return job, True
+
+
+def artifact_path(job):
+    return settings.EXPORT_ROOT / job.file_name
+
+
+def file_name(job):
+    extension = export.FORMATS[job.file_format][2]
+    return f"feedback-export-{job.pk}.{extension}" + (".gz" if job.gzip else "")
+
+
+def claim_job():
+    """
+    Lock the oldest due job and mark it RUNNING, or return None.
+
+    A RUNNING job whose progress hasn't moved within the lease (crashed worker) is claimed again.
+    """
+    lease_expired = now() - timedelta(seconds=job_setting('LEASE_SECONDS'))
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ExportJob.Status.PENDING) | Q(status=ExportJob.Status.RUNNING, updated_at__lt=lease_expired))
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        ExportJob.objects.filter(pk=job.pk).update(status=ExportJob.Status.RUNNING, attempts=F('attempts') + 1, updated_at=now())
+    job.status = ExportJob.Status.RUNNING
+    job.attempts += 1
+    return job
+
+
+def run_job(job):
+    """Write the job's file. Rows go out in chunks; the file only appears under its final name once complete."""
+    settings.EXPORT_ROOT.mkdir(parents=True, exist_ok=True)
+    job.file_name = file_name(job)
+    path = artifact_path(job)
+    partial = path.with_name(path.name + '.part')
+
+    def progress(count):
+        ExportJob.objects.filter(pk=job.pk).update(rows_written=count, updated_at=now())  # Also renews the lease
+        job.rows_written = count
+
+    chunks = export.stream(
+        filtered_queryset(job.location_ref_id, job.filters), job.file_format, gzip=job.gzip,
+        progress=progress, progress_every=job_setting('PROGRESS_EVERY_ROWS'),
+    )
+    try:
+        with open(partial, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    job.status = ExportJob.Status.DONE
+    job.rows_total = job.rows_written
+    job.file_size = path.stat().st_size
+    job.finished_at = now()
+    job.last_error = ''
+    job.save(update_fields=['status', 'file_name', 'rows_total', 'rows_written', 'file_size', 'finished_at', 'last_error', 'updated_at'])
+
+
+def fail_job(job, error):
+    """Put a failed job back in the queue, or mark it FAILED once attempts run out."""
+    job.last_error = str(error)[:2000]
+    job.status = ExportJob.Status.FAILED if job.attempts >= job_setting('MAX_ATTEMPTS') else ExportJob.Status.PENDING
+    job.save(update_fields=['status', 'last_error', 'updated_at'])
+
+
+def purge_expired():
+    """Delete files of jobs finished more than RETENTION_DAYS ago. Returns the number of jobs expired."""
+    cutoff = now() - timedelta(days=job_setting('RETENTION_DAYS'))
+    jobs = list(ExportJob.objects.filter(status=ExportJob.Status.DONE, finished_at__lt=cutoff))
+    for job in jobs:
+        artifact_path(job).unlink(missing_ok=True)
+    ExportJob.objects.filter(pk__in=[job.pk for job in jobs]).update(status=ExportJob.Status.EXPIRED, updated_at=now())
+    return len(jobs)
+
+
+def run_worker(once=False, poll_interval=None, log=print):
+    """Run export jobs until the queue is empty (once=True) or forever, polling. Returns the job count."""
+    poll_interval = poll_interval or job_setting('POLL_INTERVAL_SECONDS')
+    total = 0
+    while True:
+        expired = purge_expired()
+        if expired:
+            log(f"Deleted {expired} expired export files")
+        job = claim_job()
+        if job is not None:
+            try:
+                run_job(job)
+                log(f"Export {job.pk}: {job.rows_written} rows, {job.file_size} bytes")
+            except Exception as e:
+                fail_job(job, e)
+                log(f"Export {job.pk} failed: {e}")
+            total += 1
+            continue
+        if once:
+            return total
+        time.sleep(poll_interval)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from admindashboard.export_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Write queued feedback exports to EXPORT_ROOT (retries up to MAX_ATTEMPTS, deletes files after RETENTION_DAYS)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit instead of polling.")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        total = run_worker(once=options['once'], poll_interval=options['poll_interval'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} exports processed"))
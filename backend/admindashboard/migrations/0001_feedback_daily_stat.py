@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:06
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """Same aggregation as admindashboard.rollups.rebuild(), against the historical models."""
+    Feedback = apps.get_model('feedback', 'Feedback')
+    FeedbackDailyStat = apps.get_model('admindashboard', 'FeedbackDailyStat')
+    rows = (
+        Feedback.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'category', 'location', 'status', 'feedback_type')
+        .annotate(
+            count=Count('id'),
+            upvotes=Coalesce(Sum('upvotes'), 0),
+            downvotes=Coalesce(Sum('downvotes'), 0),
+            sentiment_sum=Coalesce(Sum('sentiment_score'), 0.0),
+            sentiment_count=Count('sentiment_score'),
+        )
+        .order_by()
+    )
+    FeedbackDailyStat.objects.bulk_create([FeedbackDailyStat(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('feedback', '0010_hot_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(max_length=20)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('status', models.CharField(max_length=20)),
+                ('feedback_type', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('upvotes', models.IntegerField(default=0)),
+                ('downvotes', models.IntegerField(default=0)),
+                ('sentiment_sum', models.FloatField(default=0.0)),
+                ('sentiment_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'category', 'location', 'status', 'feedback_type'), name='unique_feedback_daily_stat')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:22
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from feedback.locations import NO_MATCH, address_candidates, normalize_key
+
+
+def scope_export_jobs(apps, schema_editor):
+    """Carry each job's location scope over as a Location id; an unknown place keeps matching nothing."""
+    ExportJob = apps.get_model('admindashboard', 'ExportJob')
+    Location = apps.get_model('feedback', 'Location')
+    for job in ExportJob.objects.exclude(location=None):
+        location = None
+        for key in [normalize_key(job.location), *address_candidates(job.location)]:
+            location = Location.objects.filter(Q(key=key) | Q(aliases__alias=key)).first()
+            if location is not None:
+                break
+        job.location_ref_id = location.pk if location else NO_MATCH
+        job.save(update_fields=['location_ref_id'])
+
+
+def rebuild_daily_stats(apps, schema_editor):
+    """Same aggregation as admindashboard.rollups.rebuild(), against the historical models."""
+    Feedback = apps.get_model('feedback', 'Feedback')
+    FeedbackDailyStat = apps.get_model('admindashboard', 'FeedbackDailyStat')
+    rows = (
+        Feedback.objects.annotate(day=TruncDate('created_at'), location_key=Coalesce('location_ref', 0))
+        .values('day', 'category', 'location_key', 'status', 'feedback_type')
+        .annotate(
+            count=Count('id'),
+            upvotes=Coalesce(Sum('upvotes'), 0),
+            downvotes=Coalesce(Sum('downvotes'), 0),
+            sentiment_sum=Coalesce(Sum('sentiment_score'), 0.0),
+            sentiment_count=Count('sentiment_score'),
+        )
+        .order_by()
+    )
+    FeedbackDailyStat.objects.all().delete()
+    FeedbackDailyStat.objects.bulk_create(
+        [FeedbackDailyStat(location_ref_id=row.pop('location_key'), **row) for row in rows], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admindashboard', '0002_export_job'),
+        ('feedback', '0011_location'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='feedbackdailystat',
+            name='unique_feedback_daily_stat',
+        ),
+        migrations.RemoveField(
+            model_name='feedbackdailystat',
+            name='location',
+        ),
+        migrations.AddField(
+            model_name='feedbackdailystat',
+            name='location_ref_id',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackdailystat',
+            constraint=models.UniqueConstraint(fields=('day', 'category', 'location_ref_id', 'status', 'feedback_type'), name='unique_feedback_daily_stat'),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='location_ref_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(scope_export_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='location',
+        ),
+        migrations.RunPython(rebuild_daily_stats, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,76 @@
 from django.db import models
+from django.utils import timezone
+
+from authentication.models import UserAccount
 
 # Create your models here.
+class FeedbackDailyStat(models.Model):
+    """
+    Per-day rollup of feedback, keyed by the day it was created and its current category,
+    location, status and type. Kept up to date by admindashboard/rollups.py; dashboards read
+    this instead of scanning Feedback.
+    """
+    day = models.DateField()
+    category = models.CharField(max_length=20)
+    # Feedback.location_ref id, 0 when the feedback has none (a plain column, so the unique key never holds NULL)
+    location_ref_id = models.IntegerField(default=0)
+    status = models.CharField(max_length=20)
+    feedback_type = models.CharField(max_length=20)
+
+    count = models.IntegerField(default=0)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    sentiment_sum = models.FloatField(default=0.0)
+    sentiment_count = models.IntegerField(default=0)  # Feedback in the row that has a sentiment score
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'category', 'location_ref_id', 'status', 'feedback_type'], name='unique_feedback_daily_stat',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category} {self.location_ref_id} {self.status}: {self.count}"
+
+
+class ExportJob(models.Model):
+    """
+    A feedback export written to a file under settings.EXPORT_ROOT by manage.py process_export_jobs.
+    Jobs with the same fingerprint (scope, filters, format) and watermark (state of the matching
+    rows) produce the same file, so requests for one are answered with the other.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+        EXPIRED = 'EXPIRED', 'Expired'  # File deleted after EXPORT_JOBS['RETENTION_DAYS']
+
+    requested_by = models.ForeignKey(UserAccount, on_delete=models.SET_NULL, null=True, related_name='export_jobs')
+    location_ref_id = models.IntegerField(null=True, blank=True)  # Scope (a Location id); None for everything (staff)
+    filters = models.JSONField(default=dict)  # Normalized ExportFilter parameters
+    file_format = models.CharField(max_length=10)
+    gzip = models.BooleanField(default=False)
+    fingerprint = models.CharField(max_length=64)
+    watermark = models.CharField(max_length=64)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    rows_total = models.PositiveIntegerField(default=0)  # Matching rows when requested
+    rows_written = models.PositiveIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True)  # Relative to EXPORT_ROOT
+    file_size = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fingerprint', 'watermark'], name='export_job_reuse_idx'),
+            models.Index(fields=['status', 'created_at'], name='export_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export {self.pk} ({self.file_format}, {self.status})"
@@ -0,0 +1,149 @@
+"""
+Incremental maintenance of FeedbackDailyStat.
+
+Every write that changes what a feedback contributes to the rollup goes through
+apply_changes() as a (before, after) pair of snapshots: the old contribution is subtracted,
+the new one added, and the net delta per rollup row is applied with F() expressions.
+Single saves/deletes are covered by admindashboard/signals.py; code that writes with
+bulk_create/bulk_update/update() calls apply_changes() or record_votes() itself.
+rebuild() recomputes the table from scratch (manage.py rebuild_daily_stats).
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from feedback.models import Feedback
+
+from .models import FeedbackDailyStat
+
+KEY_FIELDS = ('day', 'category', 'location_ref_id', 'status', 'feedback_type')
+VALUE_FIELDS = ('count', 'upvotes', 'downvotes', 'sentiment_sum', 'sentiment_count')
+# From this many rollup rows on, write_deltas() uses a few bulk statements instead of one upsert per row
+BATCH_MIN_KEYS = 20
+# Feedback fields a rollup row depends on; saves that touch none of them are skipped
+SNAPSHOT_FIELDS = ('created_at', 'category', 'location_ref_id', 'status', 'feedback_type', 'upvotes', 'downvotes', 'sentiment_score')
+
+
+def snapshot(feedback):
+    """The rollup-relevant state of a Feedback instance or a .values() row."""
+    if isinstance(feedback, dict):
+        return {field: feedback[field] for field in SNAPSHOT_FIELDS}
+    return {field: getattr(feedback, field) for field in SNAPSHOT_FIELDS}
+
+
+def row_key(state):
+    day = timezone.localtime(state['created_at']).date()
+    return (day, state['category'], state['location_ref_id'] or 0, state['status'], state['feedback_type'])
+
+
+def contribution(state):
+    score = state['sentiment_score']
+    return (1, state['upvotes'], state['downvotes'], score or 0.0, int(score is not None))
+
+
+def apply_changes(changes):
+    """Apply (before, after) snapshot pairs; None on one side means created or deleted."""
+    deltas = defaultdict(lambda: [0] * len(VALUE_FIELDS))
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            delta = deltas[row_key(state)]
+            for i, value in enumerate(contribution(state)):
+                delta[i] += sign * value
+    write_deltas(deltas)
+
+
+def record_votes(vote_deltas):
+    """Add {feedback_id: {'upvotes': n, 'downvotes': n}} counter changes to the feedbacks' rollup rows."""
+    deltas = defaultdict(lambda: [0] * len(VALUE_FIELDS))
+    rows = Feedback.objects.filter(pk__in=list(vote_deltas)).values('id', 'created_at', *KEY_FIELDS[1:])
+    for row in rows:
+        change = vote_deltas[row['id']]
+        delta = deltas[row_key(row)]
+        delta[1] += change.get('upvotes', 0)
+        delta[2] += change.get('downvotes', 0)
+    write_deltas(deltas)
+
+
+def write_deltas(deltas):
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if len(deltas) >= BATCH_MIN_KEYS:
+        write_deltas_batch(deltas)
+        return
+    # Sorted, so concurrent writers lock rollup rows in the same order
+    for key, delta in sorted(deltas.items()):
+        write_delta(key, delta)
+
+
+def write_delta(key, delta):
+    lookup = dict(zip(KEY_FIELDS, key))
+    updates = {field: F(field) + value for field, value in zip(VALUE_FIELDS, delta) if value}
+    if FeedbackDailyStat.objects.filter(**lookup).update(**updates):
+        if delta[0] < 0:  # A feedback moved out; drop the row if that emptied it
+            FeedbackDailyStat.objects.filter(**lookup, count__lte=0).delete()
+        return
+    try:
+        with transaction.atomic():
+            FeedbackDailyStat.objects.create(**lookup, **dict(zip(VALUE_FIELDS, delta)))
+    except IntegrityError:  # Created concurrently; add to it instead
+        FeedbackDailyStat.objects.filter(**lookup).update(**updates)
+
+
+def write_deltas_batch(deltas):
+    """
+    write_deltas() for many rollup rows (bulk writes). The existing rows are locked and read
+    in one query, then replaced with their new values (one DELETE, one INSERT keeping their
+    ids: far cheaper than a bulk_update CASE per column), and new keys go in one more INSERT.
+    """
+    lookup = {f'{field}__in': set(values) for field, values in zip(KEY_FIELDS, zip(*deltas))}
+    with transaction.atomic():
+        # A superset of the keys (each column IN its values); rows outside `deltas` are only locked
+        stats = FeedbackDailyStat.objects.select_for_update().filter(**lookup).order_by(*KEY_FIELDS)
+        existing = {tuple(getattr(stat, field) for field in KEY_FIELDS): stat for stat in stats}
+        changed, missing = [], {}
+        for key, delta in deltas.items():
+            stat = existing.get(key)
+            if stat is None:
+                missing[key] = delta
+                continue
+            for field, value in zip(VALUE_FIELDS, delta):
+                setattr(stat, field, getattr(stat, field) + value)
+            changed.append(stat)
+        FeedbackDailyStat.objects.filter(pk__in=[stat.pk for stat in changed]).delete()
+        FeedbackDailyStat.objects.bulk_create([stat for stat in changed if stat.count > 0], batch_size=500)
+        try:
+            with transaction.atomic():
+                FeedbackDailyStat.objects.bulk_create(
+                    [FeedbackDailyStat(**dict(zip(KEY_FIELDS, key)), **dict(zip(VALUE_FIELDS, delta))) for key, delta in missing.items()],
+                    batch_size=500,
+                )
+        except IntegrityError:  # Some were created concurrently; fall back to one upsert each
+            for key, delta in sorted(missing.items()):
+                write_delta(key, delta)
+
+
+def rebuild(batch_size=1000):
+    """Recompute the whole rollup table from Feedback in one aggregate query. Returns the row count."""
+    rows = (
+        Feedback.objects.annotate(day=TruncDate('created_at'), location_key=Coalesce('location_ref', 0))
+        .values('day', 'category', 'location_key', 'status', 'feedback_type')
+        .annotate(
+            count=Count('id'),
+            upvotes=Coalesce(Sum('upvotes'), 0),
+            downvotes=Coalesce(Sum('downvotes'), 0),
+            sentiment_sum=Coalesce(Sum('sentiment_score'), 0.0),
+            sentiment_count=Count('sentiment_score'),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        FeedbackDailyStat.objects.all().delete()
+        stats = FeedbackDailyStat.objects.bulk_create(
+            (FeedbackDailyStat(location_ref_id=row.pop('location_key'), **row) for row in rows.iterator(chunk_size=batch_size)),
+            batch_size=batch_size,
+        )
+    return len(stats)
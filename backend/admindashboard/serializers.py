@@ -0,0 +1,54 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from django.conf import settings
+
+from .bulk_actions import ACTIONS, allowed_values
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'status', 'file_format', 'gzip', 'location_ref_id', 'filters', 'rows_total', 'rows_written',
+            'progress', 'file_size', 'last_error', 'created_at', 'finished_at', 'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, job):
+        """Fraction of rows written, 0.0 to 1.0."""
+        if job.status == ExportJob.Status.DONE:
+            return 1.0
+        if not job.rows_total:
+            return 0.0
+        return min(job.rows_written / job.rows_total, 1.0)
+
+    def get_download_url(self, job):
+        if job.status != ExportJob.Status.DONE:
+            return None
+        url = reverse("export-job-download", args=[job.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class BulkActionSerializer(serializers.Serializer):
+    """A bulk action request: the action, its value, and either `ids` or a `filter` expression."""
+    action = serializers.ChoiceField(choices=list(ACTIONS))
+    value = serializers.CharField()
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False,
+        max_length=settings.BULK_ACTIONS["MAX_IDS"],
+    )
+    filter = serializers.DictField(child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Give either ids or a filter.")
+        allowed = allowed_values(data["action"])
+        if data["value"] not in allowed:
+            raise serializers.ValidationError({"value": f"Choose one of: {', '.join(allowed)}."})
+        return data
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from feedback.models import Feedback
+
+from . import rollups
+
+
+def touches_rollup(update_fields):
+    if update_fields is None:
+        return True
+    fields = {'location_ref_id' if field == 'location_ref' else field for field in update_fields}
+    return bool(set(rollups.SNAPSHOT_FIELDS) & fields)
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_rollup_state(sender, instance, update_fields=None, **kwargs):
+    """Read the stored state before an update, so post_save can move the feedback between rollup rows."""
+    if instance._state.adding or not touches_rollup(update_fields):
+        return
+    instance._rollup_before = Feedback.objects.filter(pk=instance.pk).values(*rollups.SNAPSHOT_FIELDS).first()
+
+
+@receiver(post_save, sender=Feedback)
+def update_daily_stats(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        rollups.apply_changes([(None, rollups.snapshot(instance))])
+    elif touches_rollup(update_fields):
+        before = instance.__dict__.pop('_rollup_before', None)
+        after = rollups.snapshot(instance)
+        if before is not None and update_fields is not None:
+            # Columns the save didn't write keep their stored values (the instance may hold stale counters)
+            saved = {'location_ref_id' if field == 'location_ref' else field for field in update_fields}
+            after = {field: after[field] if field in saved else before[field] for field in after}
+        rollups.apply_changes([(before, after)])
+
+
+@receiver(post_delete, sender=Feedback)
+def remove_from_daily_stats(sender, instance, **kwargs):
+    rollups.apply_changes([(rollups.snapshot(instance), None)])
@@ -1,3 +1,346 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from admindashboard import export, export_jobs, rollups
+from admindashboard.models import ExportJob, FeedbackDailyStat
+from authentication.models import UserAccount
+from feedback import priority
+from feedback.models import Feedback
+from votes.services import cast_vote
+
+
+class DashboardTestCase(TestCase):
+    """Four feedbacks: three filed under Pune (the authority's area, in two spellings), one in Mumbai."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authority = UserAccount.objects.create_user(
+            email='authority@example.com', password='pw', first_name='A', last_name='B', phone='1',
+            role=UserAccount.Role.ADMIN, address='12 MG Road, Pune', work_location='Pune City',
+        )
+        cls.staff = UserAccount.objects.create_user(
+            email='staff@example.com', password='pw', first_name='S', last_name='T', phone='2', is_staff=True,
+        )
+        old = timezone.now() - timedelta(days=20)
+        rows = [
+            ('Pune', Feedback.Status.SUBMITTED, 'WATER', 'HIGH', timezone.now()),
+            ('Pune', Feedback.Status.UNDER_REVIEW, 'WATER', 'MEDIUM', timezone.now()),
+            ('PUNE, Maharashtra', Feedback.Status.RESOLVED, 'HEALTHCARE', 'HIGH', old),
+            ('Mumbai', Feedback.Status.SUBMITTED, 'ELECTRICITY', 'HIGH', timezone.now()),
+        ]
+        feedbacks = [
+            Feedback(
+                user=cls.authority, title=f"Issue {i}", description="Details", feedback_type='COMPLAINT',
+                location=location, status=status, category=category, urgency=urgency, created_at=created_at,
+            )
+            for i, (location, status, category, urgency, created_at) in enumerate(rows)
+        ]
+        for feedback in feedbacks:
+            feedback.assign_location()
+            feedback.assign_priority()
+        Feedback.objects.bulk_create(feedbacks)
+        rollups.rebuild()  # bulk_create skips the rollup signals
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+
+class AdminDashboardViewTests(DashboardTestCase):
+    def get_dashboard(self, user, query=''):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/api/admin-dashboard/dashboard/{query}')
+
+    def test_query_budget(self):
+        # One aggregate over the daily rollups plus the top-priority list
+        with self.assertNumQueries(2):
+            response = self.get_dashboard(self.staff)
+        self.assertEqual(response.status_code, 200)
+
+    def test_counts_use_status_values(self):
+        data = self.get_dashboard(self.staff).data
+        self.assertEqual(data['total_feedback'], 4)
+        self.assertEqual(data['pending_feedback'], 2)
+        self.assertEqual(data['in_progress_feedback'], 1)
+        self.assertEqual(data['resolved_feedback'], 1)
+        self.assertEqual(data['feedback_trends'], {'last_7_days': 3, 'last_15_days': 3, 'last_30_days': 4})
+        self.assertEqual(len(data['top_priority_issues']), 2)  # Open HIGH urgency only
+
+    def test_trends_count_exactly_that_many_days(self):
+        for days_ago in (6, 7):
+            Feedback.objects.create(
+                user=self.authority, title=f"{days_ago} days ago", description="Details", feedback_type='COMPLAINT',
+                location='Pune', created_at=timezone.now() - timedelta(days=days_ago),
+            )
+        data = self.get_dashboard(self.staff).data
+        self.assertEqual(data['feedback_trends'], {'last_7_days': 4, 'last_15_days': 5, 'last_30_days': 6})
+
+    def test_authority_is_scoped_to_their_location(self):
+        data = self.get_dashboard(self.authority, '?location=Mumbai').data
+        self.assertEqual(data['total_feedback'], 3)
+        self.assertEqual(
+            sorted((row['category'], row['total']) for row in data['category_stats']),
+            [('HEALTHCARE', 1), ('WATER', 2)],
+        )
+
+    def test_staff_location_filter_matches_spellings(self):
+        self.assertEqual(self.get_dashboard(self.staff, '?location=pune%20city').data['total_feedback'], 3)
+        self.assertEqual(self.get_dashboard(self.staff, '?location=Nowhere').data['total_feedback'], 0)
+
+
+    def test_triage_queue_orders_open_items_by_priority(self):
+        client = APIClient()
+        client.force_authenticate(self.authority)
+        with self.assertNumQueries(2):  # The page plus the per-status counts
+            data = client.get('/api/admin-dashboard/queue/').data
+        self.assertEqual([row['urgency'] for row in data['results']], ['HIGH', 'MEDIUM'])
+        self.assertEqual(data['counts']['SUBMITTED'], 1)
+        self.assertEqual(data['counts']['RESOLVED'], 1)
+        resolved = client.get('/api/admin-dashboard/queue/?status=RESOLVED').data['results']
+        self.assertEqual([row['category'] for row in resolved], ['HEALTHCARE'])
+
+
+    def test_bulk_action_stays_in_scope_and_keeps_derived_data(self):
+        client = APIClient()
+        client.force_authenticate(self.authority)
+        response = client.post('/api/admin-dashboard/bulk-actions/', {
+            'action': 'set_category', 'value': 'SANITATION', 'filter': {'status': 'SUBMITTED'},
+        }, format='json')
+        self.assertEqual((response.data['matched'], response.data['updated']), (1, 1))  # Mumbai is out of scope
+        self.assertEqual(Feedback.objects.filter(category='SANITATION').count(), 1)
+
+        response = client.post('/api/admin-dashboard/bulk-actions/', {
+            'action': 'set_urgency', 'value': 'LOW', 'ids': list(Feedback.objects.values_list('id', flat=True)),
+        }, format='json')
+        self.assertEqual((response.data['matched'], response.data['updated']), (3, 3))
+
+        feedbacks = list(Feedback.objects.all())
+        stats = sorted(FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS))
+        scores = {feedback.pk: feedback.priority_score for feedback in feedbacks}
+        moved = next(feedback for feedback in feedbacks if feedback.category == 'SANITATION')
+        keywords = moved.keywords
+        moved.build_keywords()
+        self.assertEqual(keywords, moved.keywords)
+        rollups.rebuild()
+        priority.rebuild()
+        self.assertEqual(stats, sorted(FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS)))
+        for pk, score in Feedback.objects.values_list('id', 'priority_score'):
+            self.assertAlmostEqual(scores[pk], score)
+
+    def test_partial_saves_keep_concurrent_vote_counts(self):
+        feedback = Feedback.objects.filter(location='Pune').first()
+        stale = Feedback.objects.get(pk=feedback.pk)  # Read before the votes landed
+        cast_vote(self.staff, feedback.pk, 1)
+        stale.urgency = 'LOW'
+        stale.save(update_fields=['urgency', 'updated_at'])
+        cast_vote(self.authority, feedback.pk, 1)
+        self.client_for(self.staff).post(f'/api/admin-dashboard/assign-feedback/{feedback.pk}/', {'category': 'SANITATION'})
+        feedback.refresh_from_db()
+        self.assertEqual((feedback.category, feedback.urgency, feedback.upvotes), ('SANITATION', 'LOW', 2))
+        self.assertIn('sanitation', feedback.keywords)
+        incremental = sorted(FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS))
+        rollups.rebuild()
+        self.assertEqual(incremental, sorted(FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS)))
+
+    def test_bulk_action_rejects_filters_that_would_match_everything(self):
+        client = self.client_for(self.staff)
+        for expression in ({'staus': 'SUBMITTED'}, {'status': 'SUBMITTED', 'urgncy': 'HIGH'}, {'category': ''}):
+            response = client.post('/api/admin-dashboard/bulk-actions/', {
+                'action': 'set_status', 'value': 'RESOLVED', 'filter': expression,
+            }, format='json')
+            self.assertEqual(response.status_code, 400, expression)
+            self.assertIn('filter', response.data)
+        self.assertEqual(Feedback.objects.filter(status=Feedback.Status.RESOLVED).count(), 1)
+
+    def test_bulk_action_validates_the_value(self):
+        client = APIClient()
+        client.force_authenticate(self.authority)
+        response = client.post('/api/admin-dashboard/bulk-actions/', {
+            'action': 'set_status', 'value': 'DONE', 'ids': [1],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportFeedbackViewTests(DashboardTestCase):
+    url = '/api/admin-dashboard/feedback-export/'
+
+    def export(self, user, query=''):
+        response = self.client_for(user).get(f'{self.url}{query}')
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_has_a_header_and_one_row_per_feedback(self):
+        response, body = self.export(self.staff)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('feedback_export.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], [title for _, title in export.COLUMNS])
+        self.assertEqual([row[0] for row in rows[1:]], [str(pk) for pk in Feedback.objects.order_by('id').values_list('id', flat=True)])
+
+    def test_gzipped_json_lines_with_filters(self):
+        response, body = self.export(self.staff, '?file_format=jsonl&gzip=1&category=WATER')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        records = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+        self.assertEqual({record['category'] for record in records}, {'WATER'})
+        self.assertEqual(len(records), 2)
+
+    def test_authority_only_exports_their_location(self):
+        _, body = self.export(self.authority, '?file_format=jsonl')
+        locations = {json.loads(line)['location'] for line in body.splitlines()}
+        self.assertEqual(locations, {'Pune', 'PUNE, Maharashtra'})
+
+    def test_rejects_unknown_formats_and_civilians(self):
+        self.assertEqual(self.client_for(self.staff).get(f'{self.url}?file_format=xml').status_code, 400)
+        civilian = UserAccount.objects.create_user(email='civ@example.com', password='pw', first_name='C', last_name='D', phone='5')
+        self.assertEqual(self.client_for(civilian).get(self.url).status_code, 403)
+
+
+class ExportJobTests(DashboardTestCase):
+    url = '/api/admin-dashboard/export-jobs/'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(EXPORT_ROOT=Path(directory.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def request_export(self, user, data=None):
+        return self.client_for(user).post(self.url, data or {'file_format': 'csv'}, format='json')
+
+    def run_jobs(self):
+        return export_jobs.run_worker(once=True, log=lambda message: None)
+
+    def download(self, user, job_id, **headers):
+        response = self.client_for(user).get(f'{self.url}{job_id}/download/', headers=headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_job_runs_and_is_reused_until_the_data_changes(self):
+        response = self.request_export(self.authority)
+        self.assertEqual((response.status_code, response.data['status'], response.data['rows_total']), (202, 'PENDING', 3))
+        job_id = response.data['id']
+        self.assertEqual(self.run_jobs(), 1)
+
+        data = self.client_for(self.authority).get(f'{self.url}{job_id}/').data
+        self.assertEqual((data['status'], data['rows_written'], data['progress']), ('DONE', 3, 1.0))
+        self.assertTrue(data['download_url'].endswith(f'/export-jobs/{job_id}/download/'))
+
+        response = self.request_export(self.authority)
+        self.assertEqual((response.status_code, response.data['id']), (200, job_id))
+        Feedback.objects.filter(location='Pune').first().save()
+        self.assertEqual(self.request_export(self.authority).status_code, 202)
+
+    def test_range_requests_resume_a_download(self):
+        job_id = self.request_export(self.staff).data['id']
+        self.run_jobs()
+        response, whole = self.download(self.staff, job_id)
+        self.assertEqual((response.status_code, response['Accept-Ranges']), (200, 'bytes'))
+        self.assertEqual(len(whole.decode().splitlines()), 5)  # Header and four rows
+
+        response, part = self.download(self.staff, job_id, Range='bytes=10-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-{len(whole) - 1}/{len(whole)}')
+        self.assertEqual(part, whole[10:])
+        _, tail = self.download(self.staff, job_id, Range='bytes=-5')
+        self.assertEqual(tail, whole[-5:])
+
+        response, content = self.download(self.staff, job_id, Range='bytes=0-9', **{'If-Range': '"stale"'})
+        self.assertEqual((response.status_code, content), (200, whole))
+        response, _ = self.download(self.staff, job_id, Range=f'bytes={len(whole)}-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{len(whole)}'))
+
+    def test_jobs_are_private_to_their_location(self):
+        other = UserAccount.objects.create_user(
+            email='mumbai@example.com', password='pw', first_name='M', last_name='N', phone='6',
+            role=UserAccount.Role.ADMIN, work_location='Mumbai',
+        )
+        job_id = self.request_export(self.authority).data['id']
+        self.run_jobs()
+        self.assertEqual(self.client_for(other).get(f'{self.url}{job_id}/').status_code, 404)
+        self.assertEqual(self.download(other, job_id)[0].status_code, 404)
+        self.assertEqual(self.client_for(self.staff).get(f'{self.url}{job_id}/').status_code, 200)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job_id = self.request_export(self.staff).data['id']
+        with mock.patch.object(export, 'stream', side_effect=RuntimeError("disk full")):
+            job = export_jobs.claim_job()
+            with self.assertRaises(RuntimeError):
+                export_jobs.run_job(job)
+            export_jobs.fail_job(job, "disk full")
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.last_error), (ExportJob.Status.PENDING, 1, "disk full"))
+            self.run_jobs()  # Retries until attempts run out
+            job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ExportJob.Status.FAILED, settings.EXPORT_JOBS['MAX_ATTEMPTS']))
+        self.assertEqual(self.download(self.staff, job_id)[0].status_code, 404)
+        self.assertEqual(list(settings.EXPORT_ROOT.iterdir()), [])  # No partial file left behind
+
+    def test_expired_files_are_purged(self):
+        job_id = self.request_export(self.staff).data['id']
+        self.run_jobs()
+        job = ExportJob.objects.get(pk=job_id)
+        ExportJob.objects.filter(pk=job_id).update(finished_at=timezone.now() - timedelta(days=settings.EXPORT_JOBS['RETENTION_DAYS'] + 1))
+        self.assertEqual(export_jobs.purge_expired(), 1)
+        self.assertFalse(export_jobs.artifact_path(job).exists())
+        self.assertEqual(self.request_export(self.staff).status_code, 202)
+
+
+class PriorityScoreTests(TestCase):
+    def test_incremental_updates_match_rebuild(self):
+        user = UserAccount.objects.create_user(
+            email='voter@example.com', password='pw', first_name='V', last_name='W', phone='4',
+        )
+        feedback = Feedback.objects.create(
+            user=user, title="Issue", description="Details", feedback_type='COMPLAINT', category='WATER',
+        )
+        feedback.urgency = 'HIGH'
+        feedback.save(update_fields=['urgency'])
+        # Writes that skip save() move the stored score by deltas
+        cast_vote(user, feedback.pk, 1)
+        Feedback.objects.filter(pk=feedback.pk).update(
+            sentiment_score=-0.8, priority_score=priority.sentiment_update(-0.8),
+        )
+        Feedback.objects.filter(pk=feedback.pk).update(urgency='LOW', priority_score=priority.urgency_update('LOW'))
+
+        stored = Feedback.objects.values_list('priority_score', flat=True).get(pk=feedback.pk)
+        priority.rebuild()
+        self.assertAlmostEqual(stored, Feedback.objects.values_list('priority_score', flat=True).get(pk=feedback.pk))
+
+
+class DailyStatRollupTests(TestCase):
+    def test_incremental_updates_match_rebuild(self):
+        user = UserAccount.objects.create_user(
+            email='civilian@example.com', password='pw', first_name='C', last_name='D', phone='3',
+        )
+        feedbacks = [
+            Feedback.objects.create(
+                user=user, title=f"Issue {i}", description="Details", feedback_type='COMPLAINT',
+                category='WATER', location='Pune',
+            )
+            for i in range(3)
+        ]
+        feedbacks[0].status = Feedback.Status.RESOLVED
+        feedbacks[0].sentiment_score = -0.5
+        feedbacks[0].save()
+        cast_vote(user, feedbacks[1].pk, 1)
+        feedbacks[2].delete()
+
+        def table():
+            return sorted(FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS))
+
+        incremental = table()
+        rollups.rebuild()
+        self.assertEqual(incremental, table())
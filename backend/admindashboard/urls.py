@@ -1,8 +1,22 @@
 from django.urls import path
-from .views import AdminDashboardView, AssignFeedbackView, ExportFeedbackView
+from .views import (
+    AdminDashboardView,
+    AssignFeedbackView,
+    BulkActionView,
+    ExportFeedbackView,
+    ExportJobCreateView,
+    ExportJobDetailView,
+    ExportJobDownloadView,
+    TriageQueueView,
+)
 
 urlpatterns = [
     path("dashboard/", AdminDashboardView.as_view(), name="admin-dashboard"),
     path("assign-feedback/<int:feedback_id>/", AssignFeedbackView.as_view(), name="assign-feedback"),
     path("feedback-export/", ExportFeedbackView.as_view(), name="feedback-export"),
+    path("export-jobs/", ExportJobCreateView.as_view(), name="export-job-create"),
+    path("export-jobs/<int:pk>/", ExportJobDetailView.as_view(), name="export-job-detail"),
+    path("export-jobs/<int:pk>/download/", ExportJobDownloadView.as_view(), name="export-job-download"),
+    path("queue/", TriageQueueView.as_view(), name="triage-queue"),
+    path("bulk-actions/", BulkActionView.as_view(), name="bulk-actions"),
 ]
@@ -5,55 +5,86 @@ from django.utils.timezone import now, timedelta
 from django.db.models import Count
 from feedback.models import Feedback
 from authentication.utils import CookieJWTAuthentication
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-import csv
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.utils.timezone import now
 from datetime import timedelta
-from django.db.models import Count
-from feedback.models import Feedback
+from django.db.models import Count, Q, Sum
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound, ValidationError
+from functools import cached_property
+from rest_framework import generics
+from feedback import priority
+from feedback.filters import ExportFilter
+from feedback.models import OPEN_STATUSES, Feedback
+from feedback.pagination import FeedbackCursorPagination
+from feedback.views import LeanListMixin
+from authentication.models import UserAccount
+from . import bulk_actions, export, export_jobs
+from .access import admin_location, scoped
+from .downloads import ranged_file_response
+from .models import ExportJob, FeedbackDailyStat
+from .serializers import BulkActionSerializer, ExportJobSerializer
+
 
 class AdminDashboardView(APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
 
     def get(self, request):
-        today = now()
-
-        total_feedback = Feedback.objects.count()
-        resolved_feedback = Feedback.objects.filter(status="resolved").count()
-        pending_feedback = Feedback.objects.filter(status="pending").count()
-        in_progress_feedback = Feedback.objects.filter(status="in-progress").count()
-
-        category_stats = Feedback.objects.values("category").annotate(total=Count("id"))
-
-        last_7_days = Feedback.objects.filter(created_at__gte=today - timedelta(days=7)).count()
-        last_15_days = Feedback.objects.filter(created_at__gte=today - timedelta(days=15)).count()
-        last_30_days = Feedback.objects.filter(created_at__gte=today - timedelta(days=30)).count()
+        today = now().date()
+        location = admin_location(request)
+        Status = Feedback.Status
+
+        def total(**filters):
+            return Coalesce(Sum("count", filter=Q(**filters)), 0)
+
+        # Every counter in one pass over the daily rollups (see admindashboard/rollups.py)
+        counts = {
+            "total_feedback": Coalesce(Sum("count"), 0),
+            "resolved_feedback": total(status=Status.RESOLVED),
+            "pending_feedback": total(status=Status.SUBMITTED),
+            "in_progress_feedback": total(status=Status.UNDER_REVIEW),
+            "rejected_feedback": total(status=Status.REJECTED),
+        }
+        for days in (7, 15, 30):
+            counts[f"last_{days}_days"] = total(day__gte=today - timedelta(days=days - 1))  # Today is one of them
+        for category in Feedback.Category.values:
+            counts[f"category_{category}"] = total(category=category)
+        totals = scoped(FeedbackDailyStat.objects.all(), location).aggregate(**counts)
+
+        category_stats = [
+            {"category": category, "total": totals[f"category_{category}"]}
+            for category in Feedback.Category.values
+            if totals[f"category_{category}"]
+        ]
 
         top_priority_issues = (
-            Feedback.objects.filter(urgency__gte=7)
-            .values("category", "title", "urgency")
-            .order_by("-urgency")[:5]  # Sort by urgency (high to low)
+            scoped(Feedback.objects.all(), location)
+            .filter(urgency="HIGH", status__in=[Status.SUBMITTED, Status.UNDER_REVIEW])
+            .values("id", "category", "title", "urgency")
+            .order_by("-created_at")[:5]  # Newest open high-urgency issues
         )
 
         return Response({
-            "total_feedback": total_feedback,
-            "resolved_feedback": resolved_feedback,
-            "pending_feedback": pending_feedback,
-            "in_progress_feedback": in_progress_feedback,
+            "total_feedback": totals["total_feedback"],
+            "resolved_feedback": totals["resolved_feedback"],
+            "pending_feedback": totals["pending_feedback"],
+            "in_progress_feedback": totals["in_progress_feedback"],
+            "rejected_feedback": totals["rejected_feedback"],
             "category_stats": category_stats,
             "feedback_trends": {
-                "last_7_days": last_7_days,
-                "last_15_days": last_15_days,
-                "last_30_days": last_30_days
+                "last_7_days": totals["last_7_days"],
+                "last_15_days": totals["last_15_days"],
+                "last_30_days": totals["last_30_days"],
             },
-            "top_priority_issues": top_priority_issues
+            "top_priority_issues": list(top_priority_issues),
         })
 
 class AssignFeedbackView(APIView):
@@ -61,45 +92,157 @@ class AssignFeedbackView(APIView):
     authentication_classes = [JWTAuthentication]
     def post(self, request, feedback_id):
         try:
-            feedback = Feedback.objects.get(id=feedback_id)
             category = request.data.get("category")
 
             if not category:
                 return Response({"error": "Category is required"}, status=400)
 
-            feedback.category = category
-            feedback.save()
+            with transaction.atomic():
+                feedback = Feedback.objects.select_for_update().get(id=feedback_id)
+                feedback.category = category
+                # Only the category (and what derives from it), leaving the vote counters to their F() updates
+                feedback.save(update_fields=["category", "updated_at"])
             return Response({"message": "Feedback assigned successfully"})
         except Feedback.DoesNotExist:
             return Response({"error": "Feedback not found"}, status=404)
 
 class ExportFeedbackView(APIView):
+    """
+    Stream feedback as CSV (default) or JSON Lines (?file_format=jsonl), gzipped with ?gzip=1.
+    Filters: category, status, location, created_after, created_before (ISO date or datetime).
+    """
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
-    
-    
+
     def get(self, request):
-        category_filter = request.GET.get("category", None)
-        feedbacks = Feedback.objects.all()
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in export.FORMATS:
+            raise ValidationError({"file_format": f"Choose one of: {', '.join(export.FORMATS)}."})
+        compress = request.query_params.get("gzip") in ("1", "true")
+
+        feedbacks = scoped(Feedback.objects.all(), admin_location(request))
+        filterset = ExportFilter(request.query_params, queryset=feedbacks)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        _, content_type, extension = export.FORMATS[file_format]
+        filename = f"feedback_export.{extension}" + (".gz" if compress else "")
+        response = StreamingHttpResponse(
+            export.stream(filterset.qs, file_format, gzip=compress),
+            content_type="application/gzip" if compress else content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
-        if category_filter:
-            feedbacks = feedbacks.filter(category=category_filter)
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="feedback_export.csv"'
+def get_export_job(request, pk):
+    """An export job the requester may see: staff see every job, authorities those of their location."""
+    location = admin_location(request)
+    job = ExportJob.objects.filter(pk=pk).first()
+    if job is None or not (request.user.is_staff or job.location_ref_id == location):
+        raise NotFound("Export job not found.")
+    return job
 
-        writer = csv.writer(response)
-        writer.writerow(["ID", "User", "Category", "Title", "Urgency", "Status", "Created At"])
 
-        for feedback in feedbacks:
-            writer.writerow([
-                feedback.id, 
-                feedback.user.name, 
-                feedback.category, 
-                feedback.title, 
-                feedback.urgency, 
-                "Resolved" if feedback.is_resolved else "Pending",
-                feedback.created_at.strftime("%Y-%m-%d %H:%M")
-            ])
+class ExportJobCreateView(APIView):
+    """
+    Queue a background export (same parameters as the streaming export). Answers 202 with a new
+    job, or 200 with an earlier one for the same scope and filters if the data hasn't changed since.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request):
+        params = request.data or request.query_params
+        job, created = export_jobs.request_export(request.user, admin_location(request), params)
+        data = ExportJobSerializer(job, context={"request": request}).data
+        return Response(data, status=202 if created else 200)
+
+
+class ExportJobDetailView(APIView):
+    """Status and progress of an export job, with the download URL once it is done."""
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request, pk):
+        job = get_export_job(request, pk)
+        return Response(ExportJobSerializer(job, context={"request": request}).data)
 
+
+class ExportJobDownloadView(APIView):
+    """The finished export file; supports Range requests so interrupted downloads can resume."""
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request, pk):
+        job = get_export_job(request, pk)
+        path = export_jobs.artifact_path(job)
+        if job.status != ExportJob.Status.DONE or not path.is_file():
+            raise NotFound("Export file is not available.")
+        content_type = "application/gzip" if job.gzip else export.FORMATS[job.file_format][1]
+        return ranged_file_response(request, path, job.file_name, content_type, etag=f'"{job.watermark}"')
+
+
+
+class TriageQueueView(LeanListMixin, generics.ListAPIView):
+    """
+    An authority's inbox: feedback in their location, highest priority first (see
+    feedback/priority.py). Open items by default, or one ?status=. Pages of ?page_size= come
+    from keyset pagination over a priority index, so every page is a short index range read;
+    "counts" has the number of items per status, from the daily rollups.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+    filter_backends = []
+    pagination_class = FeedbackCursorPagination
+    cursor_ordering = "-priority_score"
+    ordering_fields = []
+
+    @cached_property
+    def location(self):
+        return admin_location(self.request)
+
+    def get_queryset(self):
+        feedbacks = scoped(Feedback.objects.all(), self.location)
+        status = self.request.query_params.get("status")
+        if status is None:
+            return feedbacks.filter(status__in=OPEN_STATUSES)
+        if status not in Feedback.Status.values:
+            raise ValidationError({"status": f"Choose one of: {', '.join(Feedback.Status.values)}."})
+        return feedbacks.filter(status=status)
+
+    def prepare_rows(self, rows):
+        moment = now()
+        for row in rows:
+            row["priority"] = round(priority.current(row["priority_score"], moment), 2)
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        totals = dict(
+            scoped(FeedbackDailyStat.objects.all(), self.location)
+            .values_list("status")
+            .annotate(total=Sum("count"))
+            .order_by()
+        )
+        response.data["counts"] = {status: totals.get(status, 0) for status in Feedback.Status.values}
         return response
+
+
+class BulkActionView(APIView):
+    """
+    Set the status, category or urgency of many feedbacks in one request:
+    {"action": "set_status", "value": "RESOLVED", "ids": [...]} or with "filter": {"category": ...,
+    "location": ..., "created_before": ...} instead of ids. Authorities only reach feedback in
+    their location. Runs as chunked UPDATEs (see admindashboard/bulk_actions.py).
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request):
+        serializer = BulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = bulk_actions.apply_action(
+            admin_location(request), data["action"], data["value"], ids=data.get("ids"), filters=data.get("filter"),
+        )
+        return Response({"action": data["action"], "value": data["value"], **result})
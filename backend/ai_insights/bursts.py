@@ -0,0 +1,143 @@
+"""
+Burst detection over the daily rollups.
+
+Every group (a category, a location, or a category in a location) is compared with its own
+history instead of with the other groups. The rollups (FeedbackDailyStat) give one
+groups x days count matrix. Over the baseline days the EWMA gives the expected daily count
+and its weighted variance. The window's daily mean is then tested against that:
+
+    z = (window mean - expected) / (sd / sqrt(window days)),  sd = sqrt(max(variance, expected, 1))
+
+The Poisson floor (variance >= expected >= 1) keeps quiet groups from scoring huge z values on
+a couple of feedbacks. Everything is one query plus a few vectorized NumPy passes, so the cost
+is groups x days whatever the number of feedbacks. Results are cached per (scope, window, day).
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Sum
+from django.utils.timezone import localdate
+
+from admindashboard.access import scoped
+from admindashboard.models import FeedbackDailyStat
+from feedback.models import Location
+
+LEVELS = {
+    'pair': ('category', 'location_id'),
+    'category': ('category',),
+    'location': ('location_id',),
+}
+
+
+def burst_setting(name):
+    return settings.BURSTS[name]
+
+
+def daily_matrix(scope, start, days):
+    """(group keys, groups x days count matrix) of (category, location id) pairs since `start`, from the rollups."""
+    rows = (
+        scoped(FeedbackDailyStat.objects.filter(day__gte=start), scope)
+        .values('category', 'location_ref_id', 'day')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    keys, index, cells = [], {}, []
+    for row in rows:
+        key = (row['category'], row['location_ref_id'])
+        if key not in index:
+            index[key] = len(keys)
+            keys.append(key)
+        cells.append((index[key], (row['day'] - start).days, row['total']))
+
+    matrix = np.zeros((len(keys), days), dtype=np.float64)
+    if cells:
+        group, day, total = np.array(cells).T
+        np.add.at(matrix, (group.astype(int), day.astype(int)), total)
+    return keys, matrix
+
+
+def roll_up(keys, matrix, fields):
+    """Sum the pair rows of `matrix` into groups keyed by `fields` (a LEVELS value)."""
+    positions = [LEVELS['pair'].index(field) for field in fields]
+    group_keys, index = [], {}
+    rows = np.empty(len(keys), dtype=int)
+    for i, key in enumerate(keys):
+        group = tuple(key[position] for position in positions)
+        if group not in index:
+            index[group] = len(group_keys)
+            group_keys.append(group)
+        rows[i] = index[group]
+    grouped = np.zeros((len(group_keys), matrix.shape[1]))
+    np.add.at(grouped, rows, matrix)
+    return group_keys, grouped
+
+
+def score(matrix, window_days):
+    """Vectorized scores of every row: (window total, expected daily, z, growth)."""
+    baseline, window = matrix[:, :-window_days], matrix[:, -window_days:]
+    baseline_days = baseline.shape[1]
+
+    # EWMA weights over the baseline, the most recent day weighing most
+    weights = (1 - burst_setting('EWMA_ALPHA')) ** np.arange(baseline_days - 1, -1, -1)
+    weights /= weights.sum()
+    expected = baseline @ weights
+    variance = ((baseline - expected[:, None]) ** 2) @ weights
+    sd = np.sqrt(np.maximum(np.maximum(variance, expected), 1.0))
+
+    window_total = window.sum(axis=1)
+    z = (window_total / window_days - expected) / (sd / np.sqrt(window_days))
+    growth = ((window_total + 1) / window_days) / ((baseline.sum(axis=1) + 1) / baseline_days)
+    return window_total, expected, z, growth
+
+
+def location_names(keys):
+    """{location id: name} of the locations among the pair keys, from one query (0 is "no location")."""
+    ids = {key[1] for key in keys} - {0}
+    return {0: '', **dict(Location.objects.filter(pk__in=ids).values_list('pk', 'name'))}
+
+
+def detect(scope=None, window_days=None, baseline_days=None):
+    """
+    {level: [group scores ranked by z]} for every LEVELS entry. Each entry has the group's
+    fields plus "location" (the name of location_id), "total" (feedback in the window),
+    "expected" (baseline daily EWMA), "z_score", "growth" (window vs baseline daily rate) and
+    "anomaly" (z and total above the thresholds).
+    """
+    window_days = window_days or burst_setting('WINDOW_DAYS')
+    baseline_days = baseline_days or burst_setting('BASELINE_DAYS')
+    today = localdate()
+    key = f"bursts:{scope if scope is not None else 'all'}:{window_days}:{baseline_days}:{today.isoformat()}"
+    cache = caches[burst_setting('CACHE_ALIAS')]
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    days = baseline_days + window_days
+    keys, matrix = daily_matrix(scope, today - timedelta(days=days - 1), days)
+    names = location_names(keys)
+    result = {}
+    for level, fields in LEVELS.items():
+        group_keys, grouped = roll_up(keys, matrix, fields) if level != 'pair' else (keys, matrix)
+        if not group_keys:
+            result[level] = []
+            continue
+        totals, expected, z, growth = score(grouped, window_days)
+        ranked = []
+        for i in np.argsort(-z, kind='stable'):
+            group = dict(zip(fields, group_keys[i]))
+            if 'location_id' in group:
+                group['location'] = names.get(group['location_id'], '')
+            ranked.append({
+                **group,
+                "total": int(totals[i]),
+                "expected": round(float(expected[i]), 3),
+                "z_score": round(float(z[i]), 3),
+                "growth": round(float(growth[i]), 3),
+                "anomaly": bool(z[i] >= burst_setting('MIN_Z') and totals[i] >= burst_setting('MIN_COUNT')),
+            })
+        result[level] = ranked
+
+    cache.set(key, result, timeout=burst_setting('CACHE_SECONDS'))
+    return result
@@ -0,0 +1,157 @@
+"""
+AI insights with a watermark-keyed, stale-while-revalidate cache.
+
+The Gemini analysis is the expensive part (a paid, blocking call), so it is cached per
+(scope, window) together with the data watermark it was computed from: the row count, latest
+updated_at and sentiment totals of the feedback in the window. While the watermark matches, the cached
+result is served as is. Once the data moves on, the last good analysis is still served right
+away (with fresh rollup numbers and bursts) and a background thread recomputes it; a cache lock keeps
+that to one refresh at a time. Only a cold cache waits for Gemini.
+"""
+import threading
+from datetime import timedelta
+
+import google.generativeai as genai
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from django.db.models import Count, Max, Sum
+from django.utils.timezone import now
+
+from admindashboard.access import scoped
+from admindashboard.models import FeedbackDailyStat
+from feedback.models import Feedback
+
+from .bursts import detect
+from .topics import latest_summary
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+def insights_setting(name):
+    return settings.AI_INSIGHTS[name]
+
+
+def _cache():
+    return caches[insights_setting('CACHE_ALIAS')]
+
+
+def cache_key(scope, days, suffix='result'):
+    return f"ai-insights:{scope if scope is not None else 'all'}:{days}:{suffix}"
+
+
+def window_feedback(scope, since):
+    return scoped(Feedback.objects.filter(created_at__gte=since), scope)
+
+
+def data_watermark(scope, since):
+    """
+    (row count, latest updated_at, sentiment count and sum) of the feedback in the window, as a
+    string. The scorer writes sentiment without touching updated_at, hence the sentiment part.
+    """
+    state = window_feedback(scope, since).aggregate(
+        count=Count('id'), last_update=Max('updated_at'), scored=Count('sentiment_score'), sentiment=Sum('sentiment_score'),
+    )
+    last_update = state['last_update'].isoformat() if state['last_update'] else ''
+    return f"{state['count']}:{last_update}:{state['scored']}:{state['sentiment']}"
+
+
+def sentiment_trend(scope, since):
+    """Average sentiment score per day, from the daily rollups (cost follows the window, not the table)."""
+    stats = scoped(FeedbackDailyStat.objects.filter(day__gte=since.date()), scope)
+    return [
+        {
+            "day": row["day"],
+            "sentiment_score": row["sentiment_sum"] / row["sentiment_count"] if row["sentiment_count"] else None,
+            "count": row["sentiment_count"],
+        }
+        for row in stats.values("day")
+        .annotate(sentiment_sum=Sum("sentiment_sum"), sentiment_count=Sum("sentiment_count"))
+        .order_by("day")
+    ]
+
+
+def prompt_texts(scope, since):
+    """The descriptions the prompt uses: the newest PROMPT_ROWS in the window, and nothing else."""
+    rows = window_feedback(scope, since).order_by('-created_at').values_list('description', flat=True)
+    limit = insights_setting('PROMPT_TEXT_CHARS')
+    return [text[:limit] for text in rows[:insights_setting('PROMPT_ROWS')]]
+
+
+def generate_analysis(feedback_texts):
+    """(text, ok): Gemini's analysis of the feedback, or an explanation and False if it failed."""
+    if not feedback_texts:
+        return "No insights available.", True
+
+    prompt = (
+        "Analyze the following feedback data and provide a brief AI-generated insight. "
+        "Focus on emerging trends, top concerns, and public sentiment shifts:\n\n"
+        + "\n".join(feedback_texts)
+    )
+
+    try:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        model = genai.GenerativeModel("models/gemini-1.5-flash")
+        response = model.generate_content(prompt)
+        return response.text.strip(), True
+    except Exception as e:
+        return f"AI analysis failed: {e}", False
+
+
+def compute(scope, days, since, watermark, previous=None):
+    """Run the analysis and cache it under `watermark`. A failed call keeps the previous good analysis."""
+    analysis, ok = generate_analysis(prompt_texts(scope, since))
+    if not ok:
+        return previous["ai_analysis"] if previous else analysis
+    _cache().set(
+        cache_key(scope, days),
+        {"watermark": watermark, "ai_analysis": analysis, "computed_at": now()},
+        timeout=insights_setting('CACHE_TIMEOUT_SECONDS'),
+    )
+    return analysis
+
+
+def refresh_in_background(scope, days, since, watermark, previous):
+    """Recompute in a daemon thread unless another request already is (the cache lock)."""
+    lock_key = cache_key(scope, days, 'refresh-lock')
+    if not _cache().add(lock_key, 1, timeout=insights_setting('REFRESH_LOCK_SECONDS')):
+        return
+
+    def run():
+        try:
+            compute(scope, days, since, watermark, previous)
+        finally:
+            _cache().delete(lock_key)
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_insights(scope=None, days=None):
+    """The insights payload for feedback in `scope` (a Location id, None for all) over the last `days` days."""
+    days = days or insights_setting('WINDOW_DAYS')
+    since = now() - timedelta(days=days)
+    watermark = data_watermark(scope, since)
+    cached = _cache().get(cache_key(scope, days))
+
+    if cached is None:
+        status, analysis, computed_at = MISS, compute(scope, days, since, watermark), now()
+    else:
+        status, analysis, computed_at = FRESH, cached["ai_analysis"], cached["computed_at"]
+        if cached["watermark"] != watermark:
+            status = STALE
+            refresh_in_background(scope, days, since, watermark, cached)
+
+    summary = latest_summary(days) if scope is None else None  # Topic summaries aren't kept per location
+    # Emerging issues and hotspots: categories and locations spiking in the window against their own baseline
+    bursts = detect(scope, window_days=days)
+    return {
+        "emerging_issues": bursts["category"][:5],
+        "sentiment_trends": sentiment_trend(scope, since),
+        "geographic_hotspots": bursts["location"][:5],
+        "emerging_topics": summary.topics if summary else [],
+        "ai_analysis": analysis,
+        "cache": {"status": status, "computed_at": computed_at, "window_days": days},
+    }
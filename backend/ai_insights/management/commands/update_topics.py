@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai_insights import topics
+
+
+class Command(BaseCommand):
+    help = "Index new feedback into the topic term tables and refresh the topic summary of every TOPICS['WINDOWS'] window."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Update once and exit instead of looping.")
+        parser.add_argument('--interval', type=float, default=None, help="Seconds between runs (defaults to UPDATE_INTERVAL_SECONDS).")
+        parser.add_argument('--rebuild', action='store_true', help="Drop the term tables and index all feedback again first.")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(f"Re-indexed {topics.rebuild()} feedbacks")
+        interval = options['interval'] or topics.topic_setting('UPDATE_INTERVAL_SECONDS')
+        while True:
+            self.stdout.write(f"Indexed {topics.index_new_feedback()} new feedbacks")
+            for days in settings.TOPICS['WINDOWS']:
+                summary = topics.summarize(days)
+                self.stdout.write(f"{days}-day window: {len(summary.topics)} topics from {summary.documents} feedbacks")
+            if options['once']:
+                return
+            time.sleep(interval)
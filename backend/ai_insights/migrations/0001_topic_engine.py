@@ -0,0 +1,50 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicIndexState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_feedback_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TopicSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_days', models.PositiveSmallIntegerField()),
+                ('window_start', models.DateField()),
+                ('window_end', models.DateField()),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('topics', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window_days', '-created_at'], name='topic_summary_latest_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TopicTermDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('term', models.CharField(max_length=100)),
+                ('doc_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'term'), name='unique_topic_term_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_insights', '0001_topic_engine'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicindexstate',
+            name='recent_ids',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -1,3 +1,47 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class TopicTermDaily(models.Model):
+    """
+    Number of feedbacks created on `day` whose text contains `term` (a word or two-word phrase),
+    filled incrementally by ai_insights/topics.py. The row with term DOCS_TERM ('') holds the
+    day's total number of indexed feedbacks.
+    """
+    day = models.DateField()
+    term = models.CharField(max_length=100)
+    doc_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'term'], name='unique_topic_term_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.term!r}: {self.doc_count}"
+
+
+class TopicIndexState(models.Model):
+    """How far the topic index has read the Feedback table (one row per index)."""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_feedback_id = models.BigIntegerField(default=0)
+    recent_ids = models.JSONField(default=dict)  # {feedback id: created_at timestamp} for the INDEX_OVERLAP_SECONDS re-scan
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class TopicSummary(models.Model):
+    """The top emerging topics of one window, as computed by ai_insights/topics.py summarize()."""
+    window_days = models.PositiveSmallIntegerField()
+    window_start = models.DateField()
+    window_end = models.DateField()
+    documents = models.PositiveIntegerField(default=0)  # Feedbacks in the window
+    topics = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['window_days', '-created_at'], name='topic_summary_latest_idx'),
+        ]
+
+    def __str__(self):
+        return f"Topics for {self.window_start}..{self.window_end} ({len(self.topics)})"
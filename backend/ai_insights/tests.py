@@ -1,3 +1,265 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from admindashboard import rollups
+from authentication.models import UserAccount
+from feedback import jobs
+from feedback.models import Feedback
+
+from . import bursts, insights, topics, trends
+from .models import TopicIndexState, TopicSummary, TopicTermDaily
+
+
+def make_user(email='analyst@example.com', **kwargs):
+    return UserAccount.objects.create_user(email=email, password='pw', first_name='A', last_name='B', phone='1', **kwargs)
+
+
+def make_feedbacks(user, rows):
+    """Feedbacks from (days ago, category, location, sentiment score, description) rows, in one bulk_create."""
+    feedbacks = [
+        Feedback(
+            user=user, title=f"Issue {i}", description=description, feedback_type='COMPLAINT', category=category,
+            location=location, sentiment_score=score, created_at=timezone.now() - timedelta(days=days_ago),
+        )
+        for i, (days_ago, category, location, score, description) in enumerate(rows)
+    ]
+    for feedback in feedbacks:
+        feedback.assign_location()
+        feedback.assign_priority()
+    return Feedback.objects.bulk_create(feedbacks)
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class SentimentTrendTests(APITestCase):
+    url = '/api/ai/sentiment-trend/'
+
+    def setUp(self):
+        super().setUp()
+        make_feedbacks(self.user, [
+            (0, 'WATER', 'Pune', -0.8, "No water"),
+            (0, 'WATER', 'Pune', 0.4, "Water is back"),
+            (0, 'ROADS', 'Mumbai', None, "Potholes"),
+            (2, 'WATER', 'Pune', 1.0, "Fixed quickly"),
+            (40, 'WATER', 'Pune', -1.0, "Outside every window"),
+        ])
+
+    def test_one_point_per_day_with_histogram(self):
+        data = self.client.get(f'{self.url}?periods=3').data
+        self.assertEqual(data['histogram_buckets'], trends.bucket_labels())
+        self.assertEqual([point['period'] for point in data['series']], trends.period_starts('day', 3))
+        today, yesterday, two_days_ago = reversed(data['series'])
+        self.assertEqual((today['count'], today['scored']), (3, 2))
+        self.assertAlmostEqual(today['average'], -0.2)
+        self.assertEqual(today['histogram'], [1, 0, 0, 1, 0])
+        self.assertEqual((yesterday['count'], yesterday['average'], yesterday['histogram']), (0, None, [0] * 5))
+        self.assertEqual(two_days_ago['histogram'], [0, 0, 0, 0, 1])  # 1.0 falls in the last bucket
+
+    def test_weeks_and_filters(self):
+        data = self.client.get(f'{self.url}?resolution=week&periods=2&location=pune').data
+        self.assertTrue(all(point['period'].weekday() == 0 for point in data['series']))
+        self.assertEqual(sum(point['count'] for point in data['series']), 3)
+        data = self.client.get(f'{self.url}?category=roads').data
+        self.assertEqual(len(data['series']), 30)
+        self.assertEqual(sum(point['count'] for point in data['series']), 1)
+
+    def test_one_query_however_long_the_series(self):
+        with self.assertNumQueries(1):
+            trends.sentiment_series(Feedback.objects.all(), 'day', 366)
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get(f'{self.url}?resolution=month').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?periods=0').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?periods=abc').status_code, 400)
+
+
+class TopicTests(APITestCase):
+    url = '/api/ai/topics/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        rows = [(1, 'SANITATION', 'Pune', None, f"Garbage collection missed on street {i}, garbage piling up") for i in range(4)]
+        rows += [(i, 'ROADS', 'Pune', None, f"Streetlight {i} broken near the school") for i in range(2)]
+        rows += [(20 + i, 'WATER', 'Pune', None, f"Water supply low in ward {i}") for i in range(5)]
+        self.feedbacks = make_feedbacks(self.user, rows)
+
+    def test_incremental_index_reads_only_new_feedback(self):
+        self.assertEqual(topics.index_new_feedback(), len(self.feedbacks))
+        self.assertEqual(topics.index_new_feedback(), 0)
+        make_feedbacks(self.user, [(0, 'ROADS', 'Pune', None, "Another pothole")])
+        self.assertEqual(topics.index_new_feedback(), 1)
+
+    def test_late_commits_below_the_watermark_are_indexed_once(self):
+        late = self.feedbacks[2]
+        late.created_at = timezone.now()  # Stamped on save, before the commit
+        Feedback.objects.filter(pk=late.pk).delete()  # Not committed yet when the indexer runs
+        self.assertEqual(topics.index_new_feedback(batch_size=4), len(self.feedbacks) - 1)
+        late.save(force_insert=True)
+        self.assertEqual(topics.index_new_feedback(), 1)
+        self.assertEqual(topics.index_new_feedback(), 0)
+        docs = TopicTermDaily.objects.filter(term=topics.DOCS_TERM).aggregate(total=Sum('doc_count'))['total']
+        self.assertEqual(docs, len(self.feedbacks))
+
+        overlap = timedelta(seconds=settings.TOPICS['INDEX_OVERLAP_SECONDS'] + 1)
+        make_feedbacks(self.user, [(0, 'ROADS', 'Pune', None, "Another pothole")])
+        with mock.patch.object(topics, 'now', return_value=timezone.now() + overlap):
+            self.assertEqual(topics.index_new_feedback(), 1)
+        self.assertEqual(TopicIndexState.objects.get().recent_ids, {})  # Older than the overlap, so dropped
+
+    def test_emerging_terms_become_topics(self):
+        topics.index_new_feedback()
+        summary = topics.summarize(7)
+        self.assertEqual(summary.documents, 6)
+        top = summary.topics[0]
+        self.assertIn('garbage', top['label'])
+        self.assertEqual(top['documents'], 4)
+        self.assertCountEqual(top['feedback_ids'], [feedback.pk for feedback in self.feedbacks[:4]])
+        self.assertNotIn('water', [term['term'] for topic in summary.topics for term in topic['terms']])  # Baseline only
+
+    def test_requests_serve_the_stored_summary(self):
+        data = self.client.get(f'{self.url}?days=7').data  # No summary yet: computed once
+        self.assertIn('garbage', data['topics'][0]['label'])
+        with mock.patch.object(topics, 'refresh_in_background') as refresh:
+            self.assertEqual(self.client.get(f'{self.url}?days=7').data['computed_at'], data['computed_at'])
+            refresh.assert_not_called()
+
+            TopicSummary.objects.update(created_at=timezone.now() - timedelta(hours=1))
+            self.assertEqual(self.client.get(f'{self.url}?days=7').data['topics'], data['topics'])  # Stale, still served
+            refresh.assert_called_once_with(7)
+        self.assertEqual(TopicSummary.objects.count(), 1)
+
+    def test_one_refresh_per_window_at_a_time(self):
+        cache.add(topics.refresh_lock_key(7), 1)
+        self.assertIsNone(topics.refresh(7))
+        data = self.client.get(f'{self.url}?days=7').data
+        self.assertEqual((data['computed_at'], data['topics'], data['window_days']), (None, [], 7))
+        self.assertFalse(TopicSummary.objects.exists())
+
+        cache.delete(topics.refresh_lock_key(7))
+        self.assertIsNotNone(topics.refresh(7))
+        self.assertFalse(cache.get(topics.refresh_lock_key(7)))  # Released afterwards
+
+    def test_rejects_bad_windows(self):
+        self.assertEqual(self.client.get(f'{self.url}?days=0').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?days=91').status_code, 400)
+
+
+class BurstTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        rows = [(day, 'WATER', 'Pune', None, "Low pressure") for day in range(35)]  # Steady, one a day
+        rows += [(day % 2, 'ROADS', 'Mumbai', None, "Potholes") for day in range(12)]  # Spike in the last two days
+        rows += [(10, 'HEALTHCARE', 'Pune', None, "Clinic closed") for _ in range(12)]  # Spike ten days ago
+        make_feedbacks(self.user, rows)
+        rollups.rebuild()  # bulk_create skips the rollup signals
+
+    def groups(self, ranked, field):
+        return {group[field]: group for group in ranked}
+
+    def test_spikes_are_anomalies_and_steady_groups_are_not(self):
+        result = bursts.detect()
+        categories = self.groups(result['category'], 'category')
+        self.assertEqual(result['category'][0]['category'], 'ROADS')
+        self.assertTrue(categories['ROADS']['anomaly'])
+        self.assertEqual(categories['ROADS']['total'], 12)
+        self.assertFalse(categories['WATER']['anomaly'])
+        self.assertFalse(categories['HEALTHCARE']['anomaly'])  # Its spike is in the baseline
+        self.assertEqual(result['location'][0]['location'], 'Mumbai')
+        self.assertEqual((result['pair'][0]['category'], result['pair'][0]['location']), ('ROADS', 'Mumbai'))
+
+    def test_window_and_scope(self):
+        categories = self.groups(bursts.detect(window_days=14)['category'], 'category')
+        self.assertEqual(categories['HEALTHCARE']['total'], 12)
+        pune = Feedback.objects.filter(location='Pune').values_list('location_ref_id', flat=True).first()
+        self.assertNotIn('ROADS', self.groups(bursts.detect(pune)['category'], 'category'))
+
+    def test_view_filters_anomalies(self):
+        data = self.client.get('/api/ai/bursts/?level=category').data
+        self.assertEqual([group['category'] for group in data['results']], ['ROADS'])
+        data = self.client.get('/api/ai/bursts/?level=location&all=1&days=14').data
+        self.assertEqual((data['window_days'], len(data['results'])), (14, 2))
+        self.assertEqual(self.client.get('/api/ai/bursts/?level=city').status_code, 400)
+        self.assertEqual(self.client.get('/api/ai/bursts/?baseline_days=0').status_code, 400)
+
+    def test_insights_use_the_requested_window(self):
+        with mock.patch.object(insights, 'generate_analysis', return_value=("Analysis", True)):
+            week = insights.get_insights(days=7)
+            fortnight = insights.get_insights(days=14)
+        self.assertEqual(self.groups(week['emerging_issues'], 'category')['HEALTHCARE']['total'], 0)
+        self.assertEqual(self.groups(fortnight['emerging_issues'], 'category')['HEALTHCARE']['total'], 12)
+
+
+class InlineThread:
+    """threading.Thread stand-in that runs the target when started, so background refreshes finish inside the test."""
+    started = 0
+
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        InlineThread.started += 1
+        self.target()
+
+
+class InsightsCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.feedbacks = make_feedbacks(self.user, [(1, 'WATER', 'Pune', None, "Low pressure in the mornings")])
+        InlineThread.started = 0
+        for patcher in (
+            mock.patch.object(insights.threading, 'Thread', InlineThread),
+            mock.patch.object(insights, 'close_old_connections'),  # Would close the test's connection
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.analyses = iter([f"Analysis {i}" for i in range(1, 10)])
+
+    def get(self, ok=True):
+        analysis = next(self.analyses)
+        with mock.patch.object(insights, 'generate_analysis', return_value=(analysis, ok)) as generate:
+            data = insights.get_insights(days=7)
+        return data['cache']['status'], data['ai_analysis'], generate.called
+
+    def test_miss_fresh_then_stale_while_revalidating(self):
+        self.assertEqual(self.get(), (insights.MISS, "Analysis 1", True))
+        self.assertEqual(self.get(), (insights.FRESH, "Analysis 1", False))
+
+        make_feedbacks(self.user, [(0, 'ROADS', 'Pune', None, "New pothole")])
+        self.assertEqual(self.get(), (insights.STALE, "Analysis 1", True))  # Served old, refreshed behind
+        self.assertEqual(self.get(), (insights.FRESH, "Analysis 3", False))
+        self.assertEqual(InlineThread.started, 1)
+
+    def test_one_background_refresh_at_a_time(self):
+        self.get()
+        make_feedbacks(self.user, [(0, 'ROADS', 'Pune', None, "New pothole")])
+        cache.add(insights.cache_key(None, 7, 'refresh-lock'), 1)
+        self.assertEqual(self.get()[0], insights.STALE)
+        self.assertEqual(self.get()[0], insights.STALE)
+        self.assertEqual(InlineThread.started, 0)
+
+    def test_failed_call_keeps_the_previous_analysis(self):
+        self.get()
+        make_feedbacks(self.user, [(0, 'ROADS', 'Pune', None, "New pothole")])
+        self.assertEqual(self.get(ok=False), (insights.STALE, "Analysis 1", True))
+        self.assertEqual(self.get(), (insights.STALE, "Analysis 1", True))  # Still stale, so retried
+        self.assertEqual(self.get(), (insights.FRESH, "Analysis 3", False))
 
-# Create your tests here.
+    def test_rescoring_invalidates_the_cache(self):
+        self.get()
+        jobs.write_scores({self.feedbacks[0].pk: -0.7})
+        self.assertEqual(self.get()[0], insights.STALE)
@@ -0,0 +1,383 @@
+"""
+Local topic engine: emerging key phrases and topic clusters, without any remote calls.
+
+Indexing (index_new_feedback) is incremental: each run reads feedback created since the last
+one in id order and adds, per day, how many feedbacks contain each term (a word or a two-word
+phrase) to TopicTermDaily. Summing those per-day tables gives any window's document
+frequencies without reading old descriptions again, so the cost of a run follows the new
+feedback, not the size of the table.
+
+summarize(days) then:
+1. Scores every term of the window against the BASELINE_DAYS before it (TF-IDF weighted by
+   growth) and keeps the MAX_TERMS best.
+2. Reads only the window's feedback into a sparse document x term matrix (CSR arrays,
+   restricted to those terms, L2-normalized TF-IDF rows), and accumulates the term
+   co-occurrence matrix X'X chunk by chunk.
+3. Grows topics greedily: the best remaining term seeds a topic and takes the unassigned
+   terms most similar to it (cosine of co-occurrence).
+4. Picks each topic's representative feedback from X @ membership, and stores the result as
+   a TopicSummary.
+
+Requests read the latest stored summary (get_summary); computing them is update_topics' job.
+
+Ids are handed out before commit, so a feedback can commit after a higher id was read; the last
+INDEX_OVERLAP_SECONDS of feedback is read again below the watermark to catch it, and a transaction
+open for longer than that is missed. Feedback deleted or edited after indexing, or missed that way,
+keeps its old counts until manage.py update_topics --rebuild.
+"""
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.db.models import Q, Sum
+from django.utils.timezone import localdate, localtime, make_aware, now
+
+from feedback.models import Feedback
+
+from .models import TopicIndexState, TopicSummary, TopicTermDaily
+
+DOCS_TERM = ''  # TopicTermDaily row holding the day's document count
+INDEX_NAME = 'feedback'
+TOKEN_RE = re.compile(r"[a-z]+")
+MAX_TOKEN_LENGTH = 40
+STOPWORDS = frozenset("""
+    a about above after again against all also am an and any are around as at be because been before
+    being below between both but by can could did do does doing done down during each even every few
+    for from further get gets got had has have having he her here hers him his how however i if in
+    into is it its itself just let like made make many may me more most much must my near need needs
+    no nor not now of off on once one only or other our ours out over own please same she should since
+    so some still such than that the their theirs them then there these they this those though through
+    to too under until up upon us very was we were what when where which while who whom why will with
+    within without would yet you your yours
+    already always another anyone area day days every everyone everything kindly last many month
+    months nothing people really something sir take taken time times today week weeks year years
+""".split())
+
+
+def topic_setting(name):
+    return settings.TOPICS[name]
+
+
+def terms(text):
+    """The distinct terms of a text: words of 3+ letters and adjacent-word phrases, stopwords dropped."""
+    words = [
+        token if 3 <= len(token) <= MAX_TOKEN_LENGTH and token not in STOPWORDS else None
+        for token in TOKEN_RE.findall(text.lower())
+    ]
+    found = {word for word in words if word}
+    found.update(f"{a} {b}" for a, b in zip(words, words[1:]) if a and b)
+    return found
+
+
+def document_text(title, description):
+    return f"{title}\n{description}"
+
+
+# Indexing
+
+def add_counts(counts):
+    """Add {(day, term): n} to TopicTermDaily (callers hold the index state lock, so read-modify-write is safe)."""
+    by_day = defaultdict(dict)
+    for (day, term), count in counts.items():
+        by_day[day][term] = count
+
+    changed, new = [], []
+    for day, day_counts in by_day.items():
+        names = list(day_counts)
+        for start in range(0, len(names), 500):  # Stay under SQLite's bound-parameter limit
+            for row in TopicTermDaily.objects.filter(day=day, term__in=names[start:start + 500]):
+                row.doc_count += day_counts.pop(row.term)
+                changed.append(row)
+        new.extend(TopicTermDaily(day=day, term=term, doc_count=count) for term, count in day_counts.items())
+    TopicTermDaily.objects.bulk_update(changed, ['doc_count'], batch_size=1000)
+    TopicTermDaily.objects.bulk_create(new, batch_size=1000)
+
+
+def index_new_feedback(batch_size=None):
+    """
+    Add the feedback created since the last run to the per-day term tables. Returns the number indexed.
+
+    Feedback created in the last INDEX_OVERLAP_SECONDS is read again below the watermark (late commits),
+    and the ids already indexed in that span, kept in state.recent_ids, are skipped.
+    """
+    batch_size = batch_size or topic_setting('BATCH_SIZE')
+    total = 0
+    while True:
+        with transaction.atomic():
+            # The state row lock serializes concurrent indexers
+            state, _ = TopicIndexState.objects.select_for_update().get_or_create(name=INDEX_NAME)
+            cutoff = now() - timedelta(seconds=topic_setting('INDEX_OVERLAP_SECONDS'))
+            recent = {int(pk): at for pk, at in state.recent_ids.items() if at >= cutoff.timestamp()}
+            rows = list(
+                Feedback.objects.filter(Q(id__gt=state.last_feedback_id) | Q(created_at__gte=cutoff))
+                .exclude(id__in=recent)
+                .order_by('id')
+                .values_list('id', 'created_at', 'title', 'description')[:batch_size]
+            )
+            if not rows:
+                return total
+            counts = Counter()
+            for feedback_id, created_at, title, description in rows:
+                day = localtime(created_at).date()
+                counts[(day, DOCS_TERM)] += 1
+                for term in terms(document_text(title, description)):
+                    counts[(day, term)] += 1
+                if created_at >= cutoff:
+                    recent[feedback_id] = created_at.timestamp()
+            add_counts(counts)
+            state.last_feedback_id = max(state.last_feedback_id, rows[-1][0])
+            state.recent_ids = recent
+            state.save(update_fields=['last_feedback_id', 'recent_ids', 'updated_at'])
+        total += len(rows)
+
+
+def rebuild():
+    """Drop the term tables and index every feedback again. Returns the number indexed."""
+    with transaction.atomic():
+        TopicTermDaily.objects.all().delete()
+        TopicIndexState.objects.filter(name=INDEX_NAME).delete()
+    return index_new_feedback()
+
+
+# Sparse document x term matrices
+
+class CSRMatrix:
+    """Compressed sparse rows (data, indices, indptr), the layout scipy.sparse.csr_matrix uses."""
+
+    def __init__(self, data, indices, indptr, n_cols):
+        self.data, self.indices, self.indptr, self.n_cols = data, indices, indptr, n_cols
+
+    @property
+    def n_rows(self):
+        return len(self.indptr) - 1
+
+    def row_of_entries(self):
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def normalize_rows(self):
+        """Scale every non-empty row to unit L2 norm, in place."""
+        rows = self.row_of_entries()
+        norms = np.sqrt(np.bincount(rows, weights=self.data ** 2, minlength=self.n_rows))
+        self.data = self.data / norms[rows]
+        return self
+
+    def todense(self):
+        dense = np.zeros((self.n_rows, self.n_cols), dtype=np.float32)
+        dense[self.row_of_entries(), self.indices] = self.data
+        return dense
+
+    def dot(self, matrix):
+        """self @ matrix for a dense (n_cols x k) matrix, touching only the stored entries."""
+        result = np.zeros((self.n_rows, matrix.shape[1]), dtype=np.float32)
+        np.add.at(result, self.row_of_entries(), self.data[:, None] * matrix[self.indices])
+        return result
+
+    @classmethod
+    def from_texts(cls, texts, vocabulary, idf):
+        """TF-IDF rows (binary term frequency) for `texts` over the `vocabulary` {term: column}."""
+        indices, indptr = [], [0]
+        for text in texts:
+            indices.extend(vocabulary[term] for term in terms(text) if term in vocabulary)
+            indptr.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int64)
+        return cls(idf[indices].astype(np.float32), indices, np.asarray(indptr), len(vocabulary)).normalize_rows()
+
+
+# Summaries
+
+def window_bounds(days, today=None):
+    """(first day, last day) of the window ending today."""
+    today = today or localdate()
+    return today - timedelta(days=days - 1), today
+
+
+def score_terms(window_start, baseline_start):
+    """
+    Candidate terms of the window with their scores, from the per-day tables only:
+    score = window count x idf x log(1 + growth), where growth compares the term's share of
+    the window's feedback with its share of the baseline's (add-one smoothed).
+    """
+    rows = list(
+        TopicTermDaily.objects.filter(day__gte=baseline_start)
+        .values('term')
+        .annotate(
+            window=Sum('doc_count', filter=Q(day__gte=window_start)),
+            baseline=Sum('doc_count', filter=Q(day__lt=window_start)),
+        )
+        .filter(Q(window__gte=topic_setting('MIN_DOC_COUNT')) | Q(term=DOCS_TERM))
+    )
+    totals = next((row for row in rows if row['term'] == DOCS_TERM), None)
+    rows = [row for row in rows if row['term'] != DOCS_TERM]
+    if totals is None or not rows:
+        return [], np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0)
+
+    window_docs, baseline_docs = totals['window'] or 0, totals['baseline'] or 0
+    window = np.array([row['window'] or 0 for row in rows], dtype=np.float64)
+    baseline = np.array([row['baseline'] or 0 for row in rows], dtype=np.float64)
+
+    idf = np.log((1 + window_docs + baseline_docs) / (1 + window + baseline)) + 1
+    growth = ((window + 1) / (window_docs + 1)) / ((baseline + 1) / (baseline_docs + 1))
+    scores = window * idf * np.log1p(growth)
+
+    best = np.argsort(-scores, kind='stable')[:topic_setting('MAX_TERMS')]
+    return [rows[i]['term'] for i in best], scores[best], window[best], growth[best], idf[best]
+
+
+def cluster_terms(cooccurrence, scores):
+    """Greedy clustering: lists of term columns, one per topic, best seeds first."""
+    counts = np.sqrt(np.diag(cooccurrence))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = np.nan_to_num(cooccurrence / np.outer(counts, counts))
+
+    assigned = counts == 0  # Terms that never occur in the window's feedback can't seed a topic
+    topics = []
+    for seed in np.argsort(-scores, kind='stable'):
+        if assigned[seed]:
+            continue
+        related = [
+            column for column in np.argsort(-similarity[seed], kind='stable')
+            if not assigned[column] and column != seed and similarity[seed, column] >= topic_setting('SIMILARITY_THRESHOLD')
+        ]
+        members = [seed] + related[:topic_setting('TERMS_PER_TOPIC') - 1]
+        assigned[members] = True
+        topics.append(members)
+        if len(topics) == topic_setting('MAX_TOPICS'):
+            break
+    return topics
+
+
+def summarize(days):
+    """Compute and store the top topics of the last `days` days. Returns the TopicSummary."""
+    window_start, window_end = window_bounds(days)
+    baseline_start = window_start - timedelta(days=topic_setting('BASELINE_DAYS'))
+    candidates, scores, counts, growth, idf = score_terms(window_start, baseline_start)
+    vocabulary = {term: column for column, term in enumerate(candidates)}
+
+    feedbacks = (
+        Feedback.objects.filter(created_at__gte=make_aware(datetime.combine(window_start, time.min)))
+        .order_by('id')
+        .values_list('id', 'title', 'description')
+    )
+    chunks, cooccurrence, documents = [], np.zeros((len(vocabulary), len(vocabulary))), 0
+    batch = []
+    for row in feedbacks.iterator(chunk_size=topic_setting('BATCH_SIZE')):
+        batch.append(row)
+        if len(batch) == topic_setting('BATCH_SIZE'):
+            documents += len(batch)
+            chunks.append(add_chunk(batch, vocabulary, idf, cooccurrence))
+            batch = []
+    if batch:
+        documents += len(batch)
+        chunks.append(add_chunk(batch, vocabulary, idf, cooccurrence))
+
+    topics = []
+    if vocabulary:
+        clusters = cluster_terms(cooccurrence, scores)
+        representatives = representative_feedback(chunks, clusters, scores)
+        for members, (matched, feedback_ids) in zip(clusters, representatives):
+            topics.append({
+                "label": " / ".join(candidates[column] for column in members[:3]),
+                "score": round(float(scores[members].sum()), 4),
+                "documents": matched,
+                "terms": [
+                    {
+                        "term": candidates[column],
+                        "score": round(float(scores[column]), 4),
+                        "count": int(counts[column]),
+                        "growth": round(float(growth[column]), 3),
+                    }
+                    for column in members
+                ],
+                "feedback_ids": feedback_ids,
+            })
+        topics.sort(key=lambda topic: -topic["score"])
+
+    summary = TopicSummary.objects.create(
+        window_days=days, window_start=window_start, window_end=window_end, documents=documents, topics=topics,
+    )
+    TopicSummary.objects.filter(created_at__lt=now() - timedelta(days=topic_setting('SUMMARY_RETENTION_DAYS'))).delete()
+    return summary
+
+
+def add_chunk(rows, vocabulary, idf, cooccurrence):
+    """Build one chunk's CSR matrix and add its X'X to `cooccurrence`. Returns (feedback ids, matrix)."""
+    matrix = CSRMatrix.from_texts([document_text(title, description) for _, title, description in rows], vocabulary, idf)
+    if vocabulary:
+        dense = matrix.todense()
+        cooccurrence += dense.T @ dense
+    return np.array([row[0] for row in rows]), matrix
+
+
+def representative_feedback(chunks, clusters, scores):
+    """[(matching feedback count, ids of the best-matching feedback)] per topic."""
+    membership = np.zeros((len(scores), len(clusters)), dtype=np.float32)
+    for topic, members in enumerate(clusters):
+        membership[members, topic] = scores[members] / scores[members].sum()
+
+    limit = topic_setting('REPRESENTATIVES')
+    best_scores = np.full((len(clusters), 0), -np.inf)
+    best_ids = np.zeros((len(clusters), 0), dtype=np.int64)
+    matched = np.zeros(len(clusters), dtype=np.int64)
+    for ids, matrix in chunks:
+        topic_scores = matrix.dot(membership).T  # topics x feedbacks
+        matched += (topic_scores > 0).sum(axis=1)
+        best_scores = np.concatenate([best_scores, topic_scores], axis=1)
+        best_ids = np.concatenate([best_ids, np.broadcast_to(ids, topic_scores.shape)], axis=1)
+        keep = np.argsort(-best_scores, axis=1, kind='stable')[:, :limit]
+        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+    return [
+        (int(matched[topic]), [int(pk) for pk, score in zip(best_ids[topic], best_scores[topic]) if score > 0])
+        for topic in range(len(clusters))
+    ]
+
+
+def latest_summary(days):
+    return TopicSummary.objects.filter(window_days=days).order_by('-created_at').first()
+
+
+def refresh_lock_key(days):
+    return f"topics:{days}:refresh-lock"
+
+
+def refresh(days):
+    """Index new feedback and store a new summary of the window, unless another refresh of it is running (the cache lock)."""
+    cache, lock_key = caches[topic_setting('CACHE_ALIAS')], refresh_lock_key(days)
+    if not cache.add(lock_key, 1, timeout=topic_setting('REFRESH_LOCK_SECONDS')):
+        return None
+    try:
+        index_new_feedback()
+        return summarize(days)
+    finally:
+        cache.delete(lock_key)
+
+
+def refresh_in_background(days):
+    def run():
+        try:
+            refresh(days)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_summary(days):
+    """
+    The latest summary for the window, served as is: update_topics keeps the TOPICS['WINDOWS']
+    ones current, and one older than SUMMARY_MAX_AGE_SECONDS is recomputed in a background thread.
+    Only a window without any summary is computed on request, by one request at a time; the
+    others get None until it is stored.
+    """
+    summary = latest_summary(days)
+    if summary is None:
+        return refresh(days)
+    if summary.created_at < now() - timedelta(seconds=topic_setting('SUMMARY_MAX_AGE_SECONDS')):
+        refresh_in_background(days)
+    return summary
@@ -0,0 +1,68 @@
+"""
+Binned sentiment time series.
+
+sentiment_series() groups feedback by day or week in the database and returns exactly one
+point per period (empty periods filled in), each with the feedback count, the average score
+and a fixed histogram of scores. The payload size depends on the number of periods, never on
+how much feedback there is.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, DateField, Q
+from django.db.models.functions import Trunc
+from django.utils.timezone import localdate, make_aware
+
+# Histogram bucket edges over the [-1, 1] score range; the last bucket includes 1.0
+HISTOGRAM_EDGES = (-1.0, -0.6, -0.2, 0.2, 0.6, 1.0)
+RESOLUTIONS = {'day': 1, 'week': 7}  # Period length in days
+
+
+def bucket_labels():
+    return [f"{low:+.1f}..{high:+.1f}" for low, high in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:])]
+
+
+def bucket_filters():
+    """One Q per histogram bucket, for conditional Count aggregates."""
+    last = len(HISTOGRAM_EDGES) - 2
+    return [
+        Q(sentiment_score__gte=low, **{'sentiment_score__lte' if i == last else 'sentiment_score__lt': high})
+        for i, (low, high) in enumerate(zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:]))
+    ]
+
+
+def period_starts(resolution, periods, today=None):
+    """The first day of each of the last `periods` periods, oldest first (weeks start on Monday)."""
+    today = today or localdate()
+    if resolution == 'week':
+        today -= timedelta(days=today.weekday())
+    step = timedelta(days=RESOLUTIONS[resolution])
+    return [today - step * i for i in range(periods - 1, -1, -1)]
+
+
+def sentiment_series(queryset, resolution='day', periods=30):
+    """
+    [{period, count, scored, average, histogram}] for the last `periods` days or weeks of
+    `queryset` (a Feedback queryset), from one GROUP BY query.
+    """
+    starts = period_starts(resolution, periods)
+    buckets = {f"bucket_{i}": Count('id', filter=q) for i, q in enumerate(bucket_filters())}
+    rows = (
+        queryset.filter(created_at__gte=make_aware(datetime.combine(starts[0], time.min)))
+        .annotate(period=Trunc('created_at', resolution, output_field=DateField()))
+        .values('period')
+        .annotate(count=Count('id'), scored=Count('sentiment_score'), average=Avg('sentiment_score'), **buckets)
+        .order_by()
+    )
+    by_period = {row['period']: row for row in rows}
+
+    series = []
+    for start in starts:
+        row = by_period.get(start)
+        series.append({
+            "period": start,
+            "count": row['count'] if row else 0,
+            "scored": row['scored'] if row else 0,
+            "average": row['average'] if row else None,
+            "histogram": [row[name] if row else 0 for name in buckets],
+        })
+    return series
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import AIInsightsView
+from .views import AIInsightsView, BurstsView, SentimentTrendView, TopicsView
 
 urlpatterns = [
     path("ai-insights/", AIInsightsView.as_view(), name="ai-insights"),
+    path("sentiment-trend/", SentimentTrendView.as_view(), name="sentiment-trend"),
+    path("topics/", TopicsView.as_view(), name="topics"),
+    path("bursts/", BurstsView.as_view(), name="bursts"),
 ]
@@ -1,74 +1,130 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.utils.timezone import now
-from datetime import timedelta
-from feedback.models import Feedback
-from django.db.models import Count
+from rest_framework.exceptions import ValidationError
 from authentication.utils import CookieJWTAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
-import google.generativeai as genai
 from django.conf import settings
 
-# Configure AI API
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from admindashboard.access import request_location, scoped
+from feedback.models import Feedback
+
+from .bursts import LEVELS, detect
+from .insights import get_insights
+from .topics import get_summary, window_bounds
+from .trends import RESOLUTIONS, bucket_labels, sentiment_series
+
 
 class AIInsightsView(APIView):
+    """
+    Emerging issues, sentiment trend, hotspots and a Gemini analysis of recent feedback.
+    ?location= narrows it to one area, ?days= sets the window of every part (WINDOW_DAYS by default).
+    The analysis is cached, see ai_insights/insights.py; "cache" in the response says whether it was fresh.
+    """
     # authentication_classes = [CookieJWTAuthentication]
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        today = now()
-        last_30_days = today - timedelta(days=30)
-
-        # Emerging Issues: Categories with highest increase in complaints
-        category_trend = (
-            Feedback.objects.filter(created_at__gte=last_30_days)
-            .values("category")
-            .annotate(total=Count("id"))
-            .order_by("-total")
-        )
-
-        # Sentiment Trends: Fetch sentiment scores and analyze trends
-        sentiment_trend = (
-            Feedback.objects.filter(created_at__gte=last_30_days)
-            .values("sentiment_score")
-        )
-
-        # Geographic Hotspots: Identify locations with most complaints
-        location_trend = (
-            Feedback.objects.filter(created_at__gte=last_30_days)
-            .values("location")
-            .annotate(total=Count("id"))
-            .order_by("-total")
-        )
-
-        # AI-Powered Insights using Gemini
-        feedback_texts = list(Feedback.objects.values_list("description", flat=True))
-        ai_analysis = self.get_ai_insights(feedback_texts)
+        days = request.query_params.get("days")
+        if days is not None:
+            max_days = settings.AI_INSIGHTS["MAX_WINDOW_DAYS"]
+            if not days.isdigit() or not 1 <= int(days) <= max_days:
+                raise ValidationError({"days": f"Must be a whole number of days between 1 and {max_days}."})
+            days = int(days)
+        return Response(get_insights(request_location(request), days))
+
+
+class SentimentTrendView(APIView):
+    """
+    Sentiment over time: ?resolution=day|week, ?periods= points (30 by default), optional
+    ?category= and ?location=. One point per period, with count, average and a score histogram.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_PERIODS = 366
+
+    def get(self, request):
+        resolution = request.query_params.get("resolution", "day")
+        if resolution not in RESOLUTIONS:
+            raise ValidationError({"resolution": f"Choose one of: {', '.join(RESOLUTIONS)}."})
+        periods = request.query_params.get("periods", "30")
+        if not periods.isdigit() or not 1 <= int(periods) <= self.MAX_PERIODS:
+            raise ValidationError({"periods": f"Must be a whole number between 1 and {self.MAX_PERIODS}."})
+
+        feedbacks = scoped(Feedback.objects.all(), request_location(request))
+        category = request.query_params.get("category")
+        if category:
+            feedbacks = feedbacks.filter(category__iexact=category)
+
+        return Response({
+            "resolution": resolution,
+            "histogram_buckets": bucket_labels(),
+            "series": sentiment_series(feedbacks, resolution, int(periods)),
+        })
+
 
+class TopicsView(APIView):
+    """
+    Top emerging topics of the last ?days= days (7 by default), from the local topic engine:
+    key phrases, their growth against the preceding weeks and representative feedback ids.
+    Served from the latest stored summary; "computed_at" says when it was computed.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 90
+
+    def get(self, request):
+        days = request.query_params.get("days", "7")
+        if not days.isdigit() or not 1 <= int(days) <= self.MAX_DAYS:
+            raise ValidationError({"days": f"Must be a whole number of days between 1 and {self.MAX_DAYS}."})
+        summary = get_summary(int(days))
+        if summary is None:  # Being computed by another request
+            window_start, window_end = window_bounds(int(days))
+            return Response({
+                "window_days": int(days),
+                "window_start": window_start,
+                "window_end": window_end,
+                "documents": 0,
+                "computed_at": None,
+                "topics": [],
+            })
         return Response({
-            "emerging_issues": list(category_trend[:5]),
-            "sentiment_trends": list(sentiment_trend),
-            "geographic_hotspots": list(location_trend[:5]),
-            "ai_analysis": ai_analysis,
+            "window_days": summary.window_days,
+            "window_start": summary.window_start,
+            "window_end": summary.window_end,
+            "documents": summary.documents,
+            "computed_at": summary.created_at,
+            "topics": summary.topics,
         })
 
-    def get_ai_insights(self, feedback_texts):
-        """Uses AI to analyze feedback trends."""
-        if not feedback_texts:
-            return "No insights available."
-        
-        prompt = (
-            "Analyze the following feedback data and provide a brief AI-generated insight. "
-            "Focus on emerging trends, top concerns, and public sentiment shifts:\n\n"
-            + "\n".join(feedback_texts[:100])  # Limit to avoid token overflow
-        )
-        
-        try:
-            model = genai.GenerativeModel("models/gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            return f"AI analysis failed: {e}"
+
+class BurstsView(APIView):
+    """
+    Groups whose feedback volume spiked against their own baseline: ?level=pair (category in a
+    location, default), category or location; ?days= window and ?baseline_days=; ?location=
+    narrows the scope. Only anomalies are listed unless ?all=1.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 90
+
+    def day_count(self, name, default):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return default
+        if not value.isdigit() or not 1 <= int(value) <= self.MAX_DAYS:
+            raise ValidationError({name: f"Must be a whole number of days between 1 and {self.MAX_DAYS}."})
+        return int(value)
+
+    def get(self, request):
+        level = request.query_params.get("level", "pair")
+        if level not in LEVELS:
+            raise ValidationError({"level": f"Choose one of: {', '.join(LEVELS)}."})
+        window_days = self.day_count("days", settings.BURSTS["WINDOW_DAYS"])
+        baseline_days = self.day_count("baseline_days", settings.BURSTS["BASELINE_DAYS"])
+
+        ranked = detect(request_location(request), window_days, baseline_days)[level]
+        if request.query_params.get("all") not in ("1", "true"):
+            ranked = [group for group in ranked if group["anomaly"]]
+        return Response({"level": level, "window_days": window_days, "baseline_days": baseline_days, "results": ranked})
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+
+from feedback.locations import address_candidates, display_name
+
+
+def backfill_authority_locations(apps, schema_editor):
+    """Same mapping as LocationManager.for_authority(), against the historical models."""
+    UserAccount = apps.get_model('authentication', 'UserAccount')
+    Location = apps.get_model('feedback', 'Location')
+    for user in UserAccount.objects.filter(role='Authority'):
+        location = None
+        if user.work_location.strip():
+            parts = address_candidates(user.work_location)
+            if parts:
+                location, _ = Location.objects.get_or_create(key=parts[0], defaults={'name': display_name(user.work_location)})
+        else:
+            for key in address_candidates(user.address):
+                location = Location.objects.filter(Q(key=key) | Q(aliases__alias=key)).first()
+                if location is not None:
+                    break
+        if location is not None:
+            UserAccount.objects.filter(pk=user.pk).update(location_ref=location)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_alter_useraccount_role'),
+        ('feedback', '0011_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useraccount',
+            name='location_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='authorities', to='feedback.location'),
+        ),
+        migrations.RunPython(backfill_authority_locations, migrations.RunPython.noop),
+    ]
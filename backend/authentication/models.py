@@ -53,6 +53,10 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):  # ✅ Extend AbstractBas
     government_id = models.CharField(max_length=150, blank=True)
     department_name = models.CharField(max_length=150, blank=True)
     work_location = models.CharField(max_length=150, blank=True)
+    # Canonical area an authority administers, resolved from work_location/address (feedback/signals.py)
+    location_ref = models.ForeignKey(
+        'feedback.Location', on_delete=models.SET_NULL, null=True, blank=True, related_name='authorities',
+    )
 
     # Civilian-specific fields
     occupation = models.CharField(max_length=100, blank=True)
@@ -63,6 +67,15 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):  # ✅ Extend AbstractBas
     USERNAME_FIELD = "email"  # ✅ Use email for authentication
     REQUIRED_FIELDS = ["first_name", "last_name", "phone", "role"]  # ✅ Avoid AttributeError
 
+    # Fields location_ref is resolved from (feedback/signals.py)
+    LOCATION_FIELDS = frozenset({'role', 'address', 'work_location'})
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.LOCATION_FIELDS & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'location_ref'}
+        super().save(*args, **kwargs)
+
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
 
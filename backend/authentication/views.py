@@ -9,7 +9,7 @@ from .models import UserAccount
 from .serializers import UserRegisterSerializer, UserLoginSerializer, UserProfileSerializer
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from authentication.utils import CookieJWTAuthentication
-from rest_framework.throttling import ScopedRateThrottle
+from feedback.throttling import SlidingWindowScopedRateThrottle
 from feedback.models import Feedback
 from feedback.serializers import FeedbackSerializer
 
@@ -39,7 +39,7 @@ class RegisterView(generics.CreateAPIView):
     
     serializer_class = UserRegisterSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowScopedRateThrottle]
     throttle_scope = 'custom_scope'
 
 # class LoginView(APIView):
@@ -75,7 +75,7 @@ class RegisterView(generics.CreateAPIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowScopedRateThrottle]
     throttle_scope = "custom_scope"
 
     def post(self, request):
@@ -75,6 +75,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text search and trigram lookups (no-ops on SQLite)
     
     # app modules
     'authentication',
@@ -135,6 +136,22 @@ DATABASES = {
     'default': dj_database_url.parse(os.getenv('DATABASE_URL'))
 }
 
+# Cache
+# Rate limit counters live here, so use Redis when several worker processes serve the API
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        }
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -183,13 +200,15 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
      'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
+        'feedback.throttling.SlidingWindowUserRateThrottle',
+        'feedback.throttling.SlidingWindowAnonRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'user': '1000/day',  # Authenticated users: 100 requests per day
         'anon': '10/minute',  # Anonymous users: 10 requests per minute
         'custom_scope': '500/minute',
+        'feedback_create': '5/hour',  # Feedback submissions per user
+        'feedback_bulk_create': '5000/hour',  # Items per staff/authority account through the bulk endpoint (intake channels)
     },
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -197,7 +216,7 @@ REST_FRAMEWORK = {
     
 }
 
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 # settings.py
 SIMPLE_JWT = {
@@ -220,3 +239,136 @@ CORS_ALLOW_CREDENTIALS = True
 
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Sentiment scoring runs in the background job worker (manage.py process_sentiment_jobs)
+# Use "feedback.sentiment.HashedNgramSentimentScorer" to score offline without any Gemini calls
+SENTIMENT_SCORER = os.getenv("SENTIMENT_SCORER", "feedback.sentiment.GeminiSentimentScorer")
+SENTIMENT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH")  # Optional trained .npy weights for the offline scorer
+
+FEEDBACK_JOBS = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,  # After this many failures a job is dead-lettered
+    "BACKOFF_SECONDS": 30,  # Doubled on every retry
+    "MAX_BACKOFF_SECONDS": 3600,
+    "LEASE_SECONDS": 300,  # RUNNING jobs older than this are assumed abandoned and re-claimed
+    "POLL_INTERVAL_SECONDS": 5,
+}
+
+# Text search configuration for the Postgres full-text index; 'simple' doesn't stem, so it works
+# for feedback written in any language. Changing it requires manage.py rebuild_search_index.
+SEARCH_CONFIG = "simple"
+
+FEEDBACK_BULK_MAX_ITEMS = 500  # Items accepted per /api/feedback/bulk-create/ request
+
+# Near-duplicate detection (MinHash + LSH, see feedback/dedup.py)
+DUPLICATE_DETECTION = {
+    "NUM_PERM": 128,  # Signature length; changing it requires manage.py build_duplicate_index
+    "BANDS": 32,  # 32 bands x 4 rows: texts ~45% similar already share a bucket half of the time
+    "SHINGLE_SIZE": 5,  # Characters per shingle
+    "THRESHOLD": 0.7,  # Estimated Jaccard similarity treated as a duplicate
+    "SCOPES": ["user"],  # Matches in these scopes are rejected on create; "global" ones are returned as duplicate_of
+    "USER_WINDOW_HOURS": 1,  # Same user re-posting
+    "GLOBAL_WINDOW_HOURS": 24,  # Same complaint posted from many accounts
+    "MAX_CANDIDATES": 500,
+}
+
+# Translation of feedback title/description (stored in FeedbackTranslation, see feedback/translation.py)
+# Use "feedback.translation.OfflineTranslationBackend" for tests and offline runs
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "feedback.translation.GoogleTranslateBackend")
+TRANSLATION_LANGUAGES = ["en", "hi"]  # Pre-translated in the background by manage.py process_translation_jobs
+TRANSLATION_EXECUTOR = {
+    "MAX_WORKERS": 8,  # Concurrent translation calls per process
+    "DEADLINE_SECONDS": 3,  # Per request: untranslated text is returned with "translated": false after this
+    "JOB_DEADLINE_SECONDS": 60,  # Per batch in the background worker
+}
+
+# Write-behind vote counters (see votes/buffer.py): vote rows are written immediately, counter
+# deltas collect in the cache and are applied in one batched UPDATE per interval. Helps when a
+# single feedback goes viral; run manage.py flush_vote_buffer so idle periods are flushed too.
+VOTE_BUFFER = {
+    "ENABLED": os.getenv("VOTE_BUFFER_ENABLED") == "True",
+    "FLUSH_INTERVAL_SECONDS": 5,
+    "FLUSH_LOCK_SECONDS": 60,  # Longest a flush may take before another one can start
+    "CACHE_ALIAS": "default",  # Shared between processes only with Redis; LocMem is per process
+}
+
+# Hot score (see votes/ranking.py): every vote adds ±weight, and the score halves every
+# HALF_LIFE_HOURS (applied by manage.py decay_hot_scores). Feedback at or above
+# TRENDING_THRESHOLD is flagged `trending` and listed by /api/vote/feedback/trending/.
+HOT_SCORE = {
+    "HALF_LIFE_HOURS": 12,
+    "DECAY_INTERVAL_SECONDS": 600,
+    "URGENCY_WEIGHTS": {"LOW": 0.75, "MEDIUM": 1.0, "HIGH": 1.5},
+    "NEGATIVE_SENTIMENT_WEIGHT": 0.5,  # A sentiment of -1 makes votes count 1.5x
+    "TRENDING_THRESHOLD": 5.0,
+    "MIN_SCORE": 0.01,  # Decayed below this, a score is reset to 0
+}
+
+# Triage priority (see feedback/priority.py): urgency + negative sentiment + log net votes +
+# age. Stored in Feedback.priority_score; run manage.py rebuild_priority_scores after changing these.
+PRIORITY = {
+    "URGENCY_POINTS": {"LOW": 0.0, "MEDIUM": 10.0, "HIGH": 25.0},
+    "NEGATIVE_SENTIMENT_POINTS": 10.0,  # At a sentiment of -1
+    "VOTE_POINTS": 3.0,  # Per e-fold of net votes: 10 net upvotes add ~7 points
+    "AGE_POINTS_PER_DAY": 1.0,  # An item waiting 10 days more than another outranks it by 10 points
+    "EPOCH": datetime(2024, 1, 1, tzinfo=dt_timezone.utc),  # Reference point of the stored scores
+}
+
+# Bulk admin actions (see admindashboard/bulk_actions.py)
+BULK_ACTIONS = {
+    "CHUNK_SIZE": 1000,  # Rows per UPDATE and transaction
+    "MAX_IDS": 10000,  # Longer id lists should use a filter instead
+}
+
+# Background feedback exports (see admindashboard/export_jobs.py, run manage.py process_export_jobs).
+# Finished files are kept under EXPORT_ROOT and reused for identical requests until the data changes.
+EXPORT_ROOT = Path(os.getenv("EXPORT_ROOT", BASE_DIR / "exports"))
+EXPORT_JOBS = {
+    "MAX_ATTEMPTS": 3,
+    "LEASE_SECONDS": 300,  # RUNNING jobs without progress for this long are re-claimed
+    "POLL_INTERVAL_SECONDS": 5,
+    "PROGRESS_EVERY_ROWS": 5000,
+    "RETENTION_DAYS": 7,  # Finished files older than this are deleted
+}
+
+# AI insights (see ai_insights/insights.py): the Gemini analysis is cached per (location, window)
+# and recomputed in the background once the feedback in the window changes.
+AI_INSIGHTS = {
+    "WINDOW_DAYS": 30,
+    "MAX_WINDOW_DAYS": 365,
+    "PROMPT_ROWS": 100,  # Newest descriptions sent to Gemini
+    "PROMPT_TEXT_CHARS": 1000,  # Each description is cut to this length
+    "CACHE_TIMEOUT_SECONDS": 7 * 24 * 3600,
+    "REFRESH_LOCK_SECONDS": 120,  # At most one background refresh per key in this time
+    "CACHE_ALIAS": "default",
+}
+
+# Local topic engine (see ai_insights/topics.py, run manage.py update_topics)
+TOPICS = {
+    "WINDOWS": [1, 7, 30],  # Days; summaries kept up to date by update_topics
+    "BASELINE_DAYS": 28,  # Growth is measured against this many days before the window
+    "MIN_DOC_COUNT": 3,  # Terms in fewer feedbacks of the window are ignored
+    "MAX_TERMS": 200,  # Candidate terms clustered per window
+    "MAX_TOPICS": 10,
+    "TERMS_PER_TOPIC": 5,
+    "SIMILARITY_THRESHOLD": 0.25,  # Co-occurrence cosine needed to join a topic
+    "REPRESENTATIVES": 5,  # Feedback ids returned per topic
+    "BATCH_SIZE": 5000,
+    "INDEX_OVERLAP_SECONDS": 600,  # Feedback this recent is looked at again, in case it committed after a higher id
+    "UPDATE_INTERVAL_SECONDS": 300,
+    "SUMMARY_MAX_AGE_SECONDS": 900,  # Older summaries are served while a background refresh runs
+    "SUMMARY_RETENTION_DAYS": 30,
+    "REFRESH_LOCK_SECONDS": 600,  # At most one on-request refresh per window in this time
+    "CACHE_ALIAS": "default",
+}
+
+# Burst detection over the daily rollups (see ai_insights/bursts.py)
+BURSTS = {
+    "WINDOW_DAYS": 7,
+    "BASELINE_DAYS": 28,
+    "EWMA_ALPHA": 0.1,  # Weight decay per baseline day, newest first
+    "MIN_Z": 3.0,  # z-score at which a group counts as an anomaly
+    "MIN_COUNT": 5,  # ... if it also has at least this many feedbacks in the window
+    "CACHE_SECONDS": 300,
+    "CACHE_ALIAS": "default",
+}
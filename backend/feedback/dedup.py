@@ -0,0 +1,222 @@
+"""
+Near-duplicate detection with MinHash + LSH: similar texts share at least one band bucket with
+high probability, so a lookup is an indexed `bucket IN (...)` query plus a signature comparison
+on the few candidates.
+"""
+import hashlib
+import re
+import zlib
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils.timezone import now
+
+from .models import FeedbackLSHBucket, FeedbackSignature
+
+NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def dedup_setting(name):
+    return settings.DUPLICATE_DETECTION[name]
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm):
+    # Fixed seed: signatures must be comparable across processes and deploys
+    rng = np.random.default_rng(seed=4_242)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text):
+    normalized = NON_WORD_RE.sub(' ', (text or '').lower()).strip()
+    size = dedup_setting('SHINGLE_SIZE')
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash(text):
+    """Signature of `NUM_PERM` uint32 values (multiply-shift hashing of crc32'd shingles)."""
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles(text)), dtype=np.uint64)
+    a, b = _permutations(dedup_setting('NUM_PERM'))
+    with np.errstate(over='ignore'):  # uint64 wrap-around is part of the hash
+        permuted = (hashes[:, None] * a[None, :] + b[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def band_buckets(signature):
+    """Return one signed 64-bit bucket id per band."""
+    bands = np.array_split(signature.astype('<u4'), dedup_setting('BANDS'))
+    buckets = []
+    for band, values in enumerate(bands):
+        digest = hashlib.blake2b(values.tobytes(), digest_size=8, salt=band.to_bytes(2, 'little')).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(signature == other))
+
+
+def index_feedbacks(feedbacks):
+    """(Re)build signatures and buckets for the given feedbacks."""
+    feedbacks = list(feedbacks)
+    if not feedbacks:
+        return
+
+    existing = dict(
+        FeedbackSignature.objects.filter(feedback__in=feedbacks).values_list('feedback_id', 'minhash')
+    )
+    signatures, buckets, changed_ids = [], [], []
+    for feedback in feedbacks:
+        signature = minhash(feedback.description)
+        data = to_bytes(signature)
+        if feedback.id in existing and bytes(existing[feedback.id]) == data:
+            continue  # Description unchanged (e.g. a vote or status update)
+
+        changed_ids.append(feedback.id)
+        signatures.append(FeedbackSignature(feedback_id=feedback.id, minhash=data))
+        buckets.extend(
+            FeedbackLSHBucket(
+                feedback_id=feedback.id, user_id=feedback.user_id, created_at=feedback.created_at,
+                band=band, bucket=bucket,
+            )
+            for band, bucket in enumerate(band_buckets(signature))
+        )
+
+    if not changed_ids:
+        return
+    FeedbackSignature.objects.filter(feedback_id__in=changed_ids).delete()
+    FeedbackLSHBucket.objects.filter(feedback_id__in=changed_ids).delete()
+    FeedbackSignature.objects.bulk_create(signatures)
+    FeedbackLSHBucket.objects.bulk_create(buckets)
+
+
+def scope_filter(user=None, scopes=None):
+    """
+    Q restricting candidates to the configured scopes:
+    'user' = the same user's feedback within USER_WINDOW_HOURS,
+    'global' = anyone's feedback within GLOBAL_WINDOW_HOURS.
+    """
+    current_time = now()
+    condition = Q(pk__in=[])
+    for scope in scopes or dedup_setting('SCOPES'):
+        if scope == 'user' and user is not None:
+            condition |= Q(user=user, created_at__gte=current_time - timedelta(hours=dedup_setting('USER_WINDOW_HOURS')))
+        elif scope == 'global':
+            condition |= Q(created_at__gte=current_time - timedelta(hours=dedup_setting('GLOBAL_WINDOW_HOURS')))
+    return condition
+
+
+def find_duplicates(text, user=None, scopes=None, exclude_ids=(), signature=None):
+    """Return [(feedback_id, similarity)] above THRESHOLD, most similar first."""
+    signature = minhash(text) if signature is None else signature
+    return find_duplicates_many([signature], user, scopes, exclude_ids)[0]
+
+
+def find_duplicates_many(signatures, user=None, scopes=None, exclude_ids=()):
+    """
+    find_duplicates() for a batch of signatures: the buckets of the whole batch are
+    looked up in one query and the candidates' signatures in a second one.
+    """
+    item_buckets = [band_buckets(signature) for signature in signatures]
+    all_buckets = {bucket for buckets in item_buckets for bucket in buckets}
+    if not all_buckets:
+        return [[] for _ in signatures]
+
+    candidates_by_bucket = {}
+    rows = (
+        FeedbackLSHBucket.objects.filter(bucket__in=all_buckets)
+        .filter(scope_filter(user, scopes))
+        .exclude(feedback_id__in=exclude_ids)
+        # Newest first, so a capped candidate list is the same on every call
+        .order_by('-feedback_id', 'bucket')
+        .values_list('bucket', 'feedback_id')[:dedup_setting('MAX_CANDIDATES') * len(signatures)]
+    )
+    for bucket, feedback_id in rows:
+        candidates_by_bucket.setdefault(bucket, set()).add(feedback_id)
+
+    candidate_ids = set().union(*candidates_by_bucket.values()) if candidates_by_bucket else set()
+    candidate_signatures = {
+        feedback_id: from_bytes(data)
+        for feedback_id, data in FeedbackSignature.objects.filter(feedback_id__in=candidate_ids).values_list('feedback_id', 'minhash')
+    } if candidate_ids else {}
+
+    threshold = dedup_setting('THRESHOLD')
+    results = []
+    for signature, buckets in zip(signatures, item_buckets):
+        matches = []
+        ids = set().union(*(candidates_by_bucket.get(bucket, ()) for bucket in buckets))
+        for feedback_id in ids:
+            if feedback_id not in candidate_signatures:
+                continue
+            score = similarity(signature, candidate_signatures[feedback_id])
+            if score >= threshold:
+                matches.append((feedback_id, score))
+        results.append(sorted(matches, key=lambda match: (-match[1], -match[0])))
+    return results
+
+
+def duplicate_clusters(since, min_size=2, queryset=None):
+    """
+    Group feedback created after `since` into clusters of near-duplicates.
+
+    Only buckets holding more than one feedback are read; pairs sharing a bucket are
+    verified against THRESHOLD and merged with union-find.
+    """
+    buckets = FeedbackLSHBucket.objects.filter(created_at__gte=since)
+    if queryset is not None:
+        buckets = buckets.filter(feedback__in=queryset)
+
+    shared = buckets.values('bucket').annotate(size=Count('id')).filter(size__gt=1).values('bucket')
+    members = {}
+    for bucket, feedback_id in buckets.filter(bucket__in=shared).values_list('bucket', 'feedback_id'):
+        members.setdefault(bucket, set()).add(feedback_id)
+    if not members:
+        return []
+
+    ids = set().union(*members.values())
+    signatures = {
+        feedback_id: from_bytes(data)
+        for feedback_id, data in FeedbackSignature.objects.filter(feedback_id__in=ids).values_list('feedback_id', 'minhash')
+    }
+
+    parent = {feedback_id: feedback_id for feedback_id in ids}
+
+    def find(feedback_id):
+        while parent[feedback_id] != feedback_id:
+            parent[feedback_id] = parent[parent[feedback_id]]
+            feedback_id = parent[feedback_id]
+        return feedback_id
+
+    threshold = dedup_setting('THRESHOLD')
+    for bucket_ids in members.values():
+        bucket_ids = sorted(bucket_ids)
+        for i, first in enumerate(bucket_ids):
+            for second in bucket_ids[i + 1:]:
+                if find(first) == find(second):
+                    continue
+                if similarity(signatures[first], signatures[second]) >= threshold:
+                    parent[find(second)] = find(first)
+
+    clusters = {}
+    for feedback_id in ids:
+        clusters.setdefault(find(feedback_id), []).append(feedback_id)
+    return sorted(
+        (sorted(cluster) for cluster in clusters.values() if len(cluster) >= min_size),
+        key=lambda cluster: -len(cluster),
+    )
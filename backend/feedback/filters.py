@@ -1,5 +1,12 @@
 import django_filters
-from .models import Feedback
+from .models import Feedback, Location
+from .search import search_queryset
+
+
+def filter_location(queryset, name, value):
+    """Feedback filed under the Location `value` names (any spelling or alias it is known by)."""
+    return queryset.filter(location_ref_id=Location.objects.resolve_id(value))
+
 
 class FeedbackFilter(django_filters.FilterSet):
     feedback_type = django_filters.CharFilter(field_name='feedback_type', lookup_expr='iexact')
@@ -9,8 +16,39 @@ class FeedbackFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method='filter_search')
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(keywords__icontains=value.lower())
+        return search_queryset(queryset, value)
 
     class Meta:
         model = Feedback
         fields = ['feedback_type', 'category', 'status', 'urgency']
+
+
+class TrendingFilter(django_filters.FilterSet):
+    category = django_filters.CharFilter(field_name='category', lookup_expr='iexact')
+    location = django_filters.CharFilter(method=filter_location)
+
+    class Meta:
+        model = Feedback
+        fields = ['category']
+
+
+class ExportFilter(django_filters.FilterSet):
+    category = django_filters.CharFilter(field_name='category', lookup_expr='iexact')
+    status = django_filters.CharFilter(field_name='status', lookup_expr='iexact')
+    location = django_filters.CharFilter(method=filter_location)
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Feedback
+        fields = ['category', 'status']
+
+
+class BulkActionFilter(ExportFilter):
+    """The filter expression of a bulk admin action: the export filters plus urgency and type."""
+    urgency = django_filters.CharFilter(field_name='urgency', lookup_expr='iexact')
+    feedback_type = django_filters.CharFilter(field_name='feedback_type', lookup_expr='iexact')
+
+    class Meta:
+        model = Feedback
+        fields = ['category', 'status', 'urgency', 'feedback_type']
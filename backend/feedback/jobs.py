@@ -0,0 +1,187 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from admindashboard import rollups
+
+from . import priority
+from .models import Feedback, FeedbackJob
+from .sentiment import get_scorer
+from .translation import get_executor, translate_items
+
+
+def job_setting(name):
+    return settings.FEEDBACK_JOBS[name]
+
+
+def enqueue_jobs(feedbacks, kind):
+    """Queue one job of the given kind per feedback (a single INSERT)."""
+    return FeedbackJob.objects.bulk_create(
+        [FeedbackJob(feedback=feedback, kind=kind) for feedback in feedbacks]
+    )
+
+
+def claim_jobs(kind, batch_size):
+    """
+    Lock a batch of due jobs and mark them RUNNING.
+
+    Jobs left RUNNING longer than the lease (crashed worker) are picked up again.
+    On Postgres, SKIP LOCKED lets several workers claim disjoint batches.
+    """
+    current_time = now()
+    lease_expired = current_time - timedelta(seconds=job_setting('LEASE_SECONDS'))
+
+    with transaction.atomic():
+        jobs = list(
+            FeedbackJob.objects.select_for_update(skip_locked=True)
+            .filter(kind=kind)
+            .filter(
+                Q(status=FeedbackJob.Status.PENDING, run_after__lte=current_time)
+                | Q(status=FeedbackJob.Status.RUNNING, updated_at__lt=lease_expired)
+            )
+            .select_related('feedback')
+            .order_by('run_after', 'id')[:batch_size]
+        )
+        FeedbackJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=FeedbackJob.Status.RUNNING, attempts=F('attempts') + 1, updated_at=current_time
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def backoff_delay(attempts):
+    """Exponential backoff: BACKOFF_SECONDS, 2x, 4x ... capped at MAX_BACKOFF_SECONDS."""
+    delay = job_setting('BACKOFF_SECONDS') * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, job_setting('MAX_BACKOFF_SECONDS')))
+
+
+def complete_jobs(jobs):
+    FeedbackJob.objects.filter(id__in=[job.id for job in jobs]).update(
+        status=FeedbackJob.Status.DONE, last_error='', updated_at=now()
+    )
+
+
+def fail_job(job, error):
+    """Reschedule a failed job with backoff, or dead-letter it once attempts run out."""
+    job.last_error = str(error)[:2000]
+    if job.attempts >= job_setting('MAX_ATTEMPTS'):
+        job.status = FeedbackJob.Status.DEAD
+    else:
+        job.status = FeedbackJob.Status.PENDING
+        job.run_after = now() + backoff_delay(job.attempts)
+    job.save(update_fields=['status', 'run_after', 'last_error', 'updated_at'])
+
+
+def write_scores(scores):
+    """
+    Store {feedback id: sentiment score} and move the daily rollups to match, in one transaction.
+
+    The rollup "before" state is re-read from the locked rows rather than taken from wherever
+    the text was read, so an edit in between (or a crash halfway) can't leave the rollups off.
+    Feedback deleted in the meantime is skipped. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        rows = (
+            Feedback.objects.select_for_update().filter(pk__in=list(scores))
+            .order_by('id').values('id', *rollups.SNAPSHOT_FIELDS)
+        )
+        feedbacks, changes = [], []
+        for row in rows:
+            score = scores[row['id']]
+            before = rollups.snapshot(row)
+            # priority_score reads the old score in the same UPDATE
+            feedbacks.append(Feedback(pk=row['id'], sentiment_score=score, priority_score=priority.sentiment_update(score)))
+            changes.append((before, {**before, 'sentiment_score': score}))
+        # bulk_update skips Feedback.save() and its signals, so keywords are not rebuilt for a
+        # score change and the daily rollups are updated here
+        Feedback.objects.bulk_update(feedbacks, ['sentiment_score', 'priority_score'])
+        rollups.apply_changes(changes)
+    return len(feedbacks)
+
+
+def handle_sentiment_jobs(jobs, scorer=None):
+    """Score the batch in one scorer call and write all scores with a single UPDATE."""
+    scorer = scorer or get_scorer()
+    scores = scorer.score_batch([job.feedback.description for job in jobs])
+
+    scored, failed = [], []
+    for job, score in zip(jobs, scores):
+        (failed if score is None else scored).append(job)
+    write_scores({job.feedback_id: score for job, score in zip(jobs, scores) if score is not None})
+    complete_jobs(scored)
+    for job in failed:
+        fail_job(job, "Scorer returned no score")
+    return len(scored)
+
+
+def handle_translation_jobs(jobs, backend=None):
+    """
+    Detect the source language, then pre-translate into every TRANSLATION_LANGUAGES entry.
+
+    `backend` here is a TranslationExecutor (the process-wide one by default).
+    """
+    executor = backend or get_executor()
+    feedbacks = [job.feedback for job in jobs]
+
+    undetected = [feedback for feedback in feedbacks if not feedback.language]
+    if undetected:
+        detected = executor.backend().detect([feedback.description for feedback in undetected])
+        for feedback, language in zip(undetected, detected):
+            feedback.language = language or ''
+        Feedback.objects.bulk_update(undetected, ['language'])
+
+    items = [
+        {'id': feedback.id, 'title': feedback.title, 'description': feedback.description, 'language': feedback.language}
+        for feedback in feedbacks
+    ]
+    for language in settings.TRANSLATION_LANGUAGES:
+        translate_items([dict(item) for item in items], language, executor, fail_silently=False)
+    complete_jobs(jobs)
+    return len(jobs)
+
+
+HANDLERS = {
+    FeedbackJob.Kind.SENTIMENT: handle_sentiment_jobs,
+    FeedbackJob.Kind.TRANSLATION: handle_translation_jobs,
+}
+
+
+def process_batch(kind, backend=None, batch_size=None):
+    """
+    Claim and run one batch of jobs. Returns the number of jobs claimed.
+
+    `backend` is handed to the kind's handler (e.g. a sentiment scorer); None means the configured default.
+    """
+    jobs = claim_jobs(kind, batch_size or job_setting('BATCH_SIZE'))
+    if not jobs:
+        return 0
+
+    handler = HANDLERS[kind]
+    try:
+        handler(jobs, backend)
+    except Exception as e:
+        for job in jobs:
+            fail_job(job, e)
+    return len(jobs)
+
+
+def run_worker(kind, backend=None, batch_size=None, once=False, poll_interval=None, log=print):
+    """Process batches of `kind` jobs until the queue is empty (once=True) or forever, polling. Returns the job count."""
+    batch_size = batch_size or job_setting('BATCH_SIZE')
+    poll_interval = poll_interval or job_setting('POLL_INTERVAL_SECONDS')
+
+    total = 0
+    while True:
+        claimed = process_batch(kind, backend=backend, batch_size=batch_size)
+        total += claimed
+        if claimed:
+            log(f"Processed {claimed} {kind.lower()} jobs")
+            continue
+        if once:
+            return total
+        time.sleep(poll_interval)
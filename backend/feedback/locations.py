@@ -0,0 +1,37 @@
+"""
+Normalization rules for free-text locations.
+
+Feedback carries whatever the citizen typed ("Pune", " pune city ", "PUNE, Maharashtra") and
+authorities a full postal address, so both are mapped onto Location rows by a normalized key:
+accents folded, lowercased, punctuation dropped, PIN codes and generic words ("city",
+"district" ...) removed. Spellings that still differ ("Bombay" / "Mumbai") are LocationAlias
+rows. Location.objects.resolve() applies these rules.
+"""
+import re
+import unicodedata
+
+# id no Location has: scopes built from an unknown place match nothing
+NO_MATCH = -1
+
+GENERIC_WORDS = frozenset({'city', 'district', 'dist', 'distt', 'taluka', 'tehsil', 'town', 'municipal', 'corporation'})
+PIN_CODE = re.compile(r"\b\d{6}\b")
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_key(text):
+    """The lookup key of a place name: "  Pune City, 411001 " -> "pune"."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    words = NON_WORD.sub(' ', PIN_CODE.sub(' ', text)).split()
+    return ' '.join(word for word in words if word not in GENERIC_WORDS)[:200]
+
+
+def display_name(text):
+    """Name for a Location created from free text: the first comma-separated part, tidied."""
+    name = ' '.join((text or '').split(',')[0].split())
+    return name.title() if name.islower() or name.isupper() else name
+
+
+def address_candidates(address):
+    """Keys to try for an address, most specific part first: "12 MG Road, Pune, Maharashtra" -> road, pune, ..."""
+    parts = [normalize_key(part) for part in re.split(r"[,\n;]", address or '')]
+    return [part for part in parts if part]
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from admindashboard import rollups
+from admindashboard.models import ExportJob
+from authentication.models import UserAccount
+from feedback.locations import normalize_key
+from feedback.models import Feedback, Location, LocationAlias
+
+
+class Command(BaseCommand):
+    help = (
+        "Map feedback and authorities onto canonical Locations. --alias Bombay=Mumbai records another "
+        "spelling (merging a Location already created for it); --all re-resolves every row, not just unmapped ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', action='append', default=[], metavar='SPELLING=LOCATION')
+        parser.add_argument('--all', action='store_true', help="Re-resolve feedback that already has a location")
+
+    def handle(self, *args, **options):
+        changed = 0
+        with transaction.atomic():
+            for value in options['alias']:
+                spelling, _, target = value.partition('=')
+                if not normalize_key(spelling) or not normalize_key(target):
+                    raise CommandError(f"Expected SPELLING=LOCATION, got {value!r}")
+                changed += self.add_alias(normalize_key(spelling), Location.objects.resolve(target, create=True))
+
+            changed += self.assign_feedback(options['all'])
+            changed += self.assign_authorities()
+
+        if changed:
+            total = rollups.rebuild()
+            self.stdout.write(f"Rebuilt {total} daily stat rows")
+        self.stdout.write(self.style.SUCCESS(f"Done, {changed} rows remapped"))
+
+    def add_alias(self, alias, target):
+        """Point `alias` at `target`; a Location that was created under that spelling is merged into it."""
+        changed = 0
+        source = Location.objects.filter(key=alias).exclude(pk=target.pk).first()
+        if source is not None:
+            changed += Feedback.objects.filter(location_ref=source).update(location_ref=target)
+            changed += UserAccount.objects.filter(location_ref=source).update(location_ref=target)
+            ExportJob.objects.filter(location_ref_id=source.pk).update(location_ref_id=target.pk)
+            LocationAlias.objects.filter(location=source).update(location=target)
+            source.delete()
+            self.stdout.write(f"Merged {source.name} into {target.name}")
+        LocationAlias.objects.update_or_create(alias=alias, defaults={'location': target})
+        return changed
+
+    def assign_feedback(self, everything):
+        """One resolve and one UPDATE per distinct location text."""
+        queryset = Feedback.objects.exclude(location='')
+        if not everything:
+            queryset = queryset.filter(location_ref=None)
+        changed = 0
+        for text in queryset.values_list('location', flat=True).distinct().order_by():
+            location = Location.objects.resolve(text, create=True)
+            if location is not None:
+                changed += queryset.filter(location=text).exclude(location_ref=location).update(location_ref=location)
+        self.stdout.write(f"Mapped {changed} feedbacks")
+        return changed
+
+    def assign_authorities(self):
+        changed = 0
+        for user in UserAccount.objects.filter(role=UserAccount.Role.ADMIN):
+            location = Location.objects.for_authority(user)
+            if user.location_ref_id != (location.pk if location else None):
+                UserAccount.objects.filter(pk=user.pk).update(location_ref=location)
+                changed += 1
+        self.stdout.write(f"Mapped {changed} authorities")
+        return changed
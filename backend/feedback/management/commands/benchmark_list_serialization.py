@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from authentication.models import UserAccount
+from feedback.models import Feedback
+from feedback.renderers import FastJSONRenderer
+from feedback.serializers import FeedbackListSerializer, FeedbackSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time feedback list serialization per 1k rows: FeedbackSerializer + JSONRenderer vs the lean values() path."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Rows serialized per run.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path (the best one is reported).")
+        parser.add_argument('--expand-user', action='store_true', help="Nest the user in the lean output too.")
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(func())
+            timings.append(time.perf_counter() - started)
+        return min(timings), size
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        try:
+            # Synthetic rows are created inside a transaction that is always rolled back
+            with transaction.atomic():
+                self.run(rows, options['repeat'], options['expand_user'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, repeat, expand_user):
+        missing = rows - Feedback.objects.count()
+        if missing > 0:
+            user = UserAccount.objects.create(email='benchmark@example.com', first_name='Bench', last_name='Mark')
+            feedbacks = [
+                Feedback(
+                    user=user, title=f"Benchmark feedback {i}", description="Streetlight out near the bus stop. " * 8,
+                    feedback_type='COMPLAINT', category='ELECTRICITY', location='Benchmark Ward',
+                )
+                for i in range(missing)
+            ]
+            for feedback in feedbacks:
+                feedback.build_keywords()
+                feedback.assign_location()
+                feedback.assign_priority()
+            Feedback.objects.bulk_create(feedbacks)
+
+        queryset = Feedback.objects.order_by('-created_at', '-id')
+        lean = FeedbackListSerializer()
+        lean.expand = ('user',) if expand_user else ()
+
+        def full_path():
+            data = FeedbackSerializer(queryset.select_related('user')[:rows], many=True).data
+            return JSONRenderer().render(data)
+
+        def lean_path():
+            data = [lean.to_representation(row) for row in lean.select(queryset)[:rows]]
+            return FastJSONRenderer().render(data)
+
+        before, before_size = self.best_of(repeat, full_path)
+        after, after_size = self.best_of(repeat, lean_path)
+        per_1k = 1000 / rows
+        self.stdout.write(f"FeedbackSerializer + JSONRenderer: {before * per_1k * 1000:.1f} ms / 1k rows ({before_size} bytes)")
+        self.stdout.write(f"FeedbackListSerializer + FastJSONRenderer: {after * per_1k * 1000:.1f} ms / 1k rows ({after_size} bytes)")
+        self.stdout.write(self.style.SUCCESS(f"{before / after:.1f}x faster"))
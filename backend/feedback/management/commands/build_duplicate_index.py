@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from feedback.dedup import index_feedbacks
+from feedback.models import Feedback
+
+
+class Command(BaseCommand):
+    help = "Build (or refresh) the MinHash/LSH duplicate index for existing feedback."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Feedback.objects.order_by('id').only('id', 'user_id', 'description', 'created_at')
+
+        last_id, total = 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            index_feedbacks(batch)
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Indexed {total} feedbacks")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} feedbacks indexed"))
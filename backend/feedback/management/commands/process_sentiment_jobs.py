@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from feedback.jobs import run_worker
+from feedback.models import FeedbackJob
+from feedback.sentiment import get_scorer
+
+
+class Command(BaseCommand):
+    help = "Score queued feedback sentiment in batches (retries with backoff, dead-letters after MAX_ATTEMPTS)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Jobs claimed per batch.")
+        parser.add_argument('--scorer', default=None, help="Dotted path of the scorer class (defaults to SENTIMENT_SCORER).")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit instead of polling.")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        total = run_worker(
+            FeedbackJob.Kind.SENTIMENT,
+            backend=get_scorer(options['scorer']),
+            batch_size=options['batch_size'],
+            once=options['once'],
+            poll_interval=options['poll_interval'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} jobs processed"))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from feedback.jobs import run_worker
+from feedback.models import FeedbackJob
+from feedback.translation import TranslationExecutor
+
+
+class Command(BaseCommand):
+    help = "Detect feedback languages and pre-translate them into TRANSLATION_LANGUAGES in the background."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Jobs claimed per batch.")
+        parser.add_argument('--backend', default=None, help="Dotted path of the translation backend (defaults to TRANSLATION_BACKEND).")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit instead of polling.")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        total = run_worker(
+            FeedbackJob.Kind.TRANSLATION,
+            backend=TranslationExecutor(backend_path=options['backend'], deadline=settings.TRANSLATION_EXECUTOR['JOB_DEADLINE_SECONDS']),
+            batch_size=options['batch_size'],
+            once=options['once'],
+            poll_interval=options['poll_interval'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} jobs processed"))
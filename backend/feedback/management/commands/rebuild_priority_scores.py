@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from feedback import priority
+
+
+class Command(BaseCommand):
+    help = "Recompute Feedback.priority_score for every row (e.g. after changing PRIORITY)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = priority.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} priority scores written"))
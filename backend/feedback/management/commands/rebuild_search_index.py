@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from feedback import search
+from feedback.models import Feedback
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for all feedback (e.g. after changing SEARCH_CONFIG)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Feedback.objects.order_by('id').only('id', 'title', 'description', 'category', 'location')
+
+        last_id, total = 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            search.index_feedbacks(batch)
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Indexed {total} feedbacks")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} feedbacks indexed"))
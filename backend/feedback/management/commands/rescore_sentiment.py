@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from feedback.jobs import write_scores
+from feedback.models import Feedback
+from feedback.sentiment import get_scorer
+
+
+class Command(BaseCommand):
+    help = "Re-score Feedback.sentiment_score in bulk with the configured (or given) scorer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scorer', default=None, help="Dotted path of the scorer class (defaults to SENTIMENT_SCORER).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--missing-only', action='store_true', help="Only score feedback without a sentiment score.")
+
+    def handle(self, *args, **options):
+        scorer = get_scorer(options['scorer'])
+        batch_size = options['batch_size']
+
+        queryset = Feedback.objects.order_by('id').only('id', 'description')
+        if options['missing_only']:
+            queryset = queryset.filter(sentiment_score__isnull=True)
+
+        # Walk the table by primary key so each batch is an indexed range read
+        last_id, total = 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            scores = scorer.score_batch([feedback.description for feedback in batch])
+            # Locks and re-reads the rows, so the rollups follow edits made since the read above
+            scored = write_scores({feedback.id: score for feedback, score in zip(batch, scores) if score is not None})
+
+            total += scored
+            last_id = batch[-1].id
+            self.stdout.write(f"Scored {total} feedbacks")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} feedbacks re-scored"))
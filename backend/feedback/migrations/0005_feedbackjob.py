@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0004_remove_feedback_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SENTIMENT', 'Sentiment Scoring')], max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('DEAD', 'Dead Letter')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='feedback.feedback')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'status', 'run_after'], name='feedback_job_queue_idx')],
+            },
+        ),
+    ]
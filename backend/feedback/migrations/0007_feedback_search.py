@@ -0,0 +1,64 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:48
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+FTS_TABLE = 'feedback_feedback_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """Vendor-specific search structures (GIN indexes on Postgres, an FTS5 table on SQLite), filled from existing rows."""
+    Feedback = apps.get_model('feedback', 'Feedback')
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS feedback_search_vector_gin ON feedback_feedback USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS feedback_title_trgm ON feedback_feedback USING gin (title gin_trgm_ops)"
+        )
+        config = settings.SEARCH_CONFIG
+        Feedback.objects.update(search_vector=(
+            SearchVector('title', weight='A', config=config)
+            + SearchVector('description', weight='B', config=config)
+            + SearchVector('category', 'location', weight='C', config=config)
+        ))
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, category, location, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, category, location) "
+            "SELECT id, title, description, category, location FROM feedback_feedback"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS feedback_search_vector_gin")
+        schema_editor.execute("DROP INDEX IF EXISTS feedback_title_trgm")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0006_duplicate_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),  # Only runs on Postgres
+        migrations.AddField(
+            model_name='feedback',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0007_feedback_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='language',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='feedbackjob',
+            name='kind',
+            field=models.CharField(choices=[('SENTIMENT', 'Sentiment Scoring'), ('TRANSLATION', 'Translation')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='FeedbackTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('language', models.CharField(max_length=10)),
+                ('source_hash', models.CharField(max_length=40)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='feedback.feedback')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('feedback', 'language', 'field', 'source_hash'), name='unique_feedback_translation')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0008_feedback_translations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['created_at', 'id'], name='feedback_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['upvotes', 'id'], name='feedback_upvotes_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['urgency', 'id'], name='feedback_urgency_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='feedback_user_created_id_idx'),
+        ),
+    ]
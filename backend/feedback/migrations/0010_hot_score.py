@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0009_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='hot_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['hot_score', 'id'], name='feedback_hot_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('trending', True)), fields=['hot_score', 'id'], name='feedback_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:22
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from feedback.locations import address_candidates, display_name
+
+
+def backfill_locations(apps, schema_editor):
+    """One Location per distinct normalized place, then one UPDATE per Location for its spellings."""
+    Feedback = apps.get_model('feedback', 'Feedback')
+    Location = apps.get_model('feedback', 'Location')
+    spellings = defaultdict(list)
+    for text in Feedback.objects.exclude(location='').values_list('location', flat=True).distinct().order_by():
+        parts = address_candidates(text)
+        if parts:
+            spellings[parts[0]].append(text)
+    for key, texts in spellings.items():
+        location, _ = Location.objects.get_or_create(key=key, defaults={'name': display_name(texts[0])})
+        Feedback.objects.filter(location__in=texts).update(location_ref=location)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0010_hot_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LocationAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='location_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='feedbacks', to='feedback.location'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['location_ref', 'created_at', 'id'], name='feedback_loc_created_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='locationalias',
+            name='location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='feedback.location'),
+        ),
+        migrations.RunPython(backfill_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+from feedback.priority import INPUT_FIELDS, score
+
+
+def backfill_priority(apps, schema_editor):
+    """Same computation as feedback.priority.rebuild(), against the historical model."""
+    Feedback = apps.get_model('feedback', 'Feedback')
+    rows = Feedback.objects.order_by('id').values_list('id', *INPUT_FIELDS)
+    feedbacks = [Feedback(pk=pk, priority_score=score(*inputs)) for pk, *inputs in rows.iterator(chunk_size=1000)]
+    Feedback.objects.bulk_update(feedbacks, ['priority_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0011_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='priority_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('status__in', ('SUBMITTED', 'UNDER_REVIEW'))), fields=['location_ref', 'priority_score', 'id'], name='feedback_open_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('status__in', ('SUBMITTED', 'UNDER_REVIEW'))), fields=['priority_score', 'id'], name='feedback_open_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['location_ref', 'status', 'priority_score', 'id'], name='feedback_status_queue_idx'),
+        ),
+        migrations.RunPython(backfill_priority, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,83 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from authentication.models import UserAccount
 from cloudinary.models import CloudinaryField
+
+from . import priority
+from .locations import NO_MATCH, address_candidates, display_name, normalize_key
 # Create your models here.
 
+class LocationManager(models.Manager):
+    def lookup(self, keys):
+        """The Location matching the first of `keys` (normalized names or aliases) that matches any, in one query."""
+        keys = [key for key in keys if key]
+        if not keys:
+            return None
+        matches = {}
+        rows = self.filter(models.Q(key__in=keys) | models.Q(aliases__alias__in=keys)).annotate(
+            matched_alias=models.F('aliases__alias'),
+        )
+        for location in rows:
+            matches.setdefault(location.key, location)
+            matches.setdefault(location.matched_alias, location)
+        return next((matches[key] for key in keys if key in matches), None)
+
+    def resolve(self, text, create=False):
+        """
+        The canonical Location for free text: the whole text, then each comma-separated part
+        ("Pune, Maharashtra" -> "pune"). With `create`, an unknown place gets a new Location
+        named after its first part.
+        """
+        parts = address_candidates(text)
+        location = self.lookup([normalize_key(text), *parts])
+        if location is None and create and parts:
+            location, _ = self.get_or_create(key=parts[0], defaults={'name': display_name(text)})
+        return location
+
+    def resolve_id(self, text):
+        """Location id for a place name given in a request, NO_MATCH if unknown."""
+        location = self.resolve(text)
+        return location.pk if location else NO_MATCH
+
+    def for_authority(self, user):
+        """
+        The area an authority is responsible for: their work_location (created if new), else
+        the most specific part of their address that is a known location.
+        """
+        if user.work_location.strip():
+            return self.resolve(user.work_location, create=True)
+        return self.resolve(user.address)
+
+
+class Location(models.Model):
+    """
+    Canonical place feedback is filed under and authorities are responsible for. Free-text
+    locations are mapped onto it through feedback/locations.py (normalized key, then aliases).
+    """
+    key = models.CharField(max_length=200, unique=True)  # Normalized name, see feedback/locations.py
+    name = models.CharField(max_length=200)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LocationManager()
+
+    def __str__(self):
+        return self.name
+
+
+class LocationAlias(models.Model):
+    """Another spelling of a location ("Bombay" for Mumbai), stored as its normalized key."""
+    alias = models.CharField(max_length=200, unique=True)
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='aliases')
+
+    def __str__(self):
+        return f"{self.alias} -> {self.location}"
+
+
+# Feedback.Status values still waiting on an authority; the triage queue indexes these
+OPEN_STATUSES = ('SUBMITTED', 'UNDER_REVIEW')
+
+
 class Feedback(models.Model):
     class FeedbackType(models.TextChoices):
         COMPLAINT = 'COMPLAINT', 'Complaint'
@@ -44,14 +118,19 @@ class Feedback(models.Model):
     feedback_type = models.CharField(max_length=20, choices=FeedbackType.choices)
     category = models.CharField(max_length=20, choices=Category.choices)  # Updated to use choices
     location = models.CharField(max_length=200, blank=True)
+    # Canonical location resolved from `location` on save; admin scoping and hotspots filter on it
+    location_ref = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='feedbacks')
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.SUBMITTED)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     is_anonymous = models.BooleanField(default=False)
+    language = models.CharField(max_length=10, blank=True)  # Detected source language, filled in the background
     sentiment_score = models.FloatField(null=True, blank=True)
     # image = CloudinaryField('feedbackimage', folder='feedback/images', blank=True,  null = True)
      # Add these new fields
-    keywords = models.CharField(max_length=255, blank=True)  # For optimized searching
+    keywords = models.CharField(max_length=255, blank=True)  # Short tag line; full-text search uses search_vector
+    # Postgres full-text index (GIN); kept current by feedback/search.py. Unused on SQLite, which uses FTS5.
+    search_vector = SearchVectorField(null=True, editable=False)
     urgency = models.CharField(
         max_length=10,
         choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High')],
@@ -61,27 +140,140 @@ class Feedback(models.Model):
     upvotes = models.PositiveIntegerField(default=0)
     downvotes = models.PositiveIntegerField(default=0)
     
-    trending = models.BooleanField(default=False)  # New field to mark trending feedback
+    trending = models.BooleanField(default=False)  # hot_score >= HOT_SCORE['TRENDING_THRESHOLD'], see votes/ranking.py
+    hot_score = models.FloatField(default=0.0)  # Time-decayed vote velocity
+    priority_score = models.FloatField(default=0.0)  # Triage priority as of PRIORITY['EPOCH'], see feedback/priority.py
 
-    def update_upvotes(self):
-        """Update the upvote count dynamically."""
-        self.upvotes = self.upvotes_list.count()
-        self.save()
-    
-    def update_downvotes(self):
-        """Update the downvote count dynamically."""
-        self.downvotes = self.downvotes_list.count()
-        self.save() 
-        
-    def save(self, *args, **kwargs):
-        # Auto-generate keywords for better search
+    class Meta:
+        # Keyset pagination walks (ordering field, id); see feedback/pagination.py
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='feedback_created_id_idx'),
+            models.Index(fields=['upvotes', 'id'], name='feedback_upvotes_id_idx'),
+            models.Index(fields=['urgency', 'id'], name='feedback_urgency_id_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='feedback_user_created_id_idx'),
+            models.Index(fields=['location_ref', 'created_at', 'id'], name='feedback_loc_created_id_idx'),
+            models.Index(fields=['hot_score', 'id'], name='feedback_hot_score_idx'),
+            # The trending endpoint only ever reads this small slice
+            models.Index(fields=['hot_score', 'id'], name='feedback_trending_idx', condition=models.Q(trending=True)),
+            # Triage queue (admindashboard TriageQueueView): open items per location, or one status, by priority
+            models.Index(
+                fields=['location_ref', 'priority_score', 'id'], name='feedback_open_queue_idx',
+                condition=models.Q(status__in=OPEN_STATUSES),
+            ),
+            models.Index(fields=['priority_score', 'id'], name='feedback_open_priority_idx', condition=models.Q(status__in=OPEN_STATUSES)),
+            models.Index(fields=['location_ref', 'status', 'priority_score', 'id'], name='feedback_status_queue_idx'),
+        ]
+
+    def build_keywords(self):
+        """Auto-generate keywords (also called before bulk_create, which skips save())."""
+        # The description is left out: it is searched through the full-text index and would overflow the column
         self.keywords = ' '.join([
             self.title.lower(),
-            self.description.lower(),
             self.get_category_display().lower(),
             self.get_feedback_type_display().lower()
-        ])
+        ])[:255]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_location = instance.__dict__.get('location')  # To tell whether save() must re-resolve it
+        return instance
+
+    def assign_location(self):
+        """Point location_ref at the canonical Location for `location` (also called before bulk_create)."""
+        if self.location_ref_id is None or self.location != getattr(self, '_loaded_location', None):
+            self.location_ref = Location.objects.resolve(self.location, create=True)
+            self._loaded_location = self.location
+
+    def assign_priority(self):
+        """Recompute priority_score from its inputs (also called before bulk_create)."""
+        self.priority_score = priority.feedback_score(self)
+
+    def save(self, *args, **kwargs):
+        self.build_keywords()
+        self.assign_location()
+        self.assign_priority()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = set()
+            if {'title', 'category', 'feedback_type'} & set(update_fields):
+                derived.add('keywords')
+            if 'location' in update_fields:
+                derived.add('location_ref')
+            if set(priority.INPUT_FIELDS) & set(update_fields):
+                derived.add('priority_score')
+            if derived:
+                kwargs['update_fields'] = {*update_fields, *derived}
         super().save(*args, **kwargs)
         
     def __str__(self):
-        return f"{self.title} - {self.get_feedback_type_display()}"
\ No newline at end of file
+        return f"{self.title} - {self.get_feedback_type_display()}"
+
+class FeedbackJob(models.Model):
+    """Background work queued against a feedback (picked up by the job worker)."""
+    class Kind(models.TextChoices):
+        SENTIMENT = 'SENTIMENT', 'Sentiment Scoring'
+        TRANSLATION = 'TRANSLATION', 'Translation'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        DEAD = 'DEAD', 'Dead Letter'  # Gave up after too many failed attempts
+
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)  # Not picked up before this time (backoff)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'status', 'run_after'], name='feedback_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job for feedback {self.feedback_id} ({self.status})"
+
+
+class FeedbackSignature(models.Model):
+    """MinHash signature of a feedback's text (see feedback/dedup.py)."""
+    feedback = models.OneToOneField(Feedback, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class FeedbackLSHBucket(models.Model):
+    """One LSH band bucket per (feedback, band); feedbacks sharing a bucket are duplicate candidates."""
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='lsh_buckets')
+    # Copied from the feedback so scoped lookups never join back to it
+    user = models.ForeignKey(UserAccount, on_delete=models.SET_NULL, null=True, related_name='+')
+    created_at = models.DateTimeField()
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()  # Hash of the band's slice of the signature (band number included)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'created_at'], name='feedback_lsh_bucket_idx'),
+            models.Index(fields=['user', 'bucket'], name='feedback_lsh_user_bucket_idx'),
+        ]
+
+
+class FeedbackTranslation(models.Model):
+    """Stored translation of one feedback field; `source_hash` ties it to the exact text it was made from."""
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='translations')
+    field = models.CharField(max_length=20)  # 'title' or 'description'
+    language = models.CharField(max_length=10)
+    source_hash = models.CharField(max_length=40)  # sha1 of the source text
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['feedback', 'language', 'field', 'source_hash'], name='unique_feedback_translation'
+            ),
+        ]
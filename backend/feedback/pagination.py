@@ -0,0 +1,127 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class FeedbackCursorPagination(BasePagination):
+    """
+    Keyset pagination on (ordering field, id).
+
+    Each page is `WHERE (field, id) < (last_field, last_id) ORDER BY field, id LIMIT n` in the
+    requested direction, so deep pages cost the same as the first one (backed by the composite
+    indexes on Feedback). Ordering comes from ?ordering= (one of the view's `ordering_fields`,
+    optionally prefixed with '-'); without it, search results are ordered by relevance and
+    everything else by the view's `cursor_ordering`. Cursors are opaque base64 tokens.
+    """
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    default_ordering = '-created_at'
+
+    def get_page_size(self, request, view):
+        page_size = getattr(view, 'page_size', self.page_size)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param)
+        if ordering and ordering.lstrip('-') in getattr(view, 'ordering_fields', []):
+            return ordering.lstrip('-'), ordering.startswith('-')
+        if 'search_rank' in queryset.query.annotations:
+            return 'search_rank', True
+        ordering = getattr(view, 'cursor_ordering', self.default_ordering)
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def encode_cursor(self, value, pk, reverse):
+        payload = json.dumps({'v': value, 'id': pk, 'r': reverse}, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            value = payload['v']
+            try:
+                value = queryset.model._meta.get_field(self.field).to_python(value)
+            except FieldDoesNotExist:
+                value = float(value)  # Annotations such as search_rank
+            return value, int(payload['id']), bool(payload['r'])
+        except (TypeError, ValueError, KeyError, json.JSONDecodeError):
+            raise NotFound("Invalid cursor")
+
+    @staticmethod
+    def row_value(row, name):
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request, view)
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request, queryset)
+        reverse = bool(cursor and cursor[2])
+
+        # Walking backwards (previous page) flips the direction, then the page is flipped back
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}id')
+        if cursor:
+            value, pk, _ = cursor
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'id__{lookup}': pk})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows:
+            first, last = rows[0], rows[-1]
+            if has_more or reverse:
+                self.next_position = (self.row_value(last, self.field), self.row_value(last, 'id'), False)
+            if cursor and (has_more or not reverse):
+                self.previous_position = (self.row_value(first, self.field), self.row_value(first, 'id'), True)
+        return rows
+
+    def get_link(self, position):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        if position == 'first':
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*position))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_link(self.next_position)),
+            ('previous', self.get_link(self.previous_position)),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
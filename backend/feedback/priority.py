@@ -0,0 +1,106 @@
+"""
+Composite triage priority.
+
+    priority = urgency points + negative sentiment points + vote points + AGE_POINTS_PER_DAY * age in days
+
+The age term grows at the same rate for every open item, so it doesn't change their order.
+Feedback.priority_score therefore stores the priority as of PRIORITY['EPOCH'] (the age term
+measured from there, which makes newer feedback start lower), and current() adds the time
+since EPOCH back for display. The stored value only changes when an input does:
+save() recomputes it, and writes that skip save() (votes, sentiment jobs, bulk actions) add
+the matching *_updates() delta in the same UPDATE. The triage queue reads it in index order.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Cast, Coalesce, Greatest, Ln, Sign
+from django.utils import timezone
+
+# Fields priority_score is computed from
+INPUT_FIELDS = ('urgency', 'sentiment_score', 'upvotes', 'downvotes', 'created_at')
+
+
+def priority_setting(name):
+    return settings.PRIORITY[name]
+
+
+def epoch_days(moment):
+    return (moment - priority_setting('EPOCH')).total_seconds() / 86400
+
+
+def vote_points(net_votes):
+    """Net votes count logarithmically, so a viral item doesn't bury everything else."""
+    return priority_setting('VOTE_POINTS') * math.copysign(math.log1p(abs(net_votes)), net_votes)
+
+
+def sentiment_points(sentiment_score):
+    return priority_setting('NEGATIVE_SENTIMENT_POINTS') * max(0.0, -(sentiment_score or 0.0))
+
+
+def score(urgency, sentiment_score, upvotes, downvotes, created_at):
+    """The value stored in priority_score: the priority as of EPOCH."""
+    return (
+        priority_setting('URGENCY_POINTS').get(urgency, 0.0)
+        + sentiment_points(sentiment_score)
+        + vote_points(upvotes - downvotes)
+        - priority_setting('AGE_POINTS_PER_DAY') * epoch_days(created_at)
+    )
+
+
+def feedback_score(feedback):
+    return score(*(getattr(feedback, field) for field in INPUT_FIELDS))
+
+
+def current(stored, now=None):
+    """The priority of an item with priority_score `stored`, at `now`."""
+    return stored + priority_setting('AGE_POINTS_PER_DAY') * epoch_days(now or timezone.now())
+
+
+def _vote_points_sql(net_votes):
+    return Value(priority_setting('VOTE_POINTS')) * Sign(net_votes) * Ln(Value(1.0) + Abs(net_votes))
+
+
+def vote_updates(net_votes):
+    """
+    update() kwargs moving priority_score for `net_votes` (an int or an expression) more net
+    votes, next to the counter deltas. F() reads the pre-update counters in the same UPDATE.
+    """
+    if not hasattr(net_votes, 'resolve_expression'):
+        net_votes = Value(net_votes)
+    before = Cast(F('upvotes') - F('downvotes'), FloatField())
+    after = before + Cast(net_votes, FloatField())
+    return {'priority_score': F('priority_score') + _vote_points_sql(after) - _vote_points_sql(before)}
+
+
+def sentiment_update(sentiment_score):
+    """priority_score expression for setting sentiment_score to `sentiment_score` in the same UPDATE."""
+    before = Greatest(Value(0.0), -Coalesce(F('sentiment_score'), Value(0.0)))
+    return F('priority_score') + Value(sentiment_points(sentiment_score)) - Value(priority_setting('NEGATIVE_SENTIMENT_POINTS')) * before
+
+
+def urgency_update(urgency):
+    """priority_score expression for setting urgency to `urgency` in the same UPDATE."""
+    points = priority_setting('URGENCY_POINTS')
+    before = Case(
+        *[When(urgency=name, then=Value(value)) for name, value in points.items()],
+        default=Value(0.0), output_field=FloatField(),
+    )
+    return F('priority_score') + Value(points.get(urgency, 0.0)) - before
+
+
+def rebuild(batch_size=1000):
+    """Recompute every priority_score (after changing PRIORITY, or to correct drift). Returns the row count."""
+    from .models import Feedback
+
+    queryset = Feedback.objects.order_by('id').values_list('id', *INPUT_FIELDS)
+    last_id, total = 0, 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total
+        Feedback.objects.bulk_update(
+            [Feedback(pk=pk, priority_score=score(*inputs)) for pk, *inputs in batch], ['priority_score'],
+        )
+        total += len(batch)
+        last_id = batch[-1][0]
@@ -0,0 +1,27 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib json path below is always available
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches the stock renderer: compact UTF-8, and anything orjson can't encode natively
+    (dates, decimals, lazy strings...) goes through DRF's encoder, so datetimes keep the "Z"
+    suffix. Only floats in exponent form are spelt differently ("1e20" for "1e+20"). Indented output (e.g. ?indent / browsable API) falls back to the stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
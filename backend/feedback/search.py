@@ -0,0 +1,86 @@
+"""
+Full-text search over feedback.
+
+Postgres: a weighted `search_vector` tsvector column (GIN index) queried with prefix matching,
+plus trigram similarity on the title for typos. SQLite (local/test runs): an FTS5 table.
+Both are kept current by index_feedbacks(), called on save and after bulk writes.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from .models import Feedback
+
+FTS_TABLE = 'feedback_feedback_fts'
+TERM_RE = re.compile(r"\w+")
+
+
+def search_vector():
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('description', weight='B', config=config)
+        + SearchVector('category', 'location', weight='C', config=config)
+    )
+
+
+def index_feedbacks(feedbacks):
+    """Refresh the search index rows for the given feedbacks."""
+    feedbacks = list(feedbacks)
+    if not feedbacks:
+        return
+
+    if connection.vendor == 'postgresql':
+        Feedback.objects.filter(pk__in=[feedback.pk for feedback in feedbacks]).update(search_vector=search_vector())
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, description, category, location) VALUES (%s, %s, %s, %s, %s)",
+                [(f.pk, f.title, f.description, f.category, f.location) for f in feedbacks],
+            )
+
+
+def unindex_feedbacks(ids):
+    # Postgres keeps the vector on the row itself, so only the FTS5 table needs cleaning up
+    if connection.vendor == 'sqlite' and ids:
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+def search_queryset(queryset, query):
+    """Filter `queryset` to feedback matching `query`, annotated with `search_rank` and ordered by it."""
+    terms = TERM_RE.findall(query.lower())
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        # Every term must match, each as a prefix ("pot" finds "pothole")
+        ts_query = SearchQuery(' & '.join(f"{term}:*" for term in terms), search_type='raw', config=settings.SEARCH_CONFIG)
+        return (
+            # ts_rank is a float4: as a double it survives the JSON round trip of a pagination cursor unchanged
+            queryset.annotate(search_rank=Cast(SearchRank(F('search_vector'), ts_query), FloatField()))
+            .filter(Q(search_vector=ts_query) | Q(title__trigram_similar=query))
+            .order_by('-search_rank', '-id')
+        )
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = Feedback._meta.db_table
+        return (
+            queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+            .annotate(search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+                [match],
+            ))
+            .order_by('-search_rank', '-id')
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition)
@@ -0,0 +1,154 @@
+import logging
+import re
+import zlib
+
+import google.generativeai as genai
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def clamp_score(score):
+    """Keep scores on the [-1, 1] scale stored in Feedback.sentiment_score."""
+    return max(-1.0, min(1.0, float(score)))
+
+
+class GeminiSentimentScorer:
+    """Scores text with the free Gemini model, one prompt per text."""
+    model_name = "models/gemini-1.5-flash"
+
+    def __init__(self):
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(self.model_name)
+
+    def score(self, text):
+        response = self.model.generate_content(
+            f"Analyze the sentiment of this text and return only a numerical score between -1 (very negative) "
+            f"and 1 (very positive), with 0 being neutral. No explanation, just the number:\n\n{text}"
+        )
+
+        # Extract numerical score using regex
+        match = re.search(r"-?\d+(\.\d+)?", response.text.strip())
+        if not match:
+            raise ValueError(f"No score in model response: {response.text!r}")
+        return clamp_score(match.group(0))
+
+    def score_batch(self, texts):
+        """Return one score per text, or None where scoring failed (so the job is retried)."""
+        scores = []
+        for text in texts:
+            try:
+                scores.append(self.score(text))
+            except Exception:
+                logger.exception("Sentiment analysis failed")
+                scores.append(None)
+        return scores
+
+
+class StubSentimentScorer:
+    """Offline scorer for tests and local runs: every text is neutral."""
+
+    def score_batch(self, texts):
+        return [0.0 for _ in texts]
+
+
+# Seed weights for the offline model, tuned for civic feedback (roads, water, services ...)
+LEXICON = {
+    # positive
+    'good': 0.6, 'great': 0.8, 'excellent': 0.9, 'amazing': 0.8, 'awesome': 0.8, 'nice': 0.5,
+    'happy': 0.7, 'glad': 0.6, 'satisfied': 0.7, 'thank': 0.6, 'thanks': 0.6, 'thankful': 0.7,
+    'appreciate': 0.7, 'appreciated': 0.7, 'helpful': 0.6, 'clean': 0.5, 'safe': 0.5,
+    'improved': 0.6, 'improvement': 0.5, 'better': 0.4, 'best': 0.8, 'resolved': 0.6,
+    'fixed': 0.5, 'quick': 0.4, 'quickly': 0.4, 'efficient': 0.6, 'love': 0.8, 'wonderful': 0.9,
+    'well': 0.3, 'working': 0.3, 'support': 0.3, 'recommend': 0.5, 'proud': 0.6, 'fair': 0.4,
+    'smooth': 0.5, 'timely': 0.5, 'responsive': 0.6, 'pleased': 0.7, 'beautiful': 0.7,
+    # negative
+    'bad': -0.6, 'poor': -0.6, 'worst': -0.9, 'terrible': -0.9, 'horrible': -0.9, 'awful': -0.8,
+    'broken': -0.6, 'damaged': -0.6, 'dirty': -0.6, 'garbage': -0.5, 'waste': -0.4, 'smell': -0.4,
+    'pothole': -0.5, 'potholes': -0.5, 'leak': -0.5, 'leaking': -0.5, 'flood': -0.6,
+    'flooded': -0.6, 'flooding': -0.6, 'outage': -0.6, 'shortage': -0.6, 'unsafe': -0.7,
+    'dangerous': -0.8, 'danger': -0.7, 'accident': -0.6, 'accidents': -0.6, 'corrupt': -0.9,
+    'corruption': -0.9, 'bribe': -0.8, 'delay': -0.5, 'delayed': -0.5, 'delays': -0.5,
+    'slow': -0.4, 'late': -0.4, 'never': -0.4, 'ignored': -0.7, 'neglected': -0.7,
+    'complaint': -0.3, 'problem': -0.4, 'problems': -0.4, 'issue': -0.3, 'issues': -0.3,
+    'fail': -0.6, 'failed': -0.6, 'failure': -0.6, 'angry': -0.7, 'frustrated': -0.7,
+    'disappointed': -0.7, 'unhappy': -0.7, 'sad': -0.5, 'hate': -0.8, 'useless': -0.8,
+    'unacceptable': -0.8, 'pathetic': -0.9, 'noise': -0.4, 'pollution': -0.6, 'polluted': -0.6,
+    'blocked': -0.5, 'overflowing': -0.6, 'stray': -0.3, 'crime': -0.7, 'theft': -0.7,
+    'harassment': -0.8, 'unfair': -0.6, 'expensive': -0.4, 'lack': -0.5, 'lacking': -0.5,
+    'no': -0.2, 'not': -0.1, 'nobody': -0.4, 'worse': -0.6, 'sick': -0.5, 'disease': -0.6,
+}
+NEGATORS = ('not', 'no', 'never', 'hardly', "isn't", "wasn't", "don't", "doesn't", "didn't", 'without')
+INTENSIFIERS = {'very': 0.5, 'extremely': 0.8, 'really': 0.3, 'so': 0.3, 'too': 0.3, 'completely': 0.6}
+
+
+class HashedNgramSentimentScorer:
+    """
+    Offline sentiment model: a linear model over hashed unigram + bigram features.
+
+    Weights default to LEXICON (negated/intensified bigrams derived from it); a trained
+    weight vector of length `n_features` can be loaded from settings.SENTIMENT_MODEL_PATH
+    (a .npy file). A whole batch is scored with a couple of vectorized NumPy passes.
+    """
+    n_features = 2 ** 18
+    token_re = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+    def __init__(self, weights=None):
+        if weights is None:
+            model_path = getattr(settings, 'SENTIMENT_MODEL_PATH', None)
+            weights = np.load(model_path) if model_path else self.lexicon_weights()
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.n_features = len(self.weights)
+
+    def feature_index(self, feature):
+        # crc32 is stable across processes, unlike the builtin hash()
+        return zlib.crc32(feature.encode()) % self.n_features
+
+    def lexicon_weights(self):
+        weights = np.zeros(self.n_features, dtype=np.float32)
+        for word, weight in LEXICON.items():
+            weights[self.feature_index(word)] = weight
+            for negator in NEGATORS:
+                # "not good": the unigram still fires, so the bigram flips it to -weight
+                weights[self.feature_index(f"{negator} {word}")] = -2 * weight
+            for intensifier, boost in INTENSIFIERS.items():
+                weights[self.feature_index(f"{intensifier} {word}")] = boost * weight
+        return weights
+
+    def features(self, text):
+        tokens = self.token_re.findall(text.lower())
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return [self.feature_index(feature) for feature in tokens + bigrams]
+
+    def score_batch(self, texts):
+        if not texts:
+            return []
+
+        # Flatten the batch into (row, feature) pairs, then sum weights per row
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            indexes = self.features(text or '')
+            cols.extend(indexes)
+            rows.extend([row] * len(indexes))
+        rows = np.asarray(rows, dtype=np.int64)
+        feature_weights = self.weights[np.asarray(cols, dtype=np.int64)]
+
+        totals = np.bincount(rows, weights=feature_weights, minlength=len(texts))
+        hits = np.bincount(rows, weights=(feature_weights != 0), minlength=len(texts))
+
+        # Normalise by the number of opinion features so long texts don't saturate
+        scores = np.tanh(totals / np.sqrt(np.maximum(hits, 1)))
+        return [round(float(score), 4) for score in scores]
+
+
+def get_scorer(path=None):
+    """Instantiate the scorer configured in settings.SENTIMENT_SCORER (or the given dotted path)."""
+    return import_string(path or settings.SENTIMENT_SCORER)()
+
+
+def get_sentiment_score(text, scorer=None):
+    """Score a single text with the configured scorer (None if it failed)."""
+    scorer = scorer or get_scorer()
+    return scorer.score_batch([text])[0]
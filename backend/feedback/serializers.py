@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from .models import Feedback
 from authentication.models import UserAccount
+from votes.services import my_vote_expression
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserAccount 
@@ -11,10 +13,80 @@ class FeedbackSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     class Meta:
         model = Feedback
-        fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at', 'keywords']
+        exclude = ['search_vector']  # Internal full-text index column
+        read_only_fields = ['id', 'created_at', 'updated_at', 'keywords', 'language', 'trending', 'hot_score', 'location_ref', 'priority_score',
+                            'sentiment_score', 'upvotes', 'downvotes']  # Set by the scorer and votes
+
+class FeedbackListSerializer(serializers.BaseSerializer):
+    """
+    Read-only list representation built from `.values()` rows instead of model instances.
+
+    `?fields=id,title,...` limits the fields returned; `user` is the user id unless
+    `?expand=user` asks for the nested {id, first_name, last_name}; `?expand=my_vote` adds the
+    caller's vote (1, -1 or 0) from one correlated subquery. Use select() to turn a
+    queryset into the rows this serializer expects. Detail views and writes keep FeedbackSerializer.
+    """
+    FIELDS = (
+        'id', 'user', 'title', 'description', 'feedback_type', 'category', 'location', 'location_ref', 'status',
+        'created_at', 'updated_at', 'is_anonymous', 'language', 'sentiment_score', 'urgency',
+        'upvotes', 'downvotes', 'trending', 'hot_score',
+    )
+    EXPANDABLE = ('user', 'my_vote')
+    # Always fetched: the pagination cursor keys and what translation needs to skip no-ops
+    REQUIRED_COLUMNS = ('id', 'language', 'created_at', 'upvotes', 'urgency', 'hot_score', 'priority_score')
+    DATETIME_FIELDS = ('created_at', 'updated_at')
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        params = request.query_params if request is not None else {}
+        self.fields = self.parse_list(params.get('fields'), self.FIELDS, 'fields') or self.FIELDS
+        self.expand = self.parse_list(params.get('expand'), self.EXPANDABLE, 'expand')
+
+    @staticmethod
+    def parse_list(value, allowed, param):
+        names = [name.strip() for name in (value or '').split(',') if name.strip()]
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise ValidationError({param: f"Unknown value(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}"})
+        return tuple(dict.fromkeys(names))
+
+    def select(self, queryset):
+        columns = list(dict.fromkeys(self.REQUIRED_COLUMNS + self.fields))
+        if 'search_rank' in queryset.query.annotations:
+            columns.append('search_rank')
+        if 'user' in self.fields and 'user' in self.expand:
+            columns += ['user__first_name', 'user__last_name']
+        if 'my_vote' in self.expand:
+            queryset = queryset.annotate(my_vote=my_vote_expression(self.context['request'].user))
+            columns.append('my_vote')
+        return queryset.values(*columns)
+
+    def to_representation(self, row):
+        data = {field: row[field] for field in self.fields}
+        for field in self.DATETIME_FIELDS:
+            if data.get(field) is not None:
+                data[field] = self.datetime_field.to_representation(data[field])
+        if 'user' in data and 'user' in self.expand and data['user'] is not None:
+            data['user'] = {'id': row['user'], 'first_name': row['user__first_name'], 'last_name': row['user__last_name']}
+        if 'my_vote' in self.expand:
+            data['my_vote'] = row['my_vote']
+        if 'translated' in row:
+            data['translated'] = row['translated']
+        if 'priority' in row:
+            data['priority'] = row['priority']
+        return data
+
 
 class FeedbackUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Feedback
         fields = ['status', 'title', 'description', 'feedback_type', 'category', 'location', 'is_anonymous', 'urgency']
+
+    def update(self, instance, validated_data):
+        # Only the edited columns: a full save would write back vote counters moved by F() updates since the read
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from authentication.models import UserAccount
+
+from . import search
+from .dedup import index_feedbacks
+from .locations import address_candidates, normalize_key
+from .models import Feedback, Location, LocationAlias
+
+SEARCH_FIELDS = {'title', 'description', 'category', 'location'}
+
+
+@receiver(post_save, sender=Feedback)
+def update_duplicate_index(sender, instance, update_fields=None, **kwargs):
+    """Keep the MinHash/LSH duplicate index in step with the feedback description."""
+    if update_fields is not None and 'description' not in update_fields:
+        return
+    index_feedbacks([instance])
+
+
+@receiver(post_save, sender=Feedback)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    search.index_feedbacks([instance])
+
+
+@receiver(post_delete, sender=Feedback)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.unindex_feedbacks([instance.pk])
+
+
+@receiver(pre_save, sender=UserAccount)
+def assign_authority_location(sender, instance, update_fields=None, **kwargs):
+    """Map an authority's work location / address onto the Location they administer (UserAccount.save adds location_ref to update_fields)."""
+    if update_fields is not None and not UserAccount.LOCATION_FIELDS & set(update_fields):
+        return
+    if instance.role == UserAccount.Role.ADMIN:
+        instance.location_ref = Location.objects.for_authority(instance)
+    else:
+        instance.location_ref = None
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=LocationAlias)
+def map_unmapped_authorities(sender, instance, created, **kwargs):
+    """
+    Authorities known only by an address stay unmapped until a place in it becomes a Location
+    (or an alias of one): map those whose address names the new key. One query for the
+    unmapped addresses, then a lookup only for authorities that match.
+    """
+    if not created:
+        return
+    key = instance.alias if sender is LocationAlias else instance.key
+    unmapped = UserAccount.objects.filter(role=UserAccount.Role.ADMIN, location_ref=None).values_list('id', 'address', 'work_location')
+    for pk, address, work_location in unmapped:
+        if work_location.strip() or key not in (normalize_key(address), *address_candidates(address)):
+            continue  # A work location was already resolved with create=True
+        location = Location.objects.resolve(address)
+        if location is not None:
+            UserAccount.objects.filter(pk=pk).update(location_ref=location)
@@ -1,3 +1,563 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+import json
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from admindashboard import rollups
+from admindashboard.models import FeedbackDailyStat
+from authentication.models import UserAccount
+from votes.services import cast_vote
+
+from . import dedup, jobs, priority, search
+from .models import Feedback, FeedbackJob, Location, LocationAlias
+from .sentiment import HashedNgramSentimentScorer
+from .renderers import FastJSONRenderer
+from .serializers import FeedbackListSerializer, FeedbackSerializer
+from .throttling import SlidingWindowRateLimiter
+from .translation import TranslationExecutor, translate_items
+from .views import FeedbackUpdateView
+
+
+def make_user(email='citizen@example.com', **kwargs):
+    return UserAccount.objects.create_user(
+        email=email, password='pw', first_name='C', last_name='D', phone='1', **kwargs,
+    )
+
+
+def make_feedback(user, **kwargs):
+    fields = {
+        'title': 'Broken pipe', 'description': 'Water leaking on the main road', 'feedback_type': 'COMPLAINT',
+        'category': 'WATER', 'location': 'Pune', **kwargs,
+    }
+    return Feedback.objects.create(user=user, **fields)
+
+
+def make_authority(email, work_location):
+    return make_user(email, role=UserAccount.Role.ADMIN, work_location=work_location)
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def rollup_table():
+    return {
+        row[:len(rollups.KEY_FIELDS)]: row[len(rollups.KEY_FIELDS):]
+        for row in FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS)
+    }
+
+
+class FixedScorer:
+    def __init__(self, score):
+        self.score = score
+
+    def score_batch(self, texts):
+        return [self.score for _ in texts]
+
+
+class SentimentJobTests(TestCase):
+    def setUp(self):
+        self.feedback = make_feedback(make_user())
+        FeedbackJob.objects.all().delete()  # Whatever creating feedback queued
+        jobs.enqueue_jobs([self.feedback], FeedbackJob.Kind.SENTIMENT)
+
+    def assertRollupsMatchRebuild(self):
+        incremental = rollup_table()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_table())
+
+    def test_scores_are_written_with_rollups_and_priority(self):
+        self.assertEqual(jobs.process_batch(FeedbackJob.Kind.SENTIMENT, backend=FixedScorer(-0.5)), 1)
+        self.feedback.refresh_from_db()
+        self.assertEqual(self.feedback.sentiment_score, -0.5)
+        self.assertAlmostEqual(self.feedback.priority_score, priority.feedback_score(self.feedback))
+        self.assertEqual(FeedbackJob.objects.get().status, FeedbackJob.Status.DONE)
+        self.assertRollupsMatchRebuild()
+
+    def test_edit_between_claim_and_write_keeps_rollups_right(self):
+        claimed = jobs.claim_jobs(FeedbackJob.Kind.SENTIMENT, 10)
+        edited = Feedback.objects.get(pk=self.feedback.pk)
+        edited.category = 'HEALTHCARE'
+        edited.save()
+        jobs.handle_sentiment_jobs(claimed, FixedScorer(0.5))
+        self.assertRollupsMatchRebuild()
+
+    def test_failed_rollup_write_rolls_back_the_score(self):
+        with mock.patch.object(rollups, 'apply_changes', side_effect=RuntimeError("db went away")):
+            jobs.process_batch(FeedbackJob.Kind.SENTIMENT, backend=FixedScorer(-0.5))
+        self.feedback.refresh_from_db()
+        self.assertIsNone(self.feedback.sentiment_score)
+        job = FeedbackJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (FeedbackJob.Status.PENDING, 1))
+        self.assertIn("db went away", job.last_error)
+        self.assertRollupsMatchRebuild()
+
+    def test_missing_scores_are_retried(self):
+        jobs.process_batch(FeedbackJob.Kind.SENTIMENT, backend=FixedScorer(None))
+        job = FeedbackJob.objects.get()
+        self.assertEqual(job.status, FeedbackJob.Status.PENDING)
+        self.assertGreater(job.run_after, job.created_at)
+
+
+class HashedNgramScorerTests(SimpleTestCase):
+    def setUp(self):
+        self.scorer = HashedNgramSentimentScorer()
+
+    def test_polarity(self):
+        positive, negative, neutral = self.scorer.score_batch([
+            "Great work, the road is clean and safe now",
+            "Terrible service, the water is dirty and broken",
+            "The meeting is on Tuesday",
+        ])
+        self.assertGreater(positive, 0.3)
+        self.assertLess(negative, -0.3)
+        self.assertEqual(neutral, 0.0)
+
+    def test_negation_and_intensifiers(self):
+        good, not_good, very_good = self.scorer.score_batch(["good", "not good", "very good"])
+        self.assertLess(not_good, 0)
+        self.assertGreater(very_good, good)
+
+    def test_batch_matches_single_texts(self):
+        texts = ["Thanks, resolved quickly", "", "Never fixed, awful"]
+        self.assertEqual(self.scorer.score_batch(texts), [self.scorer.score_batch([text])[0] for text in texts])
+        self.assertEqual(self.scorer.score_batch([]), [])
+
+    def test_scores_stay_in_range(self):
+        score, = self.scorer.score_batch(["excellent " * 500])
+        self.assertLessEqual(score, 1.0)
+
+
+class RescoreSentimentCommandTests(TestCase):
+    def test_rescores_and_keeps_rollups_in_step(self):
+        user = make_user()
+        for description in ("Excellent, thank you", "Awful and dangerous", "Opening hours"):
+            make_feedback(user, description=description)
+        call_command(
+            'rescore_sentiment', scorer='feedback.sentiment.HashedNgramSentimentScorer', batch_size=2, stdout=StringIO(),
+        )
+        scores = dict(Feedback.objects.values_list('description', 'sentiment_score'))
+        self.assertGreater(scores["Excellent, thank you"], 0)
+        self.assertLess(scores["Awful and dangerous"], 0)
+        incremental = rollup_table()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_table())
+
+
+class DuplicateDetectionTests(TestCase):
+    text = "Garbage has not been collected on Station Road for two weeks and it smells"
+
+    def setUp(self):
+        self.user = make_user()
+
+    def test_near_duplicate_is_found(self):
+        original = make_feedback(self.user, description=self.text)
+        matches = dedup.find_duplicates(self.text.replace("two", "2"), user=self.user)
+        self.assertEqual([feedback_id for feedback_id, _ in matches], [original.id])
+        self.assertGreaterEqual(matches[0][1], 0.7)
+
+    def test_capped_candidates_are_the_newest(self):
+        copies = [make_feedback(make_user(f"user{i}@example.com"), description=self.text) for i in range(4)]
+        # The cap counts bucket rows: one feedback's worth of bands
+        capped = {**settings.DUPLICATE_DETECTION, 'MAX_CANDIDATES': settings.DUPLICATE_DETECTION['BANDS']}
+        with override_settings(DUPLICATE_DETECTION=capped):
+            matches = dedup.find_duplicates(self.text, scopes=['global'])
+        self.assertEqual([feedback_id for feedback_id, _ in matches], [copies[-1].id])
+
+    def test_unrelated_text_is_not_a_duplicate(self):
+        make_feedback(self.user, description=self.text)
+        self.assertEqual(dedup.find_duplicates("Street lights are out near the school gate", scopes=['global']), [])
+
+    def test_other_citizens_reporting_the_same_issue_are_not_refused(self):
+        cache.clear()  # Rate limiter counters
+        client = api_client(self.user)
+        data = {'title': 'Garbage', 'description': self.text, 'feedback_type': 'COMPLAINT', 'category': 'SANITATION', 'location': 'Pune'}
+        first = client.post('/api/feedback/create/', data)
+        self.assertEqual((first.status_code, first.data['duplicate_of']), (201, None))
+        again = client.post('/api/feedback/create/', data)  # Re-posted by the same user
+        self.assertEqual((again.status_code, again.data['detail']), (403, "Duplicate or similar feedback detected!"))
+
+        second = api_client(make_user('neighbour@example.com')).post('/api/feedback/create/', data)
+        self.assertEqual((second.status_code, second.data['duplicate_of']), (201, first.data['id']))
+        intake = api_client(make_user('intake@example.com', is_staff=True)).post('/api/feedback/bulk-create/', [data], format='json')
+        self.assertEqual(intake.data['results'][0]['status'], 'created')
+        self.assertIn(intake.data['results'][0]['duplicate_of'], (first.data['id'], second.data['id']))
+
+    def test_clusters_group_copies_across_users(self):
+        copies = [make_feedback(make_user(f"user{i}@example.com"), description=self.text) for i in range(3)]
+        make_feedback(self.user, description="Potholes on the highway exit")
+        since = copies[0].created_at - timedelta(minutes=1)
+        self.assertEqual(dedup.duplicate_clusters(since), [sorted(feedback.id for feedback in copies)])
+
+
+class DuplicateClustersViewTests(TestCase):
+    url = '/api/feedback/admin/duplicates/'
+    text = DuplicateDetectionTests.text
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.pune = make_authority('pune@example.com', 'Pune')
+        for i, location in enumerate(['Pune', 'Pune', 'Mumbai', 'Mumbai', 'Mumbai']):
+            make_feedback(make_user(f"user{i}@example.com"), description=cls.text, location=location)
+
+    def test_authority_only_sees_their_location(self):
+        clusters = api_client(self.pune).get(self.url).data
+        self.assertEqual([cluster['size'] for cluster in clusters], [2])
+        self.assertEqual(
+            set(Feedback.objects.filter(pk__in=clusters[0]['feedback_ids']).values_list('location', flat=True)), {'Pune'},
+        )
+
+    def test_staff_see_every_location(self):
+        staff = make_user('staff@example.com', is_staff=True)
+        self.assertEqual([cluster['size'] for cluster in api_client(staff).get(self.url).data], [5])
+
+    def test_bad_parameters_are_rejected(self):
+        client = api_client(self.pune)
+        for query in ('?days=abc', '?days=0', '?days=1000', '?min_size=1', '?min_size=x'):
+            self.assertEqual(client.get(self.url + query).status_code, 400, query)
+
+    def test_civilians_are_refused(self):
+        self.assertEqual(api_client(make_user('civilian@example.com')).get(self.url).status_code, 403)
+
+
+class BulkFeedbackCreateTests(TestCase):
+    url = '/api/feedback/bulk-create/'
+    descriptions = [
+        "Streetlight flickering all night outside block C",
+        "Overflowing drain near the vegetable market",
+        "Bus stop shelter roof collapsed after the storm",
+        "Stray dogs chasing children near the primary school",
+        "Illegal dumping of construction debris on the lake shore",
+        "Traffic signal at the ring road junction is dead",
+        "Public toilet in the park has no water supply",
+    ]
+
+    def setUp(self):
+        cache.clear()  # Rate limiter counters
+
+    def items(self, count, **extra):
+        return [
+            {'title': f"Report {i}", 'description': description, 'feedback_type': 'COMPLAINT',
+             'category': 'INFRASTRUCTURE', 'location': 'Pune', **extra}
+            for i, description in enumerate(self.descriptions[:count])
+        ]
+
+    def test_read_only_counters_in_items_are_ignored(self):
+        staff = make_user('intake@example.com', is_staff=True)
+        response = api_client(staff).post(
+            self.url, self.items(2, sentiment_score=0.9, upvotes=50, downvotes=3), format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            set(Feedback.objects.values_list('sentiment_score', 'upvotes', 'downvotes')), {(None, 0, 0)},
+        )
+
+    def test_civilians_share_the_single_create_budget(self):
+        response = api_client(make_user()).post(self.url, self.items(7), format='json')
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created'] * 5 + ['rate_limited'] * 2)
+
+        single = {'title': 'One more', 'description': 'Sewage on the footpath', 'feedback_type': 'COMPLAINT',
+                  'category': 'INFRASTRUCTURE', 'location': 'Pune'}
+        self.assertEqual(api_client(Feedback.objects.first().user).post('/api/feedback/create/', single).status_code, 403)
+
+    def test_intake_accounts_use_the_bulk_budget(self):
+        response = api_client(make_user('intake@example.com', is_staff=True)).post(self.url, self.items(7), format='json')
+        self.assertEqual(response.data['created'], 7)
+
+    def test_duplicates_within_the_batch_and_invalid_items(self):
+        items = self.items(2) + [{**self.items(1)[0], 'title': 'Copy'}, {'title': 'No description'}]
+        results = api_client(make_user('intake@example.com', is_staff=True)).post(self.url, items, format='json').data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'created', 'duplicate', 'invalid'])
+        self.assertEqual(results[2]['duplicate_of_index'], 0)
+        incremental = rollup_table()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_table())
+
+
+class SlidingWindowRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowRateLimiter(num_requests=5, duration=60)
+
+    def consume_at(self, timestamp, tokens=1, key='user:1'):
+        with mock.patch('feedback.throttling.time.time', return_value=timestamp):
+            return self.limiter.consume(key, tokens=tokens)
+
+    def test_budget_is_enforced_per_key(self):
+        results = [self.consume_at(6000.0) for _ in range(6)]
+        self.assertEqual([result.allowed for result in results], [True] * 5 + [False])
+        self.assertEqual(results[-1].retry_after, 60)
+        self.assertTrue(self.consume_at(6000.0, key='user:2').allowed)
+
+    def test_partial_grant_for_a_batch(self):
+        self.consume_at(6000.0, tokens=3)
+        result = self.consume_at(6000.0, tokens=4)
+        self.assertEqual((result.allowed, result.granted, result.remaining), (False, 2, 0))
+
+    def test_previous_window_weighs_by_its_overlap(self):
+        self.consume_at(6000.0, tokens=5)
+        # A quarter into the next window, 3/4 of the previous 5 hits still count
+        self.assertEqual(self.consume_at(6075.0, tokens=5).granted, 1)
+        # A window later the old hits have rolled off entirely
+        self.assertEqual(self.consume_at(6180.0, tokens=5).granted, 5)
+
+
+class SlowBackend:
+    def translate(self, texts, dest):
+        if texts[0] == 'slow':
+            time.sleep(0.5)
+        if texts[0] == 'broken':
+            raise ConnectionError("translator unreachable")
+        return [(f"[{dest}] {text}", 'hi') for text in texts]
+
+
+class TranslationTests(TestCase):
+    def executor(self, deadline=5):
+        executor = TranslationExecutor(max_workers=4, deadline=deadline)
+        executor.backend = SlowBackend
+        return executor
+
+    def test_deadline_failures_and_counters(self):
+        executor = self.executor(deadline=0.2)
+        with self.assertLogs('feedback.translation', level='ERROR') as logs:
+            results = executor.translate(['a', 'slow', 'a', 'broken'], 'en')
+        self.assertEqual(results, [('[en] a', 'hi'), None, ('[en] a', 'hi'), None])
+        self.assertIn("translator unreachable", logs.output[0])
+        stats = executor.stats()
+        self.assertEqual(
+            {name: stats[name] for name in ('batches', 'requested_texts', 'translated_texts', 'timed_out_texts', 'failed_texts')},
+            {'batches': 1, 'requested_texts': 3, 'translated_texts': 1, 'timed_out_texts': 1, 'failed_texts': 1},
+        )
+
+    def test_translations_are_stored_and_reused(self):
+        feedback = make_feedback(make_user(), title='Paani nahi', description='Paani nahi aa raha')
+        executor = self.executor()
+        first = translate_items([{'id': feedback.id, 'title': feedback.title, 'description': feedback.description}], 'en', executor)
+        self.assertEqual(first[0]['title'], '[en] Paani nahi')
+        self.assertTrue(first[0]['translated'])
+        self.assertEqual(Feedback.objects.get(pk=feedback.pk).language, 'hi')
+
+        again = translate_items([{'id': feedback.id, 'title': feedback.title, 'description': feedback.description}], 'en', executor)
+        self.assertEqual(again[0]['description'], '[en] Paani nahi aa raha')
+        stats = executor.stats()
+        self.assertEqual((stats['stored_fields'], stats['missing_fields'], stats['batches']), (2, 2, 1))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = make_user()
+        cls.pothole = make_feedback(
+            user, title='Pothole on MG Road', description='Deep hole near the bus stop', category='INFRASTRUCTURE',
+        )
+        cls.water = make_feedback(user, title='No water', description='Pipe burst, pothole filled with water')
+        cls.light = make_feedback(
+            user, title='Streetlight out', description='Dark lane near the park', category='ELECTRICITY', location='Mumbai',
+        )
+
+    def ids(self, query):
+        return list(search.search_queryset(Feedback.objects.all(), query).values_list('id', flat=True))
+
+    def test_prefix_terms_must_all_match(self):
+        self.assertCountEqual(self.ids('pot'), [self.pothole.id, self.water.id])
+        self.assertEqual(self.ids('pothole water'), [self.water.id])
+        self.assertEqual(self.ids('mumbai'), [self.light.id])
+        self.assertEqual(self.ids('flyover'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.light.title = 'Flyover lights out'
+        self.light.save()
+        self.assertEqual(self.ids('flyover'), [self.light.id])
+        self.light.delete()
+        self.assertEqual(self.ids('flyover'), [])
+
+    def test_cursor_pages_through_tied_ranks(self):
+        user = make_user('reporter@example.com')
+        copies = [make_feedback(user, title='Garbage pile', description='Garbage not collected') for _ in range(5)]
+        client = api_client(make_user('staff@example.com', is_staff=True))
+        url, ids = '/api/feedback/admin/?search=garbage&page_size=2', []
+        while url:
+            page = client.get(url).data
+            ids.extend(row['id'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(ids, sorted((feedback.id for feedback in copies), reverse=True))  # Equal ranks: newest id first
+
+    def test_search_vector_stays_out_of_responses(self):
+        self.assertNotIn('search_vector', FeedbackSerializer(self.pothole).data)
+
+
+class CursorPaginationTests(TestCase):
+    url = '/api/feedback/user/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        start = timezone.now() - timedelta(days=1)
+        # Pairs of rows share a timestamp, so the id tie-breaker matters
+        feedbacks = [
+            Feedback(user=cls.user, title=f"Issue {i}", description=f"Details {i}", feedback_type='COMPLAINT',
+                     category='WATER', location='Pune', upvotes=i % 3, created_at=start + timedelta(minutes=i // 2))
+            for i in range(7)
+        ]
+        Feedback.objects.bulk_create(feedbacks)
+        cls.newest_first = list(Feedback.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, query):
+        client = api_client(self.user)
+        url, ids, pages = self.url + query, [], []
+        while url:
+            page = client.get(url).data
+            pages.append(page)
+            ids.extend(row['id'] for row in page['results'])
+            url = page['next']
+        return ids, pages
+
+    def test_next_links_reach_every_row_once(self):
+        ids, pages = self.walk('?page_size=3')
+        self.assertEqual(ids, self.newest_first)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_link_returns_the_same_page(self):
+        client = api_client(self.user)
+        first = client.get(self.url + '?page_size=3').data
+        second = client.get(first['next']).data
+        back = client.get(second['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], [row['id'] for row in first['results']])
+
+    def test_ordering_by_another_field(self):
+        ids, _ = self.walk('?page_size=2&ordering=upvotes')
+        expected = list(Feedback.objects.order_by('upvotes', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_bad_cursor_and_page_size_cap(self):
+        client = api_client(self.user)
+        self.assertEqual(client.get(self.url + '?cursor=not-a-cursor').status_code, 404)
+        self.assertEqual(len(client.get(self.url + '?page_size=1000').data['results']), 7)
+
+
+class AuthorityLocationTests(TestCase):
+    def stored_location(self, user):
+        return UserAccount.objects.values_list('location_ref__name', flat=True).get(pk=user.pk)
+
+    def test_partial_saves_keep_the_location_in_step(self):
+        authority = make_authority('officer@example.com', 'Pune City')
+        self.assertEqual(self.stored_location(authority), 'Pune City')
+
+        authority.work_location = 'Nagpur'
+        authority.save(update_fields=['work_location'])
+        self.assertEqual(self.stored_location(authority), 'Nagpur')
+
+        authority.role = UserAccount.Role.CIVILIAN
+        authority.save(update_fields=['role'])
+        self.assertIsNone(self.stored_location(authority))
+
+    def test_address_only_authority_is_mapped_once_the_place_is_known(self):
+        authority = make_user('clerk@example.com', role=UserAccount.Role.ADMIN, address='5 Station Road, Nashik')
+        self.assertIsNone(self.stored_location(authority))
+        make_feedback(make_user(), location='Nashik')
+        self.assertEqual(self.stored_location(authority), 'Nashik')
+
+    def test_new_places_cost_one_query_for_unrelated_authorities(self):
+        for i in range(3):
+            make_user(f'clerk{i}@example.com', role=UserAccount.Role.ADMIN, address=f'{i} Station Road, Nashik')
+        with self.assertNumQueries(2):  # The insert and the unmapped addresses
+            Location.objects.create(key='satara', name='Satara')
+        self.assertFalse(UserAccount.objects.exclude(location_ref=None).exists())
+
+    def test_new_alias_maps_authorities_too(self):
+        authority = make_user('clerk@example.com', role=UserAccount.Role.ADMIN, address='Fort, Bombay')
+        mumbai = Location.objects.resolve('Mumbai', create=True)
+        self.assertIsNone(self.stored_location(authority))
+        LocationAlias.objects.create(alias='bombay', location=mumbai)
+        self.assertEqual(self.stored_location(authority), 'Mumbai')
+
+
+class LeanListTests(TestCase):
+    url = '/api/feedback/user/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        Feedback.objects.bulk_create([
+            Feedback(user=cls.user, title=f"Issue {i}", description="Details", feedback_type='COMPLAINT', category='WATER')
+            for i in range(12)
+        ])
+
+    def get(self, query):
+        return api_client(self.user).get(self.url + query)
+
+    def test_fields_trim_the_output(self):
+        rows = self.get('?fields=id,title').data['results']
+        self.assertEqual({tuple(row) for row in rows}, {('id', 'title')})
+        row = self.get('?page_size=1').data['results'][0]
+        self.assertEqual(tuple(row), FeedbackListSerializer.FIELDS)
+        self.assertEqual(row['user'], self.user.pk)
+
+    def test_unknown_fields_and_expansions_are_rejected(self):
+        self.assertEqual(self.get('?fields=id,password').status_code, 400)
+        self.assertEqual(self.get('?expand=owner').status_code, 400)
+
+    def test_expand_user_nests_the_user(self):
+        row = self.get('?fields=id,user&expand=user&page_size=1').data['results'][0]
+        self.assertEqual(row['user'], {'id': self.user.pk, 'first_name': 'C', 'last_name': 'D'})
+
+    def test_query_count_does_not_follow_the_page_size(self):
+        client = api_client(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(client.get(self.url + '?page_size=2&expand=user').data['results']), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(client.get(self.url + '?page_size=12&expand=user').data['results']), 12)
+
+    def test_fast_renderer_matches_the_stock_one(self):
+        data = {
+            'created_at': timezone.now(), 'day': timezone.localdate(), 'amount': Decimal('12.50'),
+            'score': -0.3333333333333333, 'ratio': 0.1, 'name': 'ठीक है', 'nested': [{'id': 1, 'value': None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Floats in exponent form are spelt differently ("1e20" / "1e+20") but parse the same
+        exponents = {'big': 1e20, 'small': 2.5e-8}
+        self.assertEqual(json.loads(FastJSONRenderer().render(exponents)), json.loads(JSONRenderer().render(exponents)))
+
+
+class FeedbackUpdateTests(TestCase):
+    def test_edit_writes_only_the_edited_fields(self):
+        user = make_user()
+        feedback = make_feedback(user)
+        stale = Feedback.objects.get(pk=feedback.pk)
+        cast_vote(make_user('voter@example.com'), feedback.pk, 1)  # Lands after the view read the row
+        with mock.patch.object(FeedbackUpdateView, 'get_object', return_value=stale):
+            response = api_client(user).patch(f'/api/feedback/update/{feedback.pk}/', {'title': 'Burst main'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        feedback.refresh_from_db()
+        self.assertEqual((feedback.title, feedback.upvotes), ('Burst main', 1))
+        self.assertGreater(feedback.hot_score, 0)
+        self.assertTrue(feedback.keywords.startswith('burst main'))
+        incremental = rollup_table()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_table())
+
+    def test_edits_requeue_the_jobs_their_text_feeds(self):
+        user = make_user()
+        feedback = make_feedback(user)
+
+        def kinds():
+            return sorted(FeedbackJob.objects.filter(feedback=feedback).values_list('kind', flat=True))
+
+        api_client(user).patch(f'/api/feedback/update/{feedback.pk}/', {'title': 'Burst main'}, format='json')
+        self.assertEqual(kinds(), [FeedbackJob.Kind.TRANSLATION])
+        api_client(user).patch(f'/api/feedback/update/{feedback.pk}/', {'description': 'Flooding'}, format='json')
+        self.assertEqual(kinds(), sorted([FeedbackJob.Kind.SENTIMENT, *[FeedbackJob.Kind.TRANSLATION] * 2]))
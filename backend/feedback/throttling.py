@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import namedtuple
+
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+try:
+    from django_redis import get_redis_connection
+    from django_redis.cache import RedisCache
+except ImportError:  # django-redis not installed: only the local fallback is available
+    RedisCache = None
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'granted', 'remaining', 'retry_after'])
+
+# Sliding window counter: the previous fixed window's count is weighted by how much of it
+# still overlaps the sliding window. Runs as one script, so check + increment is atomic in Redis.
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local used = previous * tonumber(ARGV[3]) + current
+local granted = math.max(0, math.min(tonumber(ARGV[4]), math.floor(limit - used)))
+if granted > 0 then
+    redis.call('INCRBY', KEYS[1], granted)
+    redis.call('EXPIRE', KEYS[1], 2 * tonumber(ARGV[2]))
+end
+return {granted, math.floor(used + granted)}
+"""
+
+_local_lock = threading.Lock()
+
+
+class SlidingWindowRateLimiter:
+    """
+    Sliding-window rate limiter kept in a shared cache, so every worker process sees the same counts.
+
+    With django-redis each check is a single Lua script call. Any other cache backend (e.g. the
+    local-memory fallback) does get/set under a process-local lock, which is only exact within one process.
+    """
+
+    def __init__(self, num_requests, duration, cache_alias='default'):
+        self.num_requests = num_requests
+        self.duration = duration
+        self.cache_alias = cache_alias
+        self.cache = caches[cache_alias]
+
+    @classmethod
+    def for_scope(cls, scope, cache_alias='default'):
+        """Limiter for a rate configured in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']."""
+        num_requests, duration = SimpleRateThrottle.parse_rate(None, api_settings.DEFAULT_THROTTLE_RATES[scope])
+        return cls(num_requests, duration, cache_alias)
+
+    def window_keys(self, key, timestamp):
+        window = int(timestamp // self.duration)
+        return f"ratelimit:{key}:{window}", f"ratelimit:{key}:{window - 1}"
+
+    def consume(self, key, tokens=1):
+        """
+        Take up to `tokens` from the budget for `key`.
+
+        `granted` may be less than `tokens` when the budget is nearly spent (bulk callers use it to
+        accept part of a batch); `allowed` is True only if every token was granted.
+        """
+        timestamp = time.time()
+        elapsed = (timestamp % self.duration) / self.duration
+        current_key, previous_key = self.window_keys(key, timestamp)
+
+        if RedisCache is not None and isinstance(self.cache, RedisCache):
+            client = get_redis_connection(self.cache_alias)
+            granted, used = client.eval(
+                SLIDING_WINDOW_SCRIPT, 2, self.cache.make_key(current_key), self.cache.make_key(previous_key),
+                self.num_requests, self.duration, 1 - elapsed, tokens,
+            )
+        else:
+            granted, used = self._consume_local(current_key, previous_key, 1 - elapsed, tokens)
+
+        remaining = max(0, self.num_requests - used)
+        retry_after = None
+        if granted < tokens:
+            # The current window's hits only drop out when the window rolls over
+            retry_after = math.ceil(self.duration * (1 - elapsed))
+        return RateLimitResult(granted == tokens, granted, remaining, retry_after)
+
+    def _consume_local(self, current_key, previous_key, previous_weight, tokens):
+        with _local_lock:
+            counts = self.cache.get_many([current_key, previous_key])
+            current = counts.get(current_key, 0)
+            used = counts.get(previous_key, 0) * previous_weight + current
+            granted = max(0, min(tokens, math.floor(self.num_requests - used)))
+            if granted:
+                self.cache.set(current_key, current + granted, 2 * self.duration)
+        return granted, math.floor(used + granted)
+
+
+class SlidingWindowThrottleMixin:
+    """Runs a SimpleRateThrottle subclass on SlidingWindowRateLimiter instead of per-request timestamps."""
+    result = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.result = SlidingWindowRateLimiter(self.num_requests, self.duration).consume(self.key)
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after if self.result else None
+
+
+class SlidingWindowUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
+
+
+class SlidingWindowAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingWindowScopedRateThrottle(SlidingWindowThrottleMixin, ScopedRateThrottle):
+    def allow_request(self, request, view):
+        # ScopedRateThrottle only resolves its rate from the view's throttle_scope here
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from googletrans import Translator
+
+from .models import Feedback, FeedbackTranslation
+
+TRANSLATED_FIELDS = ('title', 'description')
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleTranslateBackend:
+    """Translates through googletrans (one HTTP call per text)."""
+
+    def __init__(self):
+        self.translator = Translator()
+
+    def translate(self, texts, dest):
+        """Return a (translated_text, source_language) pair per text."""
+        results = []
+        for text in texts:
+            translated = self.translator.translate(text, dest=dest)
+            results.append((translated.text, translated.src))
+        return results
+
+    def detect(self, texts):
+        return [self.translator.detect(text).lang for text in texts]
+
+
+class OfflineTranslationBackend:
+    """Offline backend for tests and local runs: text comes back unchanged, detected as English."""
+
+    def translate(self, texts, dest):
+        return [(text, 'en') for text in texts]
+
+    def detect(self, texts):
+        return ['en' for _ in texts]
+
+
+def get_translation_backend(path=None):
+    """Instantiate the backend configured in settings.TRANSLATION_BACKEND (or the given dotted path)."""
+    return import_string(path or settings.TRANSLATION_BACKEND)()
+
+
+class TranslationExecutor:
+    """
+    Translates a batch of texts concurrently on a bounded thread pool.
+
+    Identical texts are sent once. Whatever hasn't finished by the deadline comes back as
+    None so the caller can return the original text instead of timing out the whole request.
+    Counters (per process) are available from stats(). Each name says what it counts:
+    *_fields are item fields, *_texts distinct texts, batches translate() calls.
+    """
+
+    def __init__(self, backend_path=None, max_workers=None, deadline=None):
+        config = settings.TRANSLATION_EXECUTOR
+        self.backend_path = backend_path
+        self.deadline = deadline if deadline is not None else config['DEADLINE_SECONDS']
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or config['MAX_WORKERS'], thread_name_prefix='translate')
+        self.local = threading.local()  # One backend per worker thread (googletrans clients aren't thread-safe)
+        self.lock = threading.Lock()
+        self.counters = {
+            'stored_fields': 0,  # Served from FeedbackTranslation
+            'missing_fields': 0,  # Not stored yet, so sent to the backend
+            'batches': 0,
+            'requested_texts': 0,  # Distinct texts across those batches
+            'translated_texts': 0,
+            'timed_out_texts': 0,
+            'failed_texts': 0,
+            'latency_ms_total': 0.0,  # Summed over translated_texts
+        }
+
+    def count(self, **increments):
+        with self.lock:
+            for name, value in increments.items():
+                self.counters[name] += value
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        translated = stats['translated_texts']
+        stats['latency_ms_avg'] = round(stats['latency_ms_total'] / translated, 2) if translated else None
+        return stats
+
+    def backend(self):
+        if not hasattr(self.local, 'backend'):
+            self.local.backend = get_translation_backend(self.backend_path)
+        return self.local.backend
+
+    def translate_one(self, text, dest):
+        started = time.monotonic()
+        try:
+            result = self.backend().translate([text], dest)[0]
+        except Exception:
+            self.count(failed_texts=1)
+            logger.exception("Translation to %s failed", dest)
+            return None
+        self.count(translated_texts=1, latency_ms_total=(time.monotonic() - started) * 1000)
+        return result
+
+    def translate(self, texts, dest):
+        """Return a (translated_text, source_language) pair per text, or None where it failed or ran out of time."""
+        unique = list(dict.fromkeys(texts))
+        futures = {text: self.pool.submit(self.translate_one, text, dest) for text in unique}
+        done, not_done = wait(futures.values(), timeout=self.deadline)
+        for future in not_done:
+            future.cancel()
+        self.count(batches=1, requested_texts=len(unique), timed_out_texts=len(not_done))
+        results = {text: future.result() if future in done else None for text, future in futures.items()}
+        return [results[text] for text in texts]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide executor, so the thread pool and counters are shared by all requests."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TranslationExecutor()
+    return _executor
+
+
+def source_hash(text):
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def translate_items(items, language, executor=None, fail_silently=True):
+    """
+    Translate the title/description of serialized feedback dicts (or .values() rows) in place.
+
+    Items already written in `language` are skipped. Stored translations are read with one
+    query; whatever is missing is translated concurrently by the executor and stored for next
+    time. Each item gets a `translated` flag: False means a field is still in the original text
+    (backend failure or deadline), unless fail_silently is False, in which case that raises.
+    """
+    for item in items:
+        item['translated'] = True
+    pending = [item for item in items if item.get('language') != language]
+    if not pending:
+        return items
+
+    stored = {
+        (feedback_id, field, text_hash): text
+        for feedback_id, field, text_hash, text in FeedbackTranslation.objects.filter(
+            feedback_id__in=[item['id'] for item in pending], language=language
+        ).values_list('feedback_id', 'field', 'source_hash', 'text')
+    }
+
+    misses = {}  # source text -> [(item, field)], so repeated texts are translated once
+    hits = 0  # Fields
+    for item in pending:
+        for field in TRANSLATED_FIELDS:
+            if field not in item:  # Left out by a sparse fieldset
+                continue
+            translated = stored.get((item['id'], field, source_hash(item[field])))
+            if translated is not None:
+                item[field] = translated
+                hits += 1
+            else:
+                misses.setdefault(item[field], []).append((item, field))
+
+    executor = executor or get_executor()
+    executor.count(stored_fields=hits, missing_fields=sum(len(fields) for fields in misses.values()))
+    if not misses:
+        return items
+
+    sources = list(misses)
+    results = executor.translate(sources, language)
+    if not fail_silently and None in results:
+        raise RuntimeError(f"{results.count(None)} of {len(sources)} texts could not be translated")
+
+    new_translations, detected = [], {}
+    for source, result in zip(sources, results):
+        for item, field in misses[source]:
+            if result is None:
+                item['translated'] = False  # Keep the original text
+                continue
+            translated, source_language = result
+            item[field] = translated
+            new_translations.append(FeedbackTranslation(
+                feedback_id=item['id'], field=field, language=language,
+                source_hash=source_hash(source), text=translated,
+            ))
+            if source_language and not item.get('language'):
+                detected.setdefault(source_language, set()).add(item['id'])
+
+    FeedbackTranslation.objects.bulk_create(new_translations, ignore_conflicts=True)
+    # The backend told us the source language as a side effect; remember it so future requests skip no-ops
+    for source_language, feedback_ids in detected.items():
+        Feedback.objects.filter(id__in=feedback_ids, language='').update(language=source_language)
+    return items
@@ -1,28 +1,58 @@
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Feedback
-from .serializers import FeedbackSerializer, FeedbackUpdateSerializer
+from .models import Feedback, FeedbackJob
+from .serializers import FeedbackListSerializer, FeedbackSerializer, FeedbackUpdateSerializer
 from .filters import FeedbackFilter
+from .pagination import FeedbackCursorPagination
+from .renderers import FastJSONRenderer
 from django.conf import settings 
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from authentication.utils import CookieJWTAuthentication
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from googletrans import Translator
-import google.generativeai as genai
-import re
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from datetime import timedelta  # For time-based filtering
-from difflib import SequenceMatcher  # For checking text similarity
 from django.utils.timezone import now  # To get the current timestamp
-from rest_framework import filters
-from django_filters.rest_framework import DjangoFilterBackend
-from .filters import FeedbackFilter  # Ensure this exists
-
+from django.db import transaction
+from .jobs import enqueue_jobs
+from .translation import get_executor, translate_items
+from .dedup import (
+    band_buckets, dedup_setting, duplicate_clusters, find_duplicates_many,
+    index_feedbacks, minhash, similarity,
+)
+from .throttling import SlidingWindowRateLimiter
+from . import search
+from admindashboard import rollups
+from admindashboard.access import admin_location, scoped
+from authentication.models import UserAccount
+from rest_framework.views import APIView
+from rest_framework.renderers import BrowsableAPIRenderer
+from votes.buffer import merge_pending as merge_pending_votes
+
+
+class LeanListMixin:
+    """
+    List feedback as `.values()` rows through FeedbackListSerializer (supports ?fields= and
+    ?expand=user) and render them with the fast JSON renderer.
+    """
+    list_serializer_class = FeedbackListSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def prepare_rows(self, rows):
+        """Hook to adjust the page's rows in place before they are trimmed to the requested fields."""
 
+    def list(self, request, *args, **kwargs):
+        serializer = self.list_serializer_class(context=self.get_serializer_context())
+        queryset = serializer.select(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        merge_pending_votes(rows)
+        self.prepare_rows(rows)
+        data = [serializer.to_representation(row) for row in rows]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
 
-# Configure Gemini API
-genai.configure(api_key=settings.GEMINI_API_KEY)
 
 class FeedbackCreateView(generics.CreateAPIView):
     queryset = Feedback.objects.all()
@@ -30,83 +60,148 @@ class FeedbackCreateView(generics.CreateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.data["duplicate_of"] = self.duplicate_of
+        return response
+
     def perform_create(self, serializer):
         user = self.request.user
         feedback = serializer.validated_data
-        description = feedback.get("description", "")
+        signature = minhash(feedback.get("description", ""))
 
-        # Get sentiment score
-        sentiment_score = self.get_sentiment_score(description)
-        
-         # Check if the user is sending too many feedbacks
-        recent_feedbacks = Feedback.objects.filter(
-            user=user,
-            created_at__gte=now() - timedelta(hours=1)  # Last 1 hour
-        )
+        # Check if the feedback is very similar to recent submissions in DUPLICATE_DETECTION['SCOPES'] (by default the user's own)
+        if find_duplicates_many([signature], user=user)[0]:
+            raise PermissionDenied("Duplicate or similar feedback detected!")
+        # Someone else's recent report of the same thing doesn't block this one; the response points at it
+        similar = find_duplicates_many([signature], scopes=['global'])[0]
+        self.duplicate_of = similar[0][0] if similar else None
 
-        if recent_feedbacks.count() >= 5:  # More than 5 complaints in 1 hour
+        # Check if the user is sending too many feedbacks (shared sliding window, see feedback/throttling.py)
+        if not SlidingWindowRateLimiter.for_scope('feedback_create').consume(f"user:{user.pk}").allowed:
             raise PermissionDenied("Too many feedback submissions. Try again later.")
-
-        # Check if the feedback is very similar to previous submissions
-        for fb in recent_feedbacks:
-            similarity = SequenceMatcher(None, fb.description.lower(), description.lower()).ratio()
-            if similarity > 0.8:  # More than 80% similarity
-                raise PermissionDenied("Duplicate or similar feedback detected!")
-        
         
-        print(f"User: {self.request.user}")  # Debugging
-        print(f"Is Authenticated: {self.request.user.is_authenticated}")  # Debugging
 
         if not self.request.user or self.request.user.is_anonymous:
             raise PermissionDenied("Authentication required to submit feedback.")
-        # Save feedback with sentiment score
-        serializer.save(user=self.request.user, sentiment_score=sentiment_score)
-
-
-    def get_sentiment_score(self, text):
-        """Analyze sentiment score using the free Gemini model"""
-        try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            
-            model = genai.GenerativeModel("models/gemini-1.5-flash")  # FREE MODEL
-            response = model.generate_content(
-                f"Analyze the sentiment of this text and return only a numerical score between -1 (very negative) "
-                f"and 1 (very positive), with 0 being neutral. No explanation, just the number:\n\n{text}"
-            )
-
-            # Extract response text
-            response_text = response.text.strip()
-
-            # Extract numerical score using regex
-            match = re.search(r"-?\d+(\.\d+)?", response_text)
-            if match:
-                return float(match.group(0))  # Convert extracted number to float
-            return 0.0  # Default neutral score if extraction fails
-
-        except Exception as e:
-            print(f"Sentiment analysis error: {e}")
-            return 0.0  # Default score if API call fails
-        
-class FeedbackListView(generics.ListAPIView):
+        # Save right away with sentiment pending; the job worker fills in sentiment_score
+        with transaction.atomic():
+            instance = serializer.save(user=self.request.user, sentiment_score=None)
+            enqueue_jobs([instance], FeedbackJob.Kind.SENTIMENT)
+            enqueue_jobs([instance], FeedbackJob.Kind.TRANSLATION)
+
+
+class BulkFeedbackCreateView(APIView):
+    """
+    Create many feedbacks in one request (SMS gateways, meeting transcripts).
+
+    Takes a list of feedback objects (or {"items": [...]}) and reports a result per item:
+    created, invalid, duplicate or rate_limited.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of feedback items"}, status=400)
+        if len(items) > settings.FEEDBACK_BULK_MAX_ITEMS:
+            return Response({"error": f"At most {settings.FEEDBACK_BULK_MAX_ITEMS} items per request"}, status=400)
+
+        results = [{"index": index} for index in range(len(items))]
+
+        # Validate everything at once; if some items fail, validate the remaining ones again as a batch
+        serializer = FeedbackSerializer(data=items, many=True)
+        valid_indexes = list(range(len(items)))
+        if not serializer.is_valid():
+            valid_indexes = [index for index, errors in enumerate(serializer.errors) if not errors]
+            for index, errors in enumerate(serializer.errors):
+                if errors:
+                    results[index].update(status="invalid", errors=errors)
+            serializer = FeedbackSerializer(data=[items[index] for index in valid_indexes], many=True)
+            serializer.is_valid(raise_exception=True)
+
+        # Duplicates against stored feedback: one bucket query + one signature query for the batch
+        signatures = [minhash(data.get("description", "")) for data in serializer.validated_data]
+        stored_matches = find_duplicates_many(signatures, user=request.user)
+
+        # ... and against earlier items of the same batch
+        threshold = dedup_setting('THRESHOLD')
+        seen_buckets = {}
+        signature_by_index = dict(zip(valid_indexes, signatures))
+        accepted = []
+        for index, data, signature, matches in zip(valid_indexes, serializer.validated_data, signatures, stored_matches):
+            if matches:
+                results[index].update(status="duplicate", duplicate_of=matches[0][0])
+                continue
+            buckets = band_buckets(signature)
+            batch_match = next((
+                other for bucket in buckets for other in seen_buckets.get(bucket, ())
+                if similarity(signature, signature_by_index[other]) >= threshold
+            ), None)
+            if batch_match is not None:
+                results[index].update(status="duplicate", duplicate_of_index=batch_match)
+                continue
+            for bucket in buckets:
+                seen_buckets.setdefault(bucket, []).append(index)
+            accepted.append((index, data))
+
+        # Take the whole batch out of the user's budget in one limiter call. Staff and authority
+        # accounts (the intake channels) have the bulk budget; anyone else spends the same one as
+        # FeedbackCreateView, so the bulk endpoint is no way around it
+        granted = 0
+        if accepted:
+            if request.user.is_staff or request.user.role == UserAccount.Role.ADMIN:
+                scope, key = 'feedback_bulk_create', f"user:{request.user.pk}:bulk"
+            else:
+                scope, key = 'feedback_create', f"user:{request.user.pk}"
+            granted = SlidingWindowRateLimiter.for_scope(scope).consume(key, tokens=len(accepted)).granted
+        for index, _ in accepted[granted:]:
+            results[index].update(status="rate_limited")
+        accepted = accepted[:granted]
+
+        # Similar recent reports by anyone are only pointed at, as in FeedbackCreateView
+        similar = find_duplicates_many([signature_by_index[index] for index, _ in accepted], scopes=['global'])
+
+        feedbacks = [Feedback(**data, user=request.user, sentiment_score=None) for _, data in accepted]
+        for feedback in feedbacks:
+            feedback.build_keywords()  # bulk_create skips Feedback.save()
+            feedback.assign_location()
+            feedback.assign_priority()
+
+        with transaction.atomic():
+            created = Feedback.objects.bulk_create(feedbacks)
+            # post_save doesn't fire for bulk_create, so index and queue scoring explicitly
+            index_feedbacks(created)
+            search.index_feedbacks(created)
+            rollups.apply_changes([(None, rollups.snapshot(feedback)) for feedback in created])
+            enqueue_jobs(created, FeedbackJob.Kind.SENTIMENT)
+            enqueue_jobs(created, FeedbackJob.Kind.TRANSLATION)
+
+        for (index, _), feedback, matches in zip(accepted, created, similar):
+            results[index].update(status="created", id=feedback.id, duplicate_of=matches[0][0] if matches else None)
+
+        return Response({
+            "created": len(created),
+            "results": results,
+        }, status=201 if created else 200)
+
+
+class FeedbackListView(LeanListMixin, generics.ListAPIView):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_class = FeedbackFilter
-    search_fields = ['title', 'description', 'category', 'location']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = FeedbackFilter  # ?search= goes through the full-text index (feedback/search.py)
+    pagination_class = FeedbackCursorPagination  # Also applies ?ordering=
     ordering_fields = ['created_at', 'upvotes', 'urgency']
     
     
-    def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        language = request.GET.get('lang', 'en')
-        translator = Translator()
+    def prepare_rows(self, rows):
+        language = self.request.GET.get('lang', 'en')
 
-        for feedback in response.data:
-            feedback['title'] = translator.translate(feedback['title'], dest=language).text
-            feedback['description'] = translator.translate(feedback['description'], dest=language).text
-        
-        return response
+        # Served from stored translations; only missing ones are translated (as one batch)
+        translate_items(rows, language)
 
 class FeedbackDetailView(generics.RetrieveAPIView):
     queryset = Feedback.objects.all()
@@ -116,10 +211,9 @@ class FeedbackDetailView(generics.RetrieveAPIView):
     def retrieve(self, request, *args, **kwargs):
         response = super().retrieve(request, *args, **kwargs)
         language = request.GET.get('lang', 'en')
-        translator = Translator()
 
-        response.data['title'] = translator.translate(response.data['title'], dest=language).text
-        response.data['description'] = translator.translate(response.data['description'], dest=language).text
+        translate_items([response.data], language)
+        merge_pending_votes([response.data])
 
         return response
     
@@ -131,10 +225,23 @@ class FeedbackUpdateView(generics.UpdateAPIView):
     authentication_classes = [JWTAuthentication]
 
     def get_queryset(self):
-        return Feedback.objects.filter(user=self.request.user)
+        # Locked, so the priority score recomputed from the row's counters can't miss a concurrent vote
+        return Feedback.objects.filter(user=self.request.user).select_for_update()
+
+    def perform_update(self, serializer):
+        old_text = (serializer.instance.title, serializer.instance.description)
+        instance = serializer.save()
+        if instance.description != old_text[1]:
+            # The score was read from the old description; the job worker rescores it
+            enqueue_jobs([instance], FeedbackJob.Kind.SENTIMENT)
+        if (instance.title, instance.description) != old_text:
+            # Stored translations are keyed by the old text's hash, so re-detect and re-translate
+            Feedback.objects.filter(pk=instance.pk).update(language='')
+            enqueue_jobs([instance], FeedbackJob.Kind.TRANSLATION)
 
     def update(self, request, *args, **kwargs):
-        response = super().update(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
         return Response({"message": "Feedback updated successfully", "status": response.data.get("status")})
 
 
@@ -146,41 +253,36 @@ class FeedbackDeleteView(generics.DestroyAPIView):
         return Feedback.objects.filter(user=self.request.user)
 
 
-class UserFeedbackView(generics.ListAPIView):
+class UserFeedbackView(LeanListMixin, generics.ListAPIView):
     serializer_class = FeedbackSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedbackCursorPagination
+    ordering_fields = ['created_at', 'upvotes', 'urgency']
 
     def get_queryset(self):
         user = self.request.user  # Get logged-in user
         return Feedback.objects.filter(user=user)  # Return only the logged-in user's feedback
 
-class AdminFeedbackView(generics.ListAPIView):
+class AdminFeedbackView(LeanListMixin, generics.ListAPIView):
     serializer_class = FeedbackSerializer
     authentication_classes = [JWTAuthentication]  # If using Authorization header
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend]
     filterset_class = FeedbackFilter  # Apply the same filters
-    search_fields = ['title', 'description', 'category', 'location']
+    pagination_class = FeedbackCursorPagination
     ordering_fields = ['created_at', 'upvotes', 'urgency']
 
     def get_queryset(self):
-        user = self.request.user  # Get logged-in user
-
-        print(f"User Role: {user.role}")
-        print(f"User Address: {user.address}")
-        print(f"Feedback Locations: {Feedback.objects.values_list('location', flat=True)}")
+        # Authorities see the feedback filed under the Location they administer
+        return scoped(Feedback.objects.all(), admin_location(self.request)).select_related('user')
 
-        # Ensure the user is an admin
-        if user.role == 'ADMIN':
-            return Feedback.objects.filter(location__iexact=user.address).select_related('user')  # Optimize query
-        else:
-            return Feedback.objects.none()  # Return empty queryset if not admin
-
-class UserFeedbackView(generics.ListAPIView):
+class UserFeedbackView(LeanListMixin, generics.ListAPIView):
     serializer_class = FeedbackSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedbackCursorPagination
+    ordering_fields = ['created_at', 'upvotes', 'urgency']
 
     def get_queryset(self):
         user = self.request.user  # Get logged-in user
@@ -190,3 +292,55 @@ class UserFeedbackView(generics.ListAPIView):
         
         # If not admin, return only the feedback created by the logged-in user
         return Feedback.objects.filter(user=user)
+
+
+class DuplicateClustersView(APIView):
+    """
+    Clusters of near-duplicate feedback (e.g. one complaint posted from many accounts) created in
+    the last ?days= days (7 by default), with at least ?min_size= members. Authorities only see
+    their own location; staff can narrow it with ?location=.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 90
+    MAX_MIN_SIZE = 1000
+
+    def whole_number(self, name, default, low, high):
+        value = self.request.query_params.get(name, str(default))
+        if not value.isdigit() or not low <= int(value) <= high:
+            raise ValidationError({name: f"Must be a whole number between {low} and {high}."})
+        return int(value)
+
+    def get(self, request):
+        if request.user.role != UserAccount.Role.ADMIN and not request.user.is_staff:
+            raise PermissionDenied("Only authorities can view duplicate clusters.")
+
+        days = self.whole_number('days', 7, 1, self.MAX_DAYS)
+        min_size = self.whole_number('min_size', 2, 2, self.MAX_MIN_SIZE)
+        location = admin_location(request)
+        queryset = scoped(Feedback.objects.all(), location) if location is not None else None
+        clusters = duplicate_clusters(now() - timedelta(days=days), min_size=min_size, queryset=queryset)
+
+        titles = dict(
+            Feedback.objects.filter(id__in=[feedback_id for cluster in clusters for feedback_id in cluster])
+            .values_list('id', 'title')
+        )
+        return Response([
+            {
+                "size": len(cluster),
+                "feedback_ids": cluster,
+                "title": titles.get(cluster[0]),
+            }
+            for cluster in clusters
+        ])
+
+
+class TranslationStatsView(APIView):
+    """Hit/miss/latency counters of this process's translation executor."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != UserAccount.Role.ADMIN and not request.user.is_staff:
+            raise PermissionDenied("Only authorities can view translation stats.")
+        return Response(get_executor().stats())
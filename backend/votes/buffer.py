@@ -0,0 +1,205 @@
+"""
+Write-behind buffer for vote counters (settings.VOTE_BUFFER).
+
+When enabled, votes/services.py still writes the Vote row in the request, but instead of
+updating the feedback's counters it adds the delta here. flush() applies every pending delta
+in one UPDATE, so a viral feedback takes one row lock per interval instead of one per vote.
+Reads call merge_pending() to show counts that include unflushed votes.
+
+A flush first moves the pending deltas aside as the "processing" batch, and only deletes that
+batch once its UPDATE has committed. A flush that fails or dies halfway leaves the batch in
+place, and the next flush applies it before taking anything new. One flush runs at a time
+(a cache lock). Only a crash between the commit and the delete re-applies a batch.
+
+With django-redis the deltas live in Redis hashes (HINCRBY; moved aside atomically by a Lua
+script) shared by all processes. Otherwise they are kept in process-local dicts.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from admindashboard import rollups
+from feedback import priority
+from feedback.models import Feedback
+
+from . import ranking
+
+try:
+    from django_redis import get_redis_connection
+    from django_redis.cache import RedisCache
+except ImportError:  # django-redis not installed: only the local fallback is available
+    RedisCache = None
+
+COUNTER_FIELDS = ('upvotes', 'downvotes')
+PENDING_KEY = 'votebuffer:pending'
+PROCESSING_KEY = 'votebuffer:processing'
+FLUSH_GATE_KEY = 'votebuffer:flush-gate'
+FLUSH_LOCK_KEY = 'votebuffer:flush-lock'
+
+# Move the pending hash aside in one step (deltas added meanwhile wait for the next flush),
+# unless a batch an earlier flush didn't finish is still there: that one goes first
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return {}
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+_local_pending = {}
+_local_processing = {}
+_local_lock = threading.Lock()
+
+
+def buffer_setting(name):
+    return settings.VOTE_BUFFER[name]
+
+
+def enabled():
+    return buffer_setting('ENABLED')
+
+
+def _cache():
+    return caches[buffer_setting('CACHE_ALIAS')]
+
+
+def _redis():
+    """Redis client and the prefixed pending and processing hash keys, or Nones when using the local fallback."""
+    cache = _cache()
+    if RedisCache is not None and isinstance(cache, RedisCache):
+        return get_redis_connection(buffer_setting('CACHE_ALIAS')), cache.make_key(PENDING_KEY), cache.make_key(PROCESSING_KEY)
+    return None, None, None
+
+
+def add_deltas(feedback_id, deltas):
+    """Queue {'upvotes': n, 'downvotes': n} for a feedback."""
+    client, key, _ = _redis()
+    if client is not None:
+        pipeline = client.pipeline(transaction=False)
+        for counter, delta in deltas.items():
+            pipeline.hincrby(key, f"{feedback_id}:{counter}", delta)
+        pipeline.execute()
+        return
+    with _local_lock:
+        pending = _local_pending.setdefault(feedback_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        for counter, delta in deltas.items():
+            pending[counter] += delta
+
+
+def _parse(fields):
+    deltas = {}
+    for field, delta in fields:
+        feedback_id, counter = (field.decode() if isinstance(field, bytes) else field).split(':')
+        deltas.setdefault(int(feedback_id), dict.fromkeys(COUNTER_FIELDS, 0))[counter] += int(delta)
+    return deltas
+
+
+def pending_deltas(feedback_ids):
+    """{feedback_id: {'upvotes': n, 'downvotes': n}} not yet flushed, for the given ids."""
+    feedback_ids = list(feedback_ids)
+    if not feedback_ids:
+        return {}
+    client, pending_key, processing_key = _redis()
+    if client is not None:
+        fields = [f"{feedback_id}:{counter}" for feedback_id in feedback_ids for counter in COUNTER_FIELDS]
+        pipeline = client.pipeline(transaction=False)
+        pipeline.hmget(pending_key, fields)
+        pipeline.hmget(processing_key, fields)
+        values = [delta for deltas in pipeline.execute() for delta in deltas]
+        return _parse((field, delta) for field, delta in zip(fields * 2, values) if delta is not None)
+    deltas = {}
+    with _local_lock:
+        for batch in (_local_pending, _local_processing):
+            for pk in feedback_ids:
+                for counter, delta in batch.get(pk, {}).items():
+                    deltas.setdefault(pk, dict.fromkeys(COUNTER_FIELDS, 0))[counter] += delta
+    return deltas
+
+
+def merge_pending(items):
+    """Add unflushed deltas to the counters of feedback dicts (rows or serialized data), in place."""
+    if not enabled():
+        return items
+    pending = pending_deltas(item['id'] for item in items)
+    for item in items:
+        for counter, delta in pending.get(item['id'], {}).items():
+            if counter in item:
+                item[counter] += delta
+    return items
+
+
+def claim():
+    """The batch to apply: an unfinished earlier batch if there is one, else every pending delta."""
+    client, pending_key, processing_key = _redis()
+    if client is not None:
+        data = client.eval(CLAIM_SCRIPT, 2, pending_key, processing_key)
+        return _parse(zip(data[::2], data[1::2]))
+    global _local_pending, _local_processing
+    with _local_lock:
+        if not _local_processing:
+            _local_processing, _local_pending = _local_pending, {}
+        return {pk: dict(delta) for pk, delta in _local_processing.items()}
+
+
+def release():
+    """Drop the claimed batch, once it is committed."""
+    client, _, processing_key = _redis()
+    if client is not None:
+        client.delete(processing_key)
+        return
+    with _local_lock:
+        _local_processing.clear()
+
+
+def apply_deltas(deltas):
+    """Apply {feedback_id: {'upvotes': n, 'downvotes': n}} to the counters, hot and priority scores in a single UPDATE (plus the daily rollups)."""
+    updates = {}
+    for counter in COUNTER_FIELDS:
+        whens = [When(pk=pk, then=Value(delta[counter])) for pk, delta in deltas.items() if delta[counter]]
+        if whens:
+            updates[counter] = F(counter) + Case(*whens, default=Value(0))
+    if not updates:
+        return
+    net_votes = Case(
+        *[When(pk=pk, then=Value(delta['upvotes'] - delta['downvotes'])) for pk, delta in deltas.items()],
+        default=Value(0),
+    )
+    Feedback.objects.filter(pk__in=list(deltas)).update(
+        **updates, **ranking.vote_updates(net_votes), **priority.vote_updates(net_votes),
+    )
+    rollups.record_votes(deltas)
+
+
+def flush():
+    """Apply the buffered deltas to the database. Returns the number of feedbacks updated."""
+    cache = _cache()
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=buffer_setting('FLUSH_LOCK_SECONDS')):
+        return 0  # Another flush is running
+
+    def finish():
+        release()
+        cache.delete(FLUSH_LOCK_KEY)
+
+    try:
+        deltas = claim()
+        if not deltas:
+            cache.delete(FLUSH_LOCK_KEY)
+            return 0
+        with transaction.atomic():
+            apply_deltas(deltas)
+            transaction.on_commit(finish)  # The batch stays claimed until the UPDATE is durable
+    except Exception:
+        cache.delete(FLUSH_LOCK_KEY)  # The batch stays claimed for the next flush
+        raise
+    return len(deltas)
+
+
+def maybe_flush():
+    """Flush if nobody has in the last FLUSH_INTERVAL_SECONDS (cache.add is the gate, so one caller wins)."""
+    if _cache().add(FLUSH_GATE_KEY, 1, timeout=buffer_setting('FLUSH_INTERVAL_SECONDS')):
+        flush()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test.utils import override_settings
+
+from authentication.models import UserAccount
+from feedback.models import Feedback
+from votes import buffer, services
+from votes.models import Vote
+
+
+class Command(BaseCommand):
+    help = "Votes/sec against a single hot feedback, with the counter UPDATE inline vs through the write-behind buffer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=500, help="Votes cast per run (one per synthetic user).")
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent voters.")
+        parser.add_argument(
+            '--allow-writes', action='store_true',
+            help="Required: commits synthetic users, a feedback and votes (deleted again at the end).",
+        )
+
+    def handle(self, *args, **options):
+        votes, threads = options['votes'], options['threads']
+        # The voter threads use their own connections, so the rows must be committed for them to see;
+        # unlike benchmark_list_serialization, the run can't sit in a rolled-back transaction
+        if not options['allow_writes']:
+            raise CommandError("This benchmark writes to the database; pass --allow-writes to run it.")
+        if connection.vendor == 'sqlite':
+            self.stderr.write(self.style.WARNING("SQLite allows one writer at a time; run against Postgres for meaningful numbers."))
+        users = UserAccount.objects.bulk_create([
+            UserAccount(email=f'vote-benchmark-{i}@example.com', first_name='Vote', last_name='Benchmark')
+            for i in range(votes)
+        ])
+        feedback = Feedback.objects.create(
+            user=users[0], title="Vote benchmark", description="Hot feedback for the vote benchmark.",
+            feedback_type='COMPLAINT', category='OTHER',
+        )
+        try:
+            for label, enabled in (("inline counter UPDATE", False), ("write-behind buffer", True)):
+                Vote.objects.filter(feedback=feedback).delete()
+                Feedback.objects.filter(pk=feedback.pk).update(upvotes=0, downvotes=0)
+                with override_settings(VOTE_BUFFER={**buffer.settings.VOTE_BUFFER, 'ENABLED': enabled}):
+                    elapsed, failed = self.run(feedback.pk, users, threads)
+                    buffer.flush()
+                upvotes = Feedback.objects.values_list('upvotes', flat=True).get(pk=feedback.pk)
+                self.stdout.write(
+                    f"{label}: {(votes - failed) / elapsed:.0f} votes/sec "
+                    f"({elapsed:.2f}s, upvotes={upvotes}, failed={failed})"
+                )
+        finally:
+            feedback.delete()
+            UserAccount.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run(self, feedback_id, users, threads):
+        chunks = [users[i::threads] for i in range(threads)]
+        failures = []
+
+        def vote(chunk):
+            try:
+                for user in chunk:
+                    try:
+                        services.cast_vote(user, feedback_id, Vote.Value.UP)
+                    except DatabaseError:
+                        failures.append(user.pk)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=vote, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - started, len(failures)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from votes import ranking
+
+
+class Command(BaseCommand):
+    help = "Decay feedback hot scores and refresh the trending flag (run continuously or from cron with --once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Decay once and exit instead of looping.")
+        parser.add_argument('--interval', type=float, default=None, help="Seconds between runs (defaults to DECAY_INTERVAL_SECONDS).")
+        parser.add_argument('--rebuild', action='store_true', help="Recompute every score from the votes first.")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(f"Rebuilt hot scores for {ranking.rebuild()} feedbacks")
+        interval = options['interval'] or ranking.hot_setting('DECAY_INTERVAL_SECONDS')
+        while True:
+            decayed = ranking.decay()
+            self.stdout.write(f"Decayed {decayed} hot scores")
+            if options['once']:
+                return
+            time.sleep(interval)
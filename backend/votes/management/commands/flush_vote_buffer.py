@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from votes import buffer
+
+
+class Command(BaseCommand):
+    help = "Apply buffered vote counter deltas (settings.VOTE_BUFFER) in one batched UPDATE per interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Flush once and exit instead of looping.")
+        parser.add_argument('--interval', type=float, default=None, help="Seconds between flushes (defaults to FLUSH_INTERVAL_SECONDS).")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or buffer.buffer_setting('FLUSH_INTERVAL_SECONDS')
+        while True:
+            flushed = buffer.flush()
+            if flushed:
+                self.stdout.write(f"Flushed vote counts for {flushed} feedbacks")
+            if options['once']:
+                return
+            time.sleep(interval)
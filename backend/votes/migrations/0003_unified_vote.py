@@ -0,0 +1,82 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def merge_votes(apps, schema_editor):
+    """
+    Copy Upvote/Downvote rows into Vote (keeping their timestamps), then recount the counters.
+
+    The old tables allowed a user to both upvote and downvote the same feedback; the later vote wins.
+    """
+    Vote = apps.get_model('votes', 'Vote')
+    Feedback = apps.get_model('feedback', 'Feedback')
+    vote = Vote._meta.db_table
+    upvote = apps.get_model('votes', 'Upvote')._meta.db_table
+    downvote = apps.get_model('votes', 'Downvote')._meta.db_table
+
+    schema_editor.execute(
+        f"INSERT INTO {vote} (user_id, feedback_id, value, created_at, updated_at) "
+        f"SELECT u.user_id, u.feedback_id, 1, u.created_at, u.created_at FROM {upvote} u "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {downvote} d WHERE d.user_id = u.user_id "
+        "AND d.feedback_id = u.feedback_id AND d.created_at > u.created_at) "
+        "UNION ALL "
+        f"SELECT d.user_id, d.feedback_id, -1, d.created_at, d.created_at FROM {downvote} d "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {upvote} u WHERE u.user_id = d.user_id "
+        "AND u.feedback_id = d.feedback_id AND u.created_at >= d.created_at)"
+    )
+
+    def count(value):
+        votes = Vote.objects.filter(feedback=OuterRef('pk'), value=value).values('feedback').annotate(n=Count('id'))
+        return Coalesce(Subquery(votes.values('n')), 0)
+
+    Feedback.objects.update(upvotes=count(1), downvotes=count(-1))
+
+
+def split_votes(apps, schema_editor):
+    vote = apps.get_model('votes', 'Vote')._meta.db_table
+    for model, value in (('Upvote', 1), ('Downvote', -1)):
+        table = apps.get_model('votes', model)._meta.db_table
+        schema_editor.execute(
+            f"INSERT INTO {table} (user_id, feedback_id, created_at) "
+            f"SELECT user_id, feedback_id, created_at FROM {vote} WHERE value = %s",
+            [value],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0009_keyset_indexes'),
+        ('votes', '0002_downvote'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.SmallIntegerField(choices=[(1, 'Upvote'), (-1, 'Downvote')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='feedback.feedback')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('user', 'feedback'), name='unique_vote_per_user'),
+        ),
+        migrations.RunPython(merge_votes, split_votes),
+        migrations.DeleteModel(
+            name='Downvote',
+        ),
+        migrations.DeleteModel(
+            name='Upvote',
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:54
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_hot_scores(apps, schema_editor):
+    """
+    feedback.0010_hot_score started every score at 0: score existing feedback from its votes,
+    as votes.ranking.rebuild() does at the time of writing, against the historical models.
+    """
+    Feedback = apps.get_model('feedback', 'Feedback')
+    Vote = apps.get_model('votes', 'Vote')
+    RankingState = apps.get_model('votes', 'RankingState')
+
+    now = timezone.now()
+    hot_score = settings.HOT_SCORE
+    half_life = hot_score['HALF_LIFE_HOURS']
+    scores = {}
+    rows = Vote.objects.filter(updated_at__gte=now - timedelta(hours=half_life * 20)).values_list(
+        'feedback_id', 'value', 'updated_at', 'feedback__urgency', 'feedback__sentiment_score',
+    )
+    for feedback_id, value, voted_at, urgency, sentiment in rows.iterator(chunk_size=1000):
+        weight = hot_score['URGENCY_WEIGHTS'].get(urgency, 1.0) * (
+            1 + hot_score['NEGATIVE_SENTIMENT_WEIGHT'] * max(0.0, -(sentiment or 0.0))
+        )
+        age_hours = (now - voted_at).total_seconds() / 3600
+        scores[feedback_id] = scores.get(feedback_id, 0.0) + value * weight * 0.5 ** (age_hours / half_life)
+
+    threshold = hot_score['TRENDING_THRESHOLD']
+    Feedback.objects.update(hot_score=0.0, trending=False)
+    Feedback.objects.bulk_update(
+        [Feedback(pk=pk, hot_score=max(0.0, score), trending=score >= threshold) for pk, score in scores.items()],
+        ['hot_score', 'trending'], batch_size=1000,
+    )
+    RankingState.objects.update_or_create(name='hot_score', defaults={'decayed_at': now})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0010_hot_score'),
+        ('votes', '0003_unified_vote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('decayed_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
@@ -3,24 +3,30 @@ from authentication.models import UserAccount
 from feedback.models import Feedback
 
 # Create your models here.
-class Upvote(models.Model):
-    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE)
-    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name="upvotes_list")
+class Vote(models.Model):
+    """A user's vote on a feedback; Feedback.upvotes/downvotes are kept in step by votes/services.py."""
+    class Value(models.IntegerChoices):
+        UP = 1, 'Upvote'
+        DOWN = -1, 'Downvote'
+
+    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='votes')
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='votes')
+    value = models.SmallIntegerField(choices=Value.choices)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ('user', 'feedback')  # Ensures a user can upvote only once per feedback
+        constraints = [
+            # One vote per user and feedback; switching direction updates the row
+            models.UniqueConstraint(fields=['user', 'feedback'], name='unique_vote_per_user'),
+        ]
 
     def __str__(self):
-        return f"{self.user.name} upvoted {self.feedback.title}"
+        return f"{self.user.email} {self.get_value_display().lower()}d {self.feedback.title}"
 
-class Downvote(models.Model):
-    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE)
-    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name="downvotes_list")
-    created_at = models.DateTimeField(auto_now_add=True)
 
-    class Meta:
-        unique_together = ('user', 'feedback')  # A user can downvote only once per feedback
-
-    def __str__(self):
-        return f"{self.user.name} downvoted {self.feedback.title}"
+class RankingState(models.Model):
+    """When a score (votes/ranking.py) was last decayed, shared by every process (one row per score)."""
+    name = models.CharField(max_length=50, primary_key=True)
+    decayed_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
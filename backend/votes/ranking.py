@@ -0,0 +1,117 @@
+"""
+Time-decayed hot score for trending feedback.
+
+Feedback.hot_score is an exponentially decayed vote velocity: each vote adds its weight
+(urgency and negative sentiment count extra) in the same UPDATE as the vote counters, and
+decay() multiplies every non-zero score by 0.5 ** (elapsed / half-life), the elapsed time
+being measured from the last run recorded in RankingState (so separate cron processes agree).
+The `trending` flag is kept equal to hot_score >= TRENDING_THRESHOLD by both, so the trending
+endpoint only reads the (small, partially indexed) trending set.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, FloatField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from feedback.models import Feedback
+
+from .models import RankingState, Vote
+
+STATE_NAME = 'hot_score'
+
+
+def hot_setting(name):
+    return settings.HOT_SCORE[name]
+
+
+def vote_weight():
+    """SQL expression for how much one vote on a row moves its hot score."""
+    urgency = Case(
+        *[When(urgency=urgency, then=Value(weight)) for urgency, weight in hot_setting('URGENCY_WEIGHTS').items()],
+        default=Value(1.0), output_field=FloatField(),
+    )
+    negativity = Greatest(Value(0.0), -Coalesce(F('sentiment_score'), Value(0.0)))
+    return urgency * (Value(1.0) + Value(hot_setting('NEGATIVE_SENTIMENT_WEIGHT')) * negativity)
+
+
+def trending_flag(score):
+    return Case(
+        When(GreaterThanOrEqual(score, Value(hot_setting('TRENDING_THRESHOLD'))), then=Value(True)),
+        default=Value(False), output_field=BooleanField(),
+    )
+
+
+def vote_updates(net_votes):
+    """
+    update() kwargs that add `net_votes` (an int or an expression: upvotes minus downvotes
+    gained) to the hot score and refresh the trending flag, for use next to the counter deltas.
+    """
+    if not hasattr(net_votes, 'resolve_expression'):
+        net_votes = Value(net_votes)
+    # Floored at 0: retracting a vote subtracts its full weight, though what it added has decayed since
+    score = Greatest(Value(0.0), F('hot_score') + net_votes * vote_weight())
+    return {'hot_score': score, 'trending': trending_flag(score)}
+
+
+def decay(now=None):
+    """Decay every non-zero score by the time elapsed since the last run. Returns the rows decayed."""
+    now = now or timezone.now()
+    min_score = hot_setting('MIN_SCORE')
+    threshold = hot_setting('TRENDING_THRESHOLD')
+
+    with transaction.atomic():
+        # The row lock also keeps two runs from decaying the same interval twice
+        state, _ = RankingState.objects.select_for_update().get_or_create(
+            name=STATE_NAME, defaults={'decayed_at': now - timedelta(seconds=hot_setting('DECAY_INTERVAL_SECONDS'))},
+        )
+        elapsed_hours = max(0.0, (now - state.decayed_at).total_seconds() / 3600)
+        factor = 0.5 ** (elapsed_hours / hot_setting('HALF_LIFE_HOURS'))
+        decayed = Feedback.objects.filter(hot_score__gt=0).update(
+            hot_score=Case(
+                When(hot_score__lt=min_score / factor, then=Value(0.0)),
+                default=F('hot_score') * Value(factor), output_field=FloatField(),
+            ),
+        )
+        Feedback.objects.filter(trending=True, hot_score__lt=threshold).update(trending=False)
+        Feedback.objects.filter(trending=False, hot_score__gte=threshold).update(trending=True)
+        state.decayed_at = max(state.decayed_at, now)
+        state.save(update_fields=['decayed_at', 'updated_at'])
+    return decayed
+
+
+def vote_scores(votes, now, batch_size=1000):
+    """
+    {feedback id: hot score as of `now`} from a Vote queryset: every recent vote's weight,
+    decayed by its age, floored at 0 like vote_updates().
+    """
+    half_life = hot_setting('HALF_LIFE_HOURS')
+    since = now - timedelta(hours=half_life * 20)  # Older votes have decayed below a millionth
+    weights = hot_setting('URGENCY_WEIGHTS')
+    sentiment_weight = hot_setting('NEGATIVE_SENTIMENT_WEIGHT')
+
+    scores = {}
+    rows = votes.filter(updated_at__gte=since).values_list(
+        'feedback_id', 'value', 'updated_at', 'feedback__urgency', 'feedback__sentiment_score',
+    )
+    for feedback_id, value, voted_at, urgency, sentiment in rows.iterator(chunk_size=batch_size):
+        weight = weights.get(urgency, 1.0) * (1 + sentiment_weight * max(0.0, -(sentiment or 0.0)))
+        age_hours = (now - voted_at).total_seconds() / 3600
+        scores[feedback_id] = scores.get(feedback_id, 0.0) + value * weight * 0.5 ** (age_hours / half_life)
+    return {feedback_id: max(0.0, score) for feedback_id, score in scores.items()}
+
+
+def rebuild(now=None, batch_size=1000):
+    """Recompute every score from the Vote rows (for the initial backfill or after changing the weights)."""
+    now = now or timezone.now()
+    scores = vote_scores(Vote.objects.all(), now, batch_size)
+    threshold = hot_setting('TRENDING_THRESHOLD')
+    with transaction.atomic():
+        Feedback.objects.update(hot_score=0.0, trending=False)
+        feedbacks = [Feedback(pk=pk, hot_score=score, trending=score >= threshold) for pk, score in scores.items()]
+        Feedback.objects.bulk_update(feedbacks, ['hot_score', 'trending'], batch_size=batch_size)
+        RankingState.objects.update_or_create(name=STATE_NAME, defaults={'decayed_at': now})
+    return len(scores)
@@ -1,13 +1,7 @@
 from rest_framework import serializers
-from votes.models import Upvote, Downvote
+from votes.models import Vote
 
-class UpvoteSerializer(serializers.ModelSerializer):
+class VoteSerializer(serializers.ModelSerializer):
     class Meta:
-        model = Upvote
+        model = Vote
         fields = '__all__'
-        
-class DownvoteSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Downvote
-        fields = '__all__'
-
@@ -0,0 +1,108 @@
+"""
+Voting with atomic counters.
+
+Every change is one transaction: the Vote row is locked (or inserted), and the feedback's
+counters move by an F() delta in a single UPDATE, so concurrent votes never lose counts and
+no vote ever re-counts the table or runs Feedback.save(). The same UPDATE bumps the hot
+score (votes/ranking.py) and the triage priority (feedback/priority.py). With settings.VOTE_BUFFER enabled
+the counter UPDATE is deferred to the write-behind buffer (votes/buffer.py).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from admindashboard import rollups
+from feedback import priority
+from feedback.models import Feedback
+
+from . import buffer, ranking
+from .models import Vote
+
+COUNTERS = {Vote.Value.UP: 'upvotes', Vote.Value.DOWN: 'downvotes'}
+
+CREATED = 'created'
+SWITCHED = 'switched'
+RETRACTED = 'retracted'
+UNCHANGED = 'unchanged'
+
+
+def apply_counter_deltas(feedback_id, deltas):
+    """
+    Move the feedback's vote counters by {Vote.Value: delta} in one UPDATE, or, with the
+    write-behind buffer enabled, queue the deltas once the vote's transaction commits.
+    """
+    updates = {COUNTERS[value]: delta for value, delta in deltas.items() if delta}
+    if not updates:
+        return
+    if buffer.enabled():
+        def queue():
+            buffer.add_deltas(feedback_id, updates)
+            buffer.maybe_flush()
+        transaction.on_commit(queue)
+        return
+    net_votes = updates.get('upvotes', 0) - updates.get('downvotes', 0)
+    Feedback.objects.filter(pk=feedback_id).update(
+        **{counter: F(counter) + delta for counter, delta in updates.items()},
+        **ranking.vote_updates(net_votes),
+        **priority.vote_updates(net_votes),
+    )
+    rollups.record_votes({feedback_id: updates})
+
+
+def cast_vote(user, feedback_id, value, toggle=True):
+    """
+    Record `user`'s vote on a feedback and return what happened.
+
+    No vote yet: CREATED. Opposite vote: SWITCHED. Same vote again: RETRACTED when `toggle`
+    is set, else UNCHANGED. A concurrent request that loses the insert race is answered
+    with UNCHANGED instead of an error (the winner already counted the vote).
+    """
+    value = Vote.Value(value)
+    with transaction.atomic():
+        vote = Vote.objects.select_for_update().filter(user=user, feedback_id=feedback_id).first()
+        if vote is None:
+            try:
+                with transaction.atomic():  # Savepoint, so a lost race doesn't abort the outer transaction
+                    Vote.objects.create(user=user, feedback_id=feedback_id, value=value)
+            except IntegrityError:
+                return UNCHANGED
+            apply_counter_deltas(feedback_id, {value: 1})
+            return CREATED
+
+        if vote.value == value:
+            if not toggle:
+                return UNCHANGED
+            vote.delete()
+            apply_counter_deltas(feedback_id, {value: -1})
+            return RETRACTED
+
+        previous = Vote.Value(vote.value)
+        vote.value = value
+        vote.save(update_fields=['value', 'updated_at'])
+        apply_counter_deltas(feedback_id, {value: 1, previous: -1})
+        return SWITCHED
+
+
+def retract_vote(user, feedback_id):
+    """Remove `user`'s vote on a feedback, if any. Returns RETRACTED or UNCHANGED."""
+    with transaction.atomic():
+        vote = Vote.objects.select_for_update().filter(user=user, feedback_id=feedback_id).first()
+        if vote is None:
+            return UNCHANGED
+        vote.delete()
+        apply_counter_deltas(feedback_id, {Vote.Value(vote.value): -1})
+        return RETRACTED
+
+
+def vote_states(user, feedback_ids):
+    """{feedback_id: 1, -1 or 0} for `user`, in one query on the (user, feedback) unique index."""
+    votes = dict(Vote.objects.filter(user=user, feedback_id__in=feedback_ids).values_list('feedback_id', 'value'))
+    return {feedback_id: votes.get(feedback_id, 0) for feedback_id in feedback_ids}
+
+
+def my_vote_expression(user):
+    """Annotation with `user`'s vote on each feedback row (0 if none; NULL for anonymous users)."""
+    if not user.is_authenticated:
+        return Value(None, output_field=IntegerField())
+    vote = Vote.objects.filter(user=user, feedback=OuterRef('pk')).values('value')[:1]
+    return Coalesce(Subquery(vote), Value(0))
@@ -1,3 +1,238 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from admindashboard import rollups
+from admindashboard.models import FeedbackDailyStat
+from authentication.models import UserAccount
+from feedback import priority
+from feedback.models import Feedback
+
+from . import buffer, ranking, services
+from .models import RankingState, Vote
+from .views import MyVotesView
+
+
+def make_user(email):
+    return UserAccount.objects.create_user(email=email, password='pw', first_name='V', last_name='W', phone='1')
+
+
+def make_feedback(user, **kwargs):
+    fields = {
+        'title': 'Broken pipe', 'description': 'Water leaking on the main road', 'feedback_type': 'COMPLAINT',
+        'category': 'WATER', 'location': 'Pune', 'urgency': 'HIGH', **kwargs,
+    }
+    return Feedback.objects.create(user=user, **fields)
+
+
+def rollup_table():
+    return {
+        row[:len(rollups.KEY_FIELDS)]: row[len(rollups.KEY_FIELDS):]
+        for row in FeedbackDailyStat.objects.values_list(*rollups.KEY_FIELDS, *rollups.VALUE_FIELDS)
+    }
+
+
+class VoteTestCase(TestCase):
+    def setUp(self):
+        self.voters = [make_user(f"voter{i}@example.com") for i in range(3)]
+        self.feedback = make_feedback(self.voters[0])
+
+    def counters(self):
+        return tuple(Feedback.objects.values_list('upvotes', 'downvotes').get(pk=self.feedback.pk))
+
+    def assertDerivedDataInStep(self):
+        feedback = Feedback.objects.get(pk=self.feedback.pk)
+        self.assertAlmostEqual(feedback.priority_score, priority.feedback_score(feedback))
+        incremental = rollup_table()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_table())
+
+
+class VoteServiceTests(VoteTestCase):
+    def test_create_switch_and_retract(self):
+        first, second, _ = self.voters
+        self.assertEqual(services.cast_vote(first, self.feedback.pk, Vote.Value.UP), services.CREATED)
+        self.assertEqual(services.cast_vote(second, self.feedback.pk, Vote.Value.UP), services.CREATED)
+        self.assertEqual(self.counters(), (2, 0))
+
+        self.assertEqual(services.cast_vote(second, self.feedback.pk, Vote.Value.DOWN), services.SWITCHED)
+        self.assertEqual(self.counters(), (1, 1))
+
+        self.assertEqual(services.cast_vote(first, self.feedback.pk, Vote.Value.UP), services.RETRACTED)
+        self.assertEqual(services.cast_vote(first, self.feedback.pk, Vote.Value.UP, toggle=False), services.CREATED)
+        self.assertEqual(services.cast_vote(first, self.feedback.pk, Vote.Value.UP, toggle=False), services.UNCHANGED)
+        self.assertEqual(services.retract_vote(second, self.feedback.pk), services.RETRACTED)
+        self.assertEqual(services.retract_vote(second, self.feedback.pk), services.UNCHANGED)
+        self.assertEqual(self.counters(), (1, 0))
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertDerivedDataInStep()
+
+    def test_votes_move_the_hot_score(self):
+        for voter in self.voters:
+            services.cast_vote(voter, self.feedback.pk, Vote.Value.UP)
+        self.assertGreater(Feedback.objects.get(pk=self.feedback.pk).hot_score, 0)
+
+    def test_vote_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.voters[1])
+        response = client.post(f'/api/vote/feedback/{self.feedback.pk}/upvote/')
+        self.assertEqual((response.status_code, response.data['upvotes']), (201, 1))
+        response = client.post(f'/api/vote/feedback/{self.feedback.pk}/downvote/')
+        self.assertEqual((response.data['result'], response.data['upvotes'], response.data['downvotes']), (services.SWITCHED, 0, 1))
+        self.assertEqual(client.delete(f'/api/vote/feedback/{self.feedback.pk}/vote/').status_code, 200)
+        self.assertEqual(client.delete(f'/api/vote/feedback/{self.feedback.pk}/vote/').status_code, 404)
+        self.assertEqual(client.post('/api/vote/feedback/999999/upvote/').status_code, 404)
+
+
+class MyVoteTests(VoteTestCase):
+    url = '/api/vote/feedback/my-votes/'
+
+    def setUp(self):
+        super().setUp()
+        self.others = [make_feedback(self.voters[0], title=f"Issue {i}") for i in range(2)]
+        services.cast_vote(self.voters[1], self.feedback.pk, Vote.Value.UP)
+        services.cast_vote(self.voters[1], self.others[0].pk, Vote.Value.DOWN)
+        services.cast_vote(self.voters[2], self.others[1].pk, Vote.Value.UP)  # Someone else's vote
+        self.client = APIClient()
+        self.client.force_authenticate(self.voters[1])
+
+    def test_mixed_votes_in_one_query(self):
+        ids = [self.feedback.pk, self.others[0].pk, self.others[1].pk, 999999]
+        with self.assertNumQueries(1):
+            self.assertEqual(services.vote_states(self.voters[1], ids), dict(zip(ids, [1, -1, 0, 0])))
+        response = self.client.get(f"{self.url}?ids={','.join(map(str, ids + ids[:1]))}")
+        self.assertEqual(response.data['votes'], dict(zip(ids, [1, -1, 0, 0])))
+
+    def test_rejects_bad_and_too_many_ids(self):
+        self.assertEqual(self.client.get(f'{self.url}?ids=1,two').status_code, 400)
+        too_many = ','.join(str(pk) for pk in range(1, MyVotesView.max_ids + 2))
+        self.assertEqual(self.client.get(f'{self.url}?ids={too_many}').status_code, 400)
+        self.assertEqual(APIClient().get(f'{self.url}?ids=1').status_code, 401)
+
+    def test_list_expands_my_vote(self):
+        Feedback.objects.update(trending=True)
+        url = '/api/vote/feedback/trending/?expand=my_vote&fields=id'
+        votes = {row['id']: row['my_vote'] for row in self.client.get(url).data['results']}
+        self.assertEqual(votes, {self.feedback.pk: 1, self.others[0].pk: -1, self.others[1].pk: 0})
+        anonymous = APIClient().get(url).data['results']
+        self.assertEqual({row['my_vote'] for row in anonymous}, {None})
+
+
+@override_settings(VOTE_BUFFER={**settings.VOTE_BUFFER, 'ENABLED': True})
+class VoteBufferTests(VoteTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        cache.add(buffer.FLUSH_GATE_KEY, 1)  # Keep votes from flushing on their own
+        self.addCleanup(buffer.release)
+        self.addCleanup(buffer.claim)  # Empty the process-local buffer for the next test
+
+    def vote(self, voter, value=Vote.Value.UP):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.cast_vote(voter, self.feedback.pk, value)
+
+    def flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return buffer.flush()
+
+    def test_votes_wait_in_the_buffer_until_flushed(self):
+        self.vote(self.voters[0])
+        self.vote(self.voters[1], Vote.Value.DOWN)
+        self.assertEqual(self.counters(), (0, 0))
+        self.assertEqual(buffer.merge_pending([{'id': self.feedback.pk, 'upvotes': 0, 'downvotes': 0}])[0]['upvotes'], 1)
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(self.flush(), 0)
+        self.assertDerivedDataInStep()
+
+    def test_failed_flush_keeps_the_batch_for_the_next_one(self):
+        self.vote(self.voters[0])
+        with mock.patch.object(rollups, 'record_votes', side_effect=RuntimeError("db went away")):
+            with self.assertRaises(RuntimeError):
+                self.flush()
+        self.assertEqual(self.counters(), (0, 0))
+        # Still counted by reads, and votes cast meanwhile wait for the flush after
+        self.assertEqual(buffer.pending_deltas([self.feedback.pk])[self.feedback.pk]['upvotes'], 1)
+        self.vote(self.voters[1])
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.counters(), (1, 0))
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.counters(), (2, 0))
+        self.assertDerivedDataInStep()
+
+    def test_batch_is_released_only_after_commit(self):
+        self.vote(self.voters[0])
+        buffer.flush()  # The test's transaction never commits, so the batch stays claimed
+        self.assertEqual(buffer.claim(), {self.feedback.pk: {'upvotes': 1, 'downvotes': 0}})
+
+    def test_one_flush_at_a_time(self):
+        self.vote(self.voters[0])
+        cache.add(buffer.FLUSH_LOCK_KEY, 1)
+        self.assertEqual(self.flush(), 0)
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_benchmark_refuses_to_write_unless_asked(self):
+        users = UserAccount.objects.count()
+        with self.assertRaises(CommandError):
+            call_command('benchmark_votes', votes=2, threads=1)
+        self.assertEqual(UserAccount.objects.count(), users)
+
+
+class HotScoreTests(VoteTestCase):
+    def setUp(self):
+        super().setUp()
+        for voter in self.voters:
+            services.cast_vote(voter, self.feedback.pk, Vote.Value.UP)
+        self.score = self.hot_score()
+
+    def hot_score(self):
+        return Feedback.objects.get(pk=self.feedback.pk).hot_score
+
+    def test_decay_measures_from_the_recorded_last_run(self):
+        now = timezone.now()
+        RankingState.objects.update_or_create(name=ranking.STATE_NAME, defaults={'decayed_at': now - timedelta(hours=12)})
+        cache.clear()  # A fresh cron process: nothing may depend on the cache
+        ranking.decay(now)
+        self.assertAlmostEqual(self.hot_score(), self.score / 2)
+        ranking.decay(now + timedelta(hours=12))
+        self.assertAlmostEqual(self.hot_score(), self.score / 4)
+        self.assertEqual(RankingState.objects.get().decayed_at, now + timedelta(hours=12))
+
+    def test_first_run_assumes_one_interval(self):
+        RankingState.objects.all().delete()  # The votes migration records one
+        ranking.decay()
+        interval_hours = settings.HOT_SCORE['DECAY_INTERVAL_SECONDS'] / 3600
+        expected = self.score * 0.5 ** (interval_hours / settings.HOT_SCORE['HALF_LIFE_HOURS'])
+        self.assertAlmostEqual(self.hot_score(), expected)
+
+    def test_trending_flag_follows_the_threshold(self):
+        threshold = settings.HOT_SCORE['TRENDING_THRESHOLD']
+        self.assertEqual(Feedback.objects.get(pk=self.feedback.pk).trending, self.score >= threshold)
+        Feedback.objects.filter(pk=self.feedback.pk).update(hot_score=threshold * 2, trending=False)
+        ranking.decay()
+        self.assertTrue(Feedback.objects.get(pk=self.feedback.pk).trending)
+        response = APIClient().get('/api/vote/feedback/trending/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.feedback.pk])
+
+    def test_rebuild_matches_the_incremental_score(self):
+        downvoted = make_feedback(self.voters[1], title='Noise at night')
+        switched = make_feedback(self.voters[1], title='Stray dogs')
+        services.cast_vote(self.voters[0], downvoted.pk, Vote.Value.DOWN)
+        services.cast_vote(self.voters[0], switched.pk, Vote.Value.UP)
+        services.cast_vote(self.voters[1], switched.pk, Vote.Value.DOWN)
+        services.cast_vote(self.voters[0], switched.pk, Vote.Value.DOWN)
+        incremental = dict(Feedback.objects.values_list('id', 'hot_score'))
+        self.assertEqual((incremental[downvoted.pk], incremental[switched.pk]), (0.0, 0.0))  # Floored at 0
+
+        ranking.rebuild()
+        for pk, score in Feedback.objects.values_list('id', 'hot_score'):
+            self.assertAlmostEqual(score, incremental[pk], places=3)
+        self.assertTrue(RankingState.objects.filter(name=ranking.STATE_NAME).exists())
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import UpvoteFeedbackView, TrendingFeedbackView, DownvoteFeedbackView
+from .views import UpvoteFeedbackView, TrendingFeedbackView, DownvoteFeedbackView, RetractVoteView, MyVotesView
 
 urlpatterns = [
     path('feedback/<int:feedback_id>/upvote/', UpvoteFeedbackView.as_view(), name='upvote-feedback'),
+    path('feedback/my-votes/', MyVotesView.as_view(), name='my-votes'),
     path('feedback/trending/', TrendingFeedbackView.as_view(), name='trending-feedback'),
     path('feedback/<int:feedback_id>/downvote/', DownvoteFeedbackView.as_view(), name='downvote-feedback'),
+    path('feedback/<int:feedback_id>/vote/', RetractVoteView.as_view(), name='retract-vote'),
 ]
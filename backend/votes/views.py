@@ -3,59 +3,94 @@ from feedback.serializers import FeedbackSerializer
 # Create your views here.
 from rest_framework import status, generics
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from feedback.models import Feedback
-from .models import  Upvote, Downvote
+from feedback.filters import TrendingFilter
+from feedback.pagination import FeedbackCursorPagination
+from django_filters.rest_framework import DjangoFilterBackend
+from feedback.views import LeanListMixin
+from .models import Vote
+from . import buffer, services
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from .serializers import UpvoteSerializer, DownvoteSerializer
+from .serializers import VoteSerializer
 from authentication.utils import CookieJWTAuthentication
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
 
-class UpvoteFeedbackView(generics.CreateAPIView):
-    serializer_class = UpvoteSerializer
+class VoteFeedbackView(generics.CreateAPIView):
+    """POST toggles the vote: a first vote counts, the opposite vote switches, the same vote again retracts."""
+    serializer_class = VoteSerializer
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
+    vote_value = None
+    messages = {
+        services.CREATED: 'Feedback {verb} successfully',
+        services.SWITCHED: 'Vote changed: feedback {verb} successfully',
+        services.RETRACTED: 'Vote removed',
+        services.UNCHANGED: 'Your vote was already recorded',
+    }
 
     def post(self, request, feedback_id):
-        feedback = Feedback.objects.get(id=feedback_id)
-        user = request.user
+        if not Feedback.objects.filter(id=feedback_id).exists():
+            return Response({'message': 'Feedback not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Check if the user already upvoted
-        if Upvote.objects.filter(user=user, feedback=feedback).exists():
-            return Response({'message': 'You have already upvoted this feedback.'}, status=status.HTTP_400_BAD_REQUEST)
+        result = services.cast_vote(request.user, feedback_id, self.vote_value)
+        verb = 'upvoted' if self.vote_value == Vote.Value.UP else 'downvoted'
+        counts = Feedback.objects.values('id', 'upvotes', 'downvotes').get(id=feedback_id)
+        buffer.merge_pending([counts])
+        del counts['id']
+        return Response(
+            {'message': self.messages[result].format(verb=verb), 'result': result, **counts},
+            status=status.HTTP_201_CREATED if result == services.CREATED else status.HTTP_200_OK,
+        )
 
-        # Create upvote
-        Upvote.objects.create(user=user, feedback=feedback)
-        feedback.update_upvotes()
 
-        return Response({'message': 'Feedback upvoted successfully'}, status=status.HTTP_201_CREATED)
+class UpvoteFeedbackView(VoteFeedbackView):
+    vote_value = Vote.Value.UP
 
-class TrendingFeedbackView(generics.ListAPIView):
-    serializer_class = FeedbackSerializer
-    permission_classes = [AllowAny]
 
-    def get_queryset(self):
-        return Feedback.objects.order_by('-upvotes')[:10]  # Show top 10 trending feedback
+class DownvoteFeedbackView(VoteFeedbackView):
+    vote_value = Vote.Value.DOWN
 
 
-class DownvoteFeedbackView(generics.CreateAPIView):
-    serializer_class = DownvoteSerializer
+class RetractVoteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
 
-    def post(self, request, feedback_id):
-        feedback = Feedback.objects.get(id=feedback_id)
-        user = request.user
+    def delete(self, request, feedback_id):
+        result = services.retract_vote(request.user, feedback_id)
+        if result == services.UNCHANGED:
+            return Response({'message': 'You have not voted on this feedback.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'message': 'Vote removed', 'result': result}, status=status.HTTP_200_OK)
+
+class TrendingFeedbackView(LeanListMixin, generics.ListAPIView):
+    serializer_class = FeedbackSerializer
+    permission_classes = [AllowAny]
+    pagination_class = FeedbackCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TrendingFilter  # ?category= and ?location=
+    cursor_ordering = '-hot_score'
+    page_size = 10  # Top 10 trending feedback per page
 
-        # Check if the user already downvoted
-        if Downvote.objects.filter(user=user, feedback=feedback).exists():
-            return Response({'message': 'You have already downvoted this feedback.'}, status=status.HTTP_400_BAD_REQUEST)
+    def get_queryset(self):
+        # Materialized by votes/ranking.py; served from the partial trending index
+        return Feedback.objects.filter(trending=True)
 
-        # Create downvote
-        Downvote.objects.create(user=user, feedback=feedback)
-        feedback.update_downvotes()
 
-        return Response({'message': 'Feedback downvoted successfully'}, status=status.HTTP_201_CREATED)
+class MyVotesView(APIView):
+    """The caller's vote on each of ?ids=1,2,3 (1 upvote, -1 downvote, 0 none), for rendering a page of feedback."""
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+    max_ids = 100  # Matches the largest feedback page
+
+    def get(self, request):
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()))
+        except ValueError:
+            return Response({'error': 'ids must be a comma-separated list of feedback ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_ids:
+            return Response({'error': f'At most {self.max_ids} ids per request.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'votes': services.vote_states(request.user, ids)})
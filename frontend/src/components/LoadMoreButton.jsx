@@ -0,0 +1,40 @@
+import React, { useState } from "react";
+import axios from "axios";
+
+// Follows a cursor-paginated list's `next` link; onLoaded(results, next) appends the page
+const LoadMoreButton = ({ next, onLoaded }) => {
+  const [loading, setLoading] = useState(false);
+
+  if (!next) return null;
+
+  const loadMore = async () => {
+    const user = JSON.parse(localStorage.getItem("userData"));
+    try {
+      setLoading(true);
+      const res = await axios.get(next, {
+        headers: {
+          Authorization: `Bearer ${user?.access_token}`,
+        },
+      });
+      onLoaded(res.data.results, res.data.next);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="flex justify-center mt-6">
+      <button
+        className="px-4 py-2 bg-gray-800 border border-gray-700 rounded-lg text-gray-300 hover:bg-gray-700 disabled:opacity-50 cursor-pointer"
+        onClick={loadMore}
+        disabled={loading}
+      >
+        {loading ? "Loading..." : "Load more"}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
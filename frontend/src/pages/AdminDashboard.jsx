@@ -13,6 +13,7 @@ import { FaUserCircle } from "react-icons/fa";
 import { motion, AnimatePresence } from "framer-motion";
 import FeedbackCard from "../components/AdminFeedbackCard";
 import AdminSidebar from "../components/AdminSidebar";
+import LoadMoreButton from "../components/LoadMoreButton";
 import axios from "axios";
 import logo from "../assets/logo.png";
 import { useNavigate } from "react-router-dom";
@@ -31,6 +32,7 @@ const statusColors = {
 
 const AdminDashboard = () => {
   const [feedbacks, setFeedbacks] = useState([]);
+  const [next, setNext] = useState(null); // Cursor URL of the next page
   const [searchQuery, setSearchQuery] = useState("");
   const [activeFilter, setActiveFilter] = useState("All");
   const [stats, setStats] = useState();
@@ -49,14 +51,15 @@ const AdminDashboard = () => {
       try {
         setLoading(true);
         const res = await axios.get(
-          `http://127.0.0.1:8000/api/feedback/admin/`,
+          `http://127.0.0.1:8000/api/feedback/admin/?expand=user`,
           {
             headers: {
               Authorization: `Bearer ${user?.access_token}`,
             },
           }
         );
-        setFeedbacks(res.data);
+        setFeedbacks(res.data.results);
+        setNext(res.data.next);
       } catch (error) {
         console.error(error);
       } finally {
@@ -296,6 +299,13 @@ const AdminDashboard = () => {
                 ))}
             </AnimatePresence>
           </div>
+          <LoadMoreButton
+            next={next}
+            onLoaded={(results, next) => {
+              setFeedbacks((prev) => [...prev, ...results]);
+              setNext(next);
+            }}
+          />
         </main>
       </div>
     </div>
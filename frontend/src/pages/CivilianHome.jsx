@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import FeedbackCard from "../components/FeedbackCard";
+import LoadMoreButton from "../components/LoadMoreButton";
 import {
   FiAlertCircle,
   FiCheckCircle,
@@ -25,6 +26,7 @@ const CivilianHome = () => {
   const [urgency,setUrgency] = useState("");
 
   const [feedbacks, setFeedbacks] = useState([]);
+  const [next, setNext] = useState(null); // Cursor URL of the next page
   const [user, setUser] = useState();
   const [loading, setLoading] = useState();
 
@@ -45,7 +47,8 @@ const CivilianHome = () => {
             },
           }
         );
-        setFeedbacks(res.data);
+        setFeedbacks(res.data.results);
+        setNext(res.data.next);
       } catch (error) {
         console.error(error);
       } finally {
@@ -215,6 +218,13 @@ const CivilianHome = () => {
           </motion.div>
         )}
       </div>
+      <LoadMoreButton
+        next={next}
+        onLoaded={(results, next) => {
+          setFeedbacks((prev) => [...prev, ...results]);
+          setNext(next);
+        }}
+      />
     </div>
   );
 };
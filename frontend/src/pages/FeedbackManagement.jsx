@@ -17,6 +17,7 @@ import {
 } from "react-icons/fi";
 import { motion, AnimatePresence } from "framer-motion";
 import axios from "axios";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 const statusIcons = {
   Pending: <FiClock className="text-yellow-500" />,
@@ -52,6 +53,7 @@ const categories = [
 
 const FeedbackManagement = () => {
   const [feedbacks, setFeedbacks] = useState([]);
+  const [next, setNext] = useState(null); // Cursor URL of the next page
   const [searchQuery, setSearchQuery] = useState("");
   const [stats, setStats] = useState();
   const [user, setUser] = useState();
@@ -114,7 +116,7 @@ const FeedbackManagement = () => {
       try {
         setLoading(true);
         const res = await axios.get(
-          `http://127.0.0.1:8000/api/feedback/admin?status=${status}&category=${category}&search=${searchQuery
+          `http://127.0.0.1:8000/api/feedback/admin?expand=user&status=${status}&category=${category}&search=${searchQuery
             .trim()
             .toLowerCase()}`,
           {
@@ -123,7 +125,8 @@ const FeedbackManagement = () => {
             },
           }
         );
-        setFeedbacks(res.data);
+        setFeedbacks(res.data.results);
+        setNext(res.data.next);
       } catch (error) {
         console.error(error);
       } finally {
@@ -414,6 +417,13 @@ const FeedbackManagement = () => {
             </tbody>
           </table>
         </div>
+        <LoadMoreButton
+          next={next}
+          onLoaded={(results, next) => {
+            setFeedbacks((prev) => [...prev, ...results]);
+            setNext(next);
+          }}
+        />
       </div>
     </div>
   );
@@ -2,10 +2,12 @@ import React, { use, useEffect, useState } from "react";
 import FeedbackCard from "../components/FeedbackCard";
 import axios from "axios";
 import FeedbackModal from "../components/FeedbackModel";
+import LoadMoreButton from "../components/LoadMoreButton";
 import { motion } from "framer-motion";
 
 const MyFeedbacks = () => {
   const [data, setData] = useState([]);
+  const [next, setNext] = useState(null); // Cursor URL of the next page
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState();
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -25,7 +27,8 @@ const MyFeedbacks = () => {
             },
           }
         );
-        setData(res.data);
+        setData(res.data.results);
+        setNext(res.data.next);
       } catch (error) {
         setError(error);
       } finally {
@@ -50,7 +53,8 @@ const MyFeedbacks = () => {
             },
           }
         );
-        setData(res.data);
+        setData(res.data.results);
+        setNext(res.data.next);
       } catch (error) {
         setError(error);
       } finally {
@@ -102,6 +106,13 @@ const MyFeedbacks = () => {
           <p className="text-gray-400">No feedbacks submitted yet.</p>
         )}
       </div>
+      <LoadMoreButton
+        next={next}
+        onLoaded={(results, next) => {
+          setData((prev) => [...prev, ...results]);
+          setNext(next);
+        }}
+      />
     </div>
   );
 };